@@ -0,0 +1,145 @@
+"""
+Central asset manager.
+Loads each image once, shares the resulting Surfaces, and keeps an on-disk cache of
+already-scaled pixel data so later launches skip PNG decoding and smoothscaling.
+Images can be preloaded on worker threads while the main thread keeps the window responsive.
+"""
+
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+from settings import *
+
+# Cache file layout: header followed by raw RGBA pixels (width * height * 4 bytes)
+# magic, version, width, height, source mtime (ns), source size, scale
+CACHE_MAGIC = b"RKAC"
+CACHE_HEADER = struct.Struct("<4sIIIqqd")
+
+class AssetManager:
+    """
+    Loads and caches game images.
+    In memory, every (name, scale) pair is decoded once and the Surface is shared.
+    On disk, scaled pixels are stored as raw RGBA keyed by the source file's mtime/size,
+    the scale and ASSET_CACHE_VERSION, so any change to those rebuilds the entry.
+    Decoding and scaling never touch the display, so preload() runs them on worker threads;
+    only the final convert_alpha() happens on the main thread, in load_image().
+    """
+    def __init__(self, image_dir=ASSET_DIR_IMAGES, cache_dir=ASSET_CACHE_DIR, workers=ASSET_LOAD_WORKERS):
+        self.image_dir = image_dir
+        self.cache_dir = cache_dir
+        self.images = {}
+        self.workers = workers
+        self.executor = None
+        self.pending = {} # (name, scale) -> Future of the decoded, scaled (unconverted) Surface
+        self.preload_total = 0
+
+    def preload(self, requests):
+        """
+        Starts decoding and scaling each (name, scale) in `requests` on worker threads.
+        Can be called right after pygame.init(), before the display mode is set.
+        """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="assets")
+        for key in requests:
+            if key in self.images or key in self.pending:
+                continue
+            self.pending[key] = self.executor.submit(self.load_scaled, *key)
+            self.preload_total += 1
+
+    def load_progress(self):
+        """
+        (preloaded images ready, images preloaded in total), for a loading screen.
+        """
+        waiting = sum(1 for future in self.pending.values() if not future.done())
+        return self.preload_total - waiting, self.preload_total
+
+    def load_image(self, name, scale=1.0, fallback_size=(100, 100), fallback_color=(255, 0, 255)):
+        """
+        Returns the image scaled by `scale`, converted for fast alpha blitting.
+        Waits for a preload of it still in progress, or loads it synchronously if it wasn't preloaded.
+        Falls back to a solid placeholder if the file can't be loaded.
+        Requires the display mode to be set (for convert_alpha).
+        """
+        key = (name, scale)
+        img = self.images.get(key)
+        if img is not None:
+            return img
+
+        try:
+            future = self.pending.pop(key, None)
+            img = future.result() if future else self.load_scaled(name, scale)
+            img = img.convert_alpha()
+        except Exception as e:
+            print(f"Error loading {name}: {e}")
+            img = pygame.Surface(fallback_size)
+            img.fill(fallback_color)
+
+        self.images[key] = img
+        return img
+
+    def load_scaled(self, name, scale):
+        """
+        Decodes and scales an image, from the disk cache when it's up to date.
+        Thread-safe: the result is not converted to the display format.
+        """
+        path = os.path.join(self.image_dir, name)
+        stat = os.stat(path)
+
+        img = self.read_cache(name, scale, stat)
+        if img is None:
+            img = pygame.image.load(path)
+            if scale != 1.0:
+                if img.get_bitsize() < 24:
+                    img = img.convert(32) # smoothscale needs 24 or 32 bit pixels
+                # Scale by factor
+                new_size = (int(img.get_width() * scale), int(img.get_height() * scale))
+                img = pygame.transform.smoothscale(img, new_size)
+            self.write_cache(name, scale, stat, img)
+
+        return img
+
+    def cache_path(self, name, scale):
+        base = os.path.splitext(name)[0].replace(" ", "_")
+        return os.path.join(self.cache_dir, f"{base}@{scale:g}.rgba")
+
+    def read_cache(self, name, scale, stat):
+        path = self.cache_path(name, scale)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        if len(data) < CACHE_HEADER.size:
+            return None
+        magic, version, width, height, mtime, size, cached_scale = CACHE_HEADER.unpack_from(data)
+        if (magic != CACHE_MAGIC or version != ASSET_CACHE_VERSION
+                or mtime != stat.st_mtime_ns or size != stat.st_size or cached_scale != scale):
+            return None
+
+        pixels = memoryview(data)[CACHE_HEADER.size:]
+        if len(pixels) != width * height * 4:
+            return None
+        # frombuffer shares the bytes; the caller converts to an owned surface
+        return pygame.image.frombuffer(pixels, (width, height), "RGBA")
+
+    def write_cache(self, name, scale, stat, img):
+        path = self.cache_path(name, scale)
+        width, height = img.get_size()
+        header = CACHE_HEADER.pack(CACHE_MAGIC, ASSET_CACHE_VERSION, width, height,
+                                   stat.st_mtime_ns, stat.st_size, scale)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temp file and swap in, so a crash never leaves a torn entry
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(header)
+                f.write(pygame.image.tobytes(img, "RGBA"))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write asset cache for {name}: {e}")
+
+# Shared instance used by all sprites
+assets = AssetManager()
@@ -0,0 +1,120 @@
+"""
+Audio cues.
+Every cue is decoded into a pygame.mixer.Sound at startup and played on a fixed pool of
+mixer channels, so triggering one from the game loop never touches the disk or blocks.
+With a small mixer buffer, a cue is heard within a few ms of being triggered.
+"""
+
+import array
+import math
+import os
+
+import pygame
+from settings import *
+
+# Cue names (keys of AUDIO_CUES)
+CUE_PERFECT = "perfect"
+CUE_POOR_ANGLE = "poor_angle"
+CUE_BAD_CUT = "bad_cut"
+CUE_INJURY = "injury"
+CUE_COUNTDOWN = "countdown"
+CUE_HAND_STAGE = "hand_stage"
+
+class AudioEngine:
+    """
+    Plays preloaded cues on a fixed pool of AUDIO_CHANNELS channels.
+    A cue takes a free channel if there is one; otherwise it steals the channel playing the
+    lowest-priority cue (the oldest among equals), provided that cue's priority isn't higher
+    than its own. If every channel is playing something more important, the cue is dropped.
+    Nothing plays until load() is called, so headless tools pay nothing.
+    """
+    def __init__(self, sound_dir=ASSET_DIR_SOUNDS):
+        self.sound_dir = sound_dir
+        self.sounds = {} # cue -> Sound
+        self.priorities = {} # cue -> priority
+        self.channels = []
+        self.channel_priority = [] # Priority of the cue last started on each channel
+        self.channel_order = [] # When (in plays) each channel's cue started
+        self.plays = 0
+        self.active = False
+
+    def pre_init(self):
+        """
+        Requests the low-latency mixer format; must be called before pygame.init().
+        """
+        pygame.mixer.pre_init(AUDIO_FREQUENCY, -16, 2, AUDIO_BUFFER)
+
+    def load(self, cues=AUDIO_CUES):
+        """
+        Loads every cue and sets up the channel pool. A cue without a sound file plays a
+        synthesized tone instead, so every cue is always audible.
+        """
+        if not AUDIO_ENABLED:
+            return
+        if not pygame.mixer.get_init():
+            print("Audio unavailable: the mixer could not be initialized")
+            return
+
+        pygame.mixer.set_num_channels(AUDIO_CHANNELS)
+        self.channels = [pygame.mixer.Channel(i) for i in range(AUDIO_CHANNELS)]
+        self.channel_priority = [0] * AUDIO_CHANNELS
+        self.channel_order = [0] * AUDIO_CHANNELS
+        for cue, (filename, priority, volume, tone) in cues.items():
+            sound = self.load_sound(filename, tone)
+            if sound is None:
+                continue
+            sound.set_volume(volume)
+            self.sounds[cue] = sound
+            self.priorities[cue] = priority
+        self.active = True
+
+    def load_sound(self, filename, tone):
+        path = os.path.join(self.sound_dir, filename)
+        if not os.path.exists(path):
+            return self.synthesize(*tone) # No recording for this cue (yet): the tone is the cue
+        try:
+            return pygame.mixer.Sound(path)
+        except (pygame.error, OSError) as e:
+            print(f"Error loading {filename}: {e}")
+            return self.synthesize(*tone)
+
+    def synthesize(self, frequency, duration_ms):
+        """
+        A sine tone that fades out linearly, in the mixer's sample format.
+        """
+        rate, size, channels = pygame.mixer.get_init()
+        if size != -16:
+            print(f"Cannot synthesize a fallback tone for a {size}-bit mixer")
+            return None
+        count = rate * duration_ms // 1000
+        samples = array.array("h")
+        for i in range(count):
+            value = int(AUDIO_FALLBACK_AMPLITUDE * math.sin(2 * math.pi * frequency * i / rate) * (1 - i / count))
+            samples.extend([value] * channels)
+        return pygame.mixer.Sound(buffer=samples.tobytes())
+
+    def play(self, cue):
+        if not self.active or cue not in self.sounds:
+            return
+        priority = self.priorities[cue]
+        victim = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                victim = i
+                break
+            if self.channel_priority[i] > priority:
+                continue
+            if (victim is None or self.channel_priority[i] < self.channel_priority[victim]
+                    or (self.channel_priority[i] == self.channel_priority[victim]
+                        and self.channel_order[i] < self.channel_order[victim])):
+                victim = i
+        if victim is None:
+            return # Every channel is playing something more important
+
+        self.channels[victim].play(self.sounds[cue])
+        self.channel_priority[victim] = priority
+        self.plays += 1
+        self.channel_order[victim] = self.plays
+
+# Shared instance the game loop triggers cues on
+audio = AudioEngine()
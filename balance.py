@@ -0,0 +1,381 @@
+"""
+Headless bot simulation for difficulty and balance tuning.
+Runs many StateManager sessions in parallel (one per core), each played by a bot with
+parameterized skill, across a grid of settings, and aggregates the outcomes into
+distributions of session length, score, sanity over time, trauma episodes and hand-stage
+escalations.
+
+A grid axis is NAME=v1,v2,... where NAME is a gameplay constant from settings.py
+(e.g. TRAUMA_THRESHOLD), `spawn_interval`, or a bot skill parameter
+(accuracy, reaction_ms, jitter, slice_speed, path_speed).
+
+Usage:
+    python balance.py --sessions 100 --minutes 10
+    python balance.py --bot novice --grid TRAUMA_THRESHOLD=10,20,30 --grid spawn_interval=1500,2000
+    python balance.py --grid accuracy=5,15,25 --grid NERVE_DEVIATION_LIMIT=18,22,26 --output sweep.json
+"""
+
+import argparse
+import bisect
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from settings import *
+import settings
+
+# Bot skill presets.
+# accuracy: std dev of slice angle error (degrees)
+# reaction_ms: delay before reacting to a new ingredient or the end of the grace period
+# jitter: std dev of hand drift while tracing the nerve (px per axis)
+# slice_speed / path_speed: px moved per simulation step while cutting / tracing
+BOT_PRESETS = {
+    "novice": {"accuracy": 20.0, "reaction_ms": 700, "jitter": 12.0, "slice_speed": 25, "path_speed": 3.0},
+    "average": {"accuracy": 12.0, "reaction_ms": 450, "jitter": 8.0, "slice_speed": 30, "path_speed": 4.0},
+    "expert": {"accuracy": 5.0, "reaction_ms": 250, "jitter": 4.0, "slice_speed": 35, "path_speed": 5.0},
+}
+BOT_PARAMS = tuple(BOT_PRESETS["average"])
+
+BOT_MOVE_SPEED = 40 # px per step when repositioning between cuts
+SLICE_HALF_LENGTH = 75 # px either side of the ingredient's center; clears a rotated 64 px image
+JITTER_SMOOTHING = 0.97 # Per-step carry-over of the drift offset; real hand shake wanders rather than flickers
+SANITY_SAMPLE_MS = 1000
+
+class BotPlayer:
+    """
+    Input source that plays the game by looking at the StateManager it drives.
+    In PREP it waits `reaction_ms` after an ingredient spawns, moves to one side of it and
+    drags across its center at its angle plus a random error. In TRAUMA it moves to the
+    start point during the grace period, then traces the nerve with a slowly wandering offset.
+    """
+    def __init__(self, rng, accuracy, reaction_ms, jitter, slice_speed, path_speed):
+        self.rng = rng
+        self.accuracy = accuracy
+        self.reaction_ms = reaction_ms
+        self.jitter = jitter
+        self.slice_speed = slice_speed
+        self.path_speed = path_speed
+        self.state_manager = None
+
+        self.pos = (SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+        self.target = None # (ingredient, its creation_time) being cut
+        self.stroke = None # (start, direction, length) of the planned cut
+        self.cut_distance = None # None while approaching the stroke start
+        self.trauma_start = None
+        self.path_distance = 0.0
+        self.drift = (0.0, 0.0)
+        self.batch = [None] # One sample per step
+
+    def attach(self, state_manager):
+        self.state_manager = state_manager
+
+    def poll(self):
+        sm = self.state_manager
+        if sm.state == "TRAUMA" and sm.nerve_path:
+            pressed = False
+            self.trace(sm)
+        else:
+            pressed = self.slice(sm)
+        # Like the real mouse, the reported position never leaves the window
+        x = max(0, min(SCREEN_WIDTH - 1, int(round(self.pos[0]))))
+        y = max(0, min(SCREEN_HEIGHT - 1, int(round(self.pos[1]))))
+        self.batch[0] = ((x, y), pressed)
+        return self.batch
+
+    def handle_event(self, event):
+        pass
+
+    def close(self):
+        pass
+
+    def move_towards(self, target, speed):
+        # Returns True once the target is reached
+        dx = target[0] - self.pos[0]
+        dy = target[1] - self.pos[1]
+        dist = math.hypot(dx, dy)
+        if dist <= speed:
+            self.pos = target
+            return True
+        self.pos = (self.pos[0] + dx / dist * speed, self.pos[1] + dy / dist * speed)
+        return False
+
+    def target_alive(self):
+        # Pooled ingredients are recycled, so also check it's still the same spawn
+        ingredient, created = self.target
+        return ingredient.alive() and ingredient.creation_time == created
+
+    def plan_stroke(self, ingredient):
+        cx, cy = ingredient.hitbox.center
+        angle = math.radians(ingredient.angle + self.rng.gauss(0, self.accuracy))
+        # Screen y points down, the game measures slice angles with y up
+        direction = (math.cos(angle), -math.sin(angle))
+        start = (cx - direction[0] * SLICE_HALF_LENGTH, cy - direction[1] * SLICE_HALF_LENGTH)
+        if not (0 <= start[0] < SCREEN_WIDTH and 0 <= start[1] < SCREEN_HEIGHT):
+            # Cut the same line from the other side (angles are scored modulo 180)
+            direction = (-direction[0], -direction[1])
+            start = (cx - direction[0] * SLICE_HALF_LENGTH, cy - direction[1] * SLICE_HALF_LENGTH)
+        start = (max(0, min(SCREEN_WIDTH - 1, start[0])), max(0, min(SCREEN_HEIGHT - 1, start[1])))
+        self.stroke = (start, direction, 2 * SLICE_HALF_LENGTH)
+        self.cut_distance = None
+
+    def slice(self, sm):
+        now = sm.time
+        if self.target is not None and self.cut_distance is None and not self.target_alive():
+            self.target = None # Expired (or sliced by accident) before we got there
+
+        if self.target is None:
+            ready = [i for i in sm.ingredients if now - i.creation_time >= self.reaction_ms]
+            if not ready:
+                return False
+            ingredient = min(ready, key=lambda i: i.creation_time)
+            self.target = (ingredient, ingredient.creation_time)
+            self.plan_stroke(ingredient)
+
+        start, direction, length = self.stroke
+        if self.cut_distance is None:
+            if self.move_towards(start, BOT_MOVE_SPEED):
+                self.cut_distance = 0.0 # In position: press on the next step
+            return False
+
+        self.pos = (start[0] + direction[0] * self.cut_distance, start[1] + direction[1] * self.cut_distance)
+        if self.cut_distance >= length:
+            self.target = None # Stroke finished: release
+            return False
+        self.cut_distance = min(length, self.cut_distance + self.slice_speed)
+        return True
+
+    def trace(self, sm):
+        path = sm.nerve_path
+        if sm.trauma_start_time != self.trauma_start:
+            # New trauma episode
+            self.trauma_start = sm.trauma_start_time
+            self.path_distance = 0.0
+            self.drift = (0.0, 0.0)
+            self.target = None
+
+        elapsed = sm.time - sm.trauma_start_time
+        if sm.is_grace_period or elapsed < GRACE_PERIOD_DURATION + self.reaction_ms:
+            if elapsed >= self.reaction_ms:
+                self.move_towards(path.start_point, BOT_MOVE_SPEED)
+            return
+
+        self.path_distance = min(path.length, self.path_distance + self.path_speed)
+        x, y = point_along(path, self.path_distance)
+        # Autoregressive drift whose long-run std dev is `jitter`
+        a = JITTER_SMOOTHING
+        noise = self.jitter * math.sqrt(1 - a * a)
+        self.drift = (a * self.drift[0] + self.rng.gauss(0, noise), a * self.drift[1] + self.rng.gauss(0, noise))
+        self.pos = (x + self.drift[0], y + self.drift[1])
+
+def point_along(path, distance):
+    if path.segment_count == 0:
+        return path.start_point
+    i = max(0, bisect.bisect_right(path.seg_arc_starts, distance) - 1)
+    x, y = path.seg_starts[i]
+    dx, dy = path.seg_dirs[i]
+    length = path.seg_lengths[i]
+    t = min(1.0, (distance - path.seg_arc_starts[i]) / length) if length else 0.0
+    return x + dx * t, y + dy * t
+
+# --- Worker process ---
+
+TUNABLE_DEFAULTS = {}
+
+def init_worker():
+    # Headless: must be set before pygame initializes its video/audio subsystems
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    import pygame
+    from profiler import profiler
+
+    pygame.init()
+    profiler.enabled = False
+
+def apply_settings(overrides):
+    """
+    Applies settings overrides for this worker's next session. Modules import settings
+    with `from settings import *`, so each value is patched wherever it was copied to.
+    """
+    import sprites
+    import state_manager
+
+    modules = (settings, sprites, state_manager)
+    for name in set(TUNABLE_DEFAULTS) | set(overrides):
+        if name not in TUNABLE_DEFAULTS:
+            TUNABLE_DEFAULTS[name] = getattr(settings, name)
+        value = overrides.get(name, TUNABLE_DEFAULTS[name])
+        for module in modules:
+            if hasattr(module, name):
+                setattr(module, name, value)
+
+def run_session(task):
+    """
+    Plays one session until the hand has escalated `max_deaths` times or `minutes` pass.
+    """
+    from state_manager import StateManager
+
+    point, settings_overrides, spawn_interval, skill, seed, minutes, max_deaths = task
+    apply_settings(settings_overrides)
+
+    bot = BotPlayer(random.Random(seed * 2 + 1), **skill)
+    state_manager = StateManager(random.Random(seed * 2), bot)
+    bot.attach(state_manager)
+    if spawn_interval is not None:
+        state_manager.spawn_interval = spawn_interval
+
+    max_steps = int(minutes * 60000 / SIM_STEP_MS)
+    sample_every = max(1, round(SANITY_SAMPLE_MS / SIM_STEP_MS))
+    sanity_curve = []
+    score = 0
+    previous_score = 0
+    trauma_episodes = 0
+    previous_state = state_manager.state
+    steps = 0
+    for steps in range(1, max_steps + 1):
+        state_manager.update(None, SIM_STEP_MS)
+
+        # Score resets on death, so total the increases
+        if state_manager.score > previous_score:
+            score += state_manager.score - previous_score
+        previous_score = state_manager.score
+        if state_manager.state != previous_state:
+            if state_manager.state == "TRAUMA":
+                trauma_episodes += 1
+            previous_state = state_manager.state
+        if steps % sample_every == 0:
+            sanity_curve.append(state_manager.sanity)
+        if state_manager.hand_stage >= max_deaths:
+            break
+
+    return point, {
+        "minutes": steps * SIM_STEP_MS / 60000,
+        "ended": state_manager.hand_stage >= max_deaths,
+        "score": score,
+        "trauma_episodes": trauma_episodes,
+        "hand_stage_escalations": state_manager.hand_stage,
+        "sanity_curve": sanity_curve,
+    }
+
+# --- Aggregation ---
+
+def distribution(values):
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "mean": sum(ordered) / len(ordered),
+        "p10": pct(10),
+        "p50": pct(50),
+        "p90": pct(90),
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+
+def aggregate(sessions):
+    longest = max(len(s["sanity_curve"]) for s in sessions)
+    curve = []
+    for i in range(longest):
+        # Only sessions still running at this point in time
+        values = [s["sanity_curve"][i] for s in sessions if i < len(s["sanity_curve"])]
+        stats = distribution(values)
+        curve.append({"t": (i + 1) * SANITY_SAMPLE_MS / 1000, "sessions": len(values),
+                      "mean": stats["mean"], "p10": stats["p10"], "p90": stats["p90"]})
+    return {
+        "sessions": len(sessions),
+        "ended": sum(s["ended"] for s in sessions),
+        "minutes": distribution([s["minutes"] for s in sessions]),
+        "score": distribution([s["score"] for s in sessions]),
+        "trauma_episodes": distribution([s["trauma_episodes"] for s in sessions]),
+        "hand_stage_escalations": distribution([s["hand_stage_escalations"] for s in sessions]),
+        "sanity_curve": curve,
+    }
+
+def parse_value(text):
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+def parse_grid(axes, parser):
+    grid = {}
+    for axis in axes:
+        name, _, values = axis.partition("=")
+        if not values:
+            parser.error(f"grid axis {axis!r} should look like NAME=v1,v2")
+        if name not in BOT_PARAMS and name != "spawn_interval" and not (name.isupper() and hasattr(settings, name)):
+            parser.error(f"unknown grid parameter {name!r}")
+        try:
+            grid[name] = [parse_value(v) for v in values.split(",")]
+        except ValueError:
+            parser.error(f"grid axis {axis!r} has a non-numeric value")
+    return grid
+
+def print_summary(points):
+    print(f"{'parameters':<48} {'minutes p50':>11} {'score p50':>9} {'traumas':>8} {'escalations':>11} {'ended':>6}")
+    for point in points:
+        summary = point["summary"]
+        params = " ".join(f"{k}={v}" for k, v in point["params"].items()) or "(defaults)"
+        print(f"{params:<48} {summary['minutes']['p50']:>11.2f} {summary['score']['p50']:>9} "
+              f"{summary['trauma_episodes']['mean']:>8.2f} {summary['hand_stage_escalations']['mean']:>11.2f} "
+              f"{summary['ended']:>3}/{summary['sessions']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel headless bot simulation for balance tuning.")
+    parser.add_argument("--sessions", type=int, default=50, help="sessions per grid point")
+    parser.add_argument("--minutes", type=float, default=10, help="simulated minutes per session at most")
+    parser.add_argument("--max-deaths", type=int, default=3, help="hand-stage escalations that end a session")
+    parser.add_argument("--bot", default="average", choices=sorted(BOT_PRESETS), help="base bot skill preset")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=v1,v2",
+                        help="parameter axis to sweep (repeatable)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="balance_results.json", help="JSON file to write results to")
+    args = parser.parse_args(argv)
+
+    grid = parse_grid(args.grid, parser)
+    names = list(grid)
+    points = []
+    tasks = []
+    for index, values in enumerate(itertools.product(*grid.values())):
+        params = dict(zip(names, values))
+        skill = dict(BOT_PRESETS[args.bot])
+        skill.update({k: v for k, v in params.items() if k in BOT_PARAMS})
+        overrides = {k: v for k, v in params.items() if k.isupper()}
+        points.append({"params": params, "bot": args.bot, "skill": skill, "sessions": []})
+        for session in range(args.sessions):
+            # Every grid point plays the same seeds, so differences come from the parameters
+            seed = args.seed * 1000003 + session
+            tasks.append((index, overrides, params.get("spawn_interval"), skill, seed, args.minutes, args.max_deaths))
+
+    print(f"Running {len(tasks)} sessions ({len(points)} grid points) on {args.workers} workers...")
+    start = time.perf_counter()
+    chunksize = max(1, len(tasks) // (args.workers * 8))
+    done = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as executor:
+        for index, result in executor.map(run_session, tasks, chunksize=chunksize):
+            points[index]["sessions"].append(result)
+            done += 1
+            if done % max(1, len(tasks) // 20) == 0:
+                print(f"  {done}/{len(tasks)} sessions, {time.perf_counter() - start:.0f}s")
+    elapsed = time.perf_counter() - start
+    simulated = sum(s["minutes"] for point in points for s in point["sessions"])
+
+    for point in points:
+        point["summary"] = aggregate(point.pop("sessions"))
+    print_summary(points)
+    print(f"\n{simulated:.0f} simulated minutes in {elapsed:.1f}s ({simulated * 60 / elapsed:.0f}x real time)")
+
+    with open(args.output, "w") as f:
+        json.dump({"bot": args.bot, "minutes": args.minutes, "max_deaths": args.max_deaths, "seed": args.seed,
+                   "elapsed_seconds": elapsed, "simulated_minutes": simulated, "points": points}, f, indent=2)
+    print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,330 @@
+"""
+Headless benchmark suite for the game's hot paths.
+Drives StateManager, ChefHand, ingredient spawning and NervePath deviation checks with
+synthetic, parameterized workloads under SDL's dummy video driver, and reports per-phase
+frame-time percentiles plus throughput in frames per second of simulated play.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --ingredients 10 200 --slice-speeds 8 60 --path-lengths 25 1000
+    python benchmark.py --output results.json --compare previous.json
+"""
+
+import os
+
+# Must be set before pygame initializes its video/audio subsystems
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import itertools
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import pygame
+from settings import *
+from frame_memory import surface_pool
+
+PHASES_PREP = ("spawn", "update", "hand", "draw", "present")
+PHASES_TRAUMA = ("deviation", "update", "hand", "draw", "present")
+
+class SyntheticMouse:
+    """
+    Scripted mouse that stands in for pygame.mouse polling while a workload runs.
+    `pos` is in logical pixels; like the real mouse, get_pos() reports render framebuffer pixels.
+    """
+    def __init__(self):
+        self.pos = (0, 0)
+        self.pressed = False
+        self.originals = None
+
+    def get_pos(self):
+        return int(self.pos[0] * RENDER_SCALE), int(self.pos[1] * RENDER_SCALE)
+
+    def get_pressed(self, num_buttons=3):
+        return (self.pressed, False, False)
+
+    def install(self):
+        self.originals = (pygame.mouse.get_pos, pygame.mouse.get_pressed)
+        pygame.mouse.get_pos = self.get_pos
+        pygame.mouse.get_pressed = self.get_pressed
+
+    def uninstall(self):
+        if self.originals:
+            pygame.mouse.get_pos, pygame.mouse.get_pressed = self.originals
+            self.originals = None
+
+class PhaseTimer:
+    """
+    Collects per-phase durations (ns) for every benchmarked frame.
+    """
+    def __init__(self, phases):
+        self.phases = phases
+        self.samples = {phase: [] for phase in phases}
+        self.frames = []
+
+    def record_frame(self, durations):
+        for phase, duration in zip(self.phases, durations):
+            self.samples[phase].append(duration)
+        self.frames.append(sum(durations))
+
+    def summary(self):
+        total_s = sum(self.frames) / 1e9
+        return {
+            "frame": summarize(self.frames),
+            "phases": {phase: summarize(samples) for phase, samples in self.samples.items()},
+            "sim_fps": len(self.frames) / total_s if total_s else 0.0,
+        }
+
+def summarize(samples_ns):
+    """
+    Percentiles and mean of a list of ns durations, in ms.
+    """
+    ordered = sorted(samples_ns)
+    if not ordered:
+        return {}
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] / 1e6
+
+    return {
+        "mean": sum(ordered) / len(ordered) / 1e6,
+        "p50": pct(50),
+        "p95": pct(95),
+        "p99": pct(99),
+        "max": ordered[-1] / 1e6,
+    }
+
+def make_components():
+    # Imported lazily so the display mode is set before any asset is converted
+    from state_manager import StateManager
+    from sprites import ChefHand, Cursor
+
+    state_manager = StateManager()
+    hand = ChefHand()
+    cursor = Cursor()
+    state_manager.all_sprites.add(*hand.sprites, layer=LAYER_HANDS)
+    state_manager.all_sprites.add(cursor, layer=LAYER_CURSOR)
+    return state_manager, hand, cursor
+
+def make_path(segments):
+    """
+    A jagged path with the given number of segments across the screen, within the top third.
+    """
+    points = []
+    for i in range(segments + 1):
+        x = 50 + (SCREEN_WIDTH - 100) * i / segments
+        y = 50 + (SCREEN_HEIGHT // 3 - 50) * (0.5 + 0.5 * math.sin(i * 0.7))
+        points.append((x, y))
+    return points
+
+def hold_fade(state_manager, fade):
+    # Keep a fade-in overlay on screen every frame when requested
+    if fade:
+        state_manager.fade_state = "FADING_IN"
+        state_manager.fade_alpha = 128
+
+def run_prep(screen, mouse, frames, ingredients, slice_speed, fade, seed):
+    """
+    Slicing workload: the mouse sweeps the spawn area at slice_speed px per frame
+    with the button held, and the board is topped up to `ingredients` every frame.
+    """
+    random.seed(seed)
+    state_manager, hand, cursor = make_components()
+    state_manager.spawn_interval = float("inf") # Spawning is driven by the benchmark
+    timer = PhaseTimer(PHASES_PREP)
+    clock = time.perf_counter_ns
+
+    mouse.pressed = True
+    x, direction = 20.0, 1
+    for frame in range(frames):
+        # Keep the session in PREP regardless of how the cuts score
+        state_manager.sanity = INITIAL_SANITY
+        hold_fade(state_manager, fade)
+        x += direction * slice_speed
+        if not 20 <= x <= SCREEN_WIDTH - 20:
+            direction = -direction
+            x = max(20, min(SCREEN_WIDTH - 20, x))
+        mouse.pos = (int(x), int(SCREEN_HEIGHT // 6 + SCREEN_HEIGHT // 8 * math.sin(frame * 0.3)))
+
+        t0 = clock()
+        while len(state_manager.ingredients) < ingredients:
+            state_manager.spawn_ingredient()
+        t1 = clock()
+        state_manager.update(hand, SIM_STEP_MS)
+        t2 = clock()
+        hand.update()
+        cursor.update()
+        t3 = clock()
+        rects = state_manager.draw(screen)
+        t4 = clock()
+        pygame.display.update(rects)
+        t5 = clock()
+        timer.record_frame((t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4))
+
+    state_manager.close()
+    return timer.summary()
+
+def run_trauma(screen, mouse, frames, path_length, slice_speed, fade, seed):
+    """
+    Path-following workload: the mouse tracks a path_length-segment nerve at
+    slice_speed px per frame with some jitter, wrapping before the finish.
+    """
+    from sprites import NervePath
+
+    random.seed(seed)
+    state_manager, hand, cursor = make_components()
+    timer = PhaseTimer(PHASES_TRAUMA)
+    clock = time.perf_counter_ns
+
+    def enter_trauma():
+        state_manager.state = "TRAUMA"
+        state_manager.reset_trauma()
+        state_manager.nerve_path = NervePath(make_path(path_length))
+        state_manager.is_grace_period = False
+
+    enter_trauma()
+    path = state_manager.nerve_path
+    points = path.points
+    mouse.pressed = False
+    distance = 0.0
+    for frame in range(frames):
+        state_manager.sanity = INITIAL_SANITY
+        hold_fade(state_manager, fade)
+        if state_manager.state != "TRAUMA":
+            enter_trauma()
+            path = state_manager.nerve_path
+            points = path.points
+
+        # Walk along the path, wrapping before the end zone so the run never completes
+        distance = (distance + slice_speed) % max(1.0, path.length - NERVE_END_ZONE - 1)
+        index = min(len(points) - 2, int(distance / path.length * (len(points) - 1)))
+        px, py = points[index]
+        mouse.pos = (int(px), int(py + random.uniform(-NERVE_DEVIATION_LIMIT, NERVE_DEVIATION_LIMIT) * 1.5))
+
+        t0 = clock()
+        path.check_deviation(mouse.pos)
+        t1 = clock()
+        state_manager.update(hand, SIM_STEP_MS)
+        t2 = clock()
+        hand.update()
+        cursor.update()
+        t3 = clock()
+        rects = state_manager.draw(screen)
+        t4 = clock()
+        pygame.display.update(rects)
+        t5 = clock()
+        timer.record_frame((t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4))
+
+    state_manager.close()
+    return timer.summary()
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+def result_key(result):
+    return (result["scenario"], tuple(sorted(result["params"].items())))
+
+def format_params(params):
+    return " ".join(f"{k}={v}" for k, v in params.items())
+
+def print_results(results):
+    print(f"{'scenario':<8} {'params':<52} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'sim fps':>9}")
+    for result in results:
+        frame = result["frame"]
+        print(f"{result['scenario']:<8} {format_params(result['params']):<52} "
+              f"{frame['p50']:>8.3f} {frame['p95']:>8.3f} {frame['p99']:>8.3f} {result['sim_fps']:>9.1f}")
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {result_key(r): r for r in baseline["results"]}
+
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}):")
+    for result in results:
+        old = previous.get(result_key(result))
+        if not old:
+            continue
+        changes = []
+        for stat in ("p50", "p95", "p99"):
+            before, after = old["frame"][stat], result["frame"][stat]
+            changes.append(f"{stat} {100 * (after - before) / before:+.1f}%" if before else f"{stat} n/a")
+        print(f"  {result['scenario']:<8} {format_params(result['params']):<52} {'  '.join(changes)}")
+
+def run_workloads(args, screen, mouse):
+    results = []
+    for scenario in args.scenarios:
+        if scenario == "prep":
+            grid = itertools.product(args.ingredients, args.slice_speeds, args.fade)
+            for ingredients, speed, fade in grid:
+                params = {"ingredients": ingredients, "slice_speed": speed, "fade": bool(fade)}
+                summary = run_prep(screen, mouse, args.frames, ingredients, speed, fade, args.seed)
+                results.append({"scenario": scenario, "params": params, **summary})
+        else:
+            grid = itertools.product(args.path_lengths, args.slice_speeds, args.fade)
+            for path_length, speed, fade in grid:
+                params = {"path_length": path_length, "slice_speed": speed, "fade": bool(fade)}
+                summary = run_trauma(screen, mouse, args.frames, path_length, speed, fade, args.seed)
+                results.append({"scenario": scenario, "params": params, **summary})
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmarks for Radicchio Kitchens.")
+    parser.add_argument("--frames", type=int, default=300, help="frames per workload")
+    parser.add_argument("--scenarios", nargs="+", default=["prep", "trauma"], choices=["prep", "trauma"])
+    parser.add_argument("--ingredients", nargs="+", type=int, default=[10, 100, 400])
+    parser.add_argument("--path-lengths", nargs="+", type=int, default=[25, 400])
+    parser.add_argument("--slice-speeds", nargs="+", type=float, default=[8, 40], help="px per frame")
+    parser.add_argument("--fade", nargs="+", type=int, default=[0, 1], choices=[0, 1],
+                        help="run with a fade overlay in progress (1) and/or without (0)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file to write results to")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    screen = pygame.display.set_mode((RENDER_WIDTH, RENDER_HEIGHT))
+    # Every workload draws its trail and fade on the same pooled surfaces, allocated here
+    # rather than in a timed frame
+    surface_pool.preallocate((RENDER_WIDTH, RENDER_HEIGHT))
+    surface_pool.preallocate((RENDER_WIDTH, RENDER_HEIGHT), pygame.SRCALPHA)
+    mouse = SyntheticMouse()
+    mouse.install()
+
+    results = []
+    try:
+        results = run_workloads(args, screen, mouse)
+    finally:
+        mouse.uninstall()
+        pygame.quit()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "frames": args.frames,
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_results(results)
+    if args.compare:
+        print_comparison(results, args.compare)
+    print(f"\nWrote {args.output}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
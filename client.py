@@ -0,0 +1,151 @@
+"""
+Test and load client for server.py.
+Opens many concurrent sessions, each driven by a scripted player (sweeping cuts in PREP,
+tracing the received nerve path in TRAUMA), and reports how many sessions the server kept
+at full tick rate, plus snapshot sizes and final states.
+
+Usage:
+    python client.py
+    python client.py --sessions 200 --seconds 30 --output client_results.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import statistics
+import sys
+import time
+
+from settings import *
+from server import (MSG_WELCOME, MSG_SNAPSHOT, PROTOCOL_VERSION, SNAP_GRACE, WELCOME, decode_snapshot,
+                    encode_input, read_message)
+
+SUSTAINED_FRACTION = 0.95 # Share of SIM_RATE a session must receive to count as sustained
+
+class ScriptedPlayer:
+    """
+    Produces one input sample per step from the latest snapshot.
+    """
+    def __init__(self, phase):
+        self.phase = phase
+        self.path = None
+        self.path_index = 0
+
+    def next_sample(self, snapshot, step):
+        if snapshot and snapshot["state"] == "TRAUMA" and self.path:
+            if not snapshot["flags"] & SNAP_GRACE:
+                self.path_index = min(len(self.path) - 1, self.path_index + 1)
+            return self.path[self.path_index], False
+        t = step + self.phase
+        x = int(SCREEN_WIDTH / 2 + (SCREEN_WIDTH / 2 - 40) * math.sin(t * 0.021))
+        y = int(SCREEN_HEIGHT / 6 + SCREEN_HEIGHT / 8 * math.sin(t * 0.37))
+        return (x, y), True
+
+    def on_snapshot(self, snapshot):
+        if "path" in snapshot:
+            self.path = snapshot["path"]
+            self.path_index = 0
+
+async def run_session(host, port, index, seconds, results):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError as e:
+        results.append({"index": index, "error": str(e)})
+        return
+    message = await read_message(reader)
+    if message is None or message[0] != MSG_WELCOME:
+        results.append({"index": index, "error": "no welcome"})
+        writer.close()
+        return
+    payload = message[1]
+    if len(payload) != WELCOME.size or WELCOME.unpack(payload)[0] != PROTOCOL_VERSION:
+        results.append({"index": index, "error": f"server speaks another protocol version (expected {PROTOCOL_VERSION})"})
+        writer.close()
+        return
+    _, session_id, seed, step_ms = WELCOME.unpack(payload)
+
+    player = ScriptedPlayer(index * 97)
+    stats = {"snapshots": 0, "bytes": 0, "latest": None}
+    deadline = time.perf_counter() + seconds
+
+    async def receive():
+        while True:
+            message = await read_message(reader)
+            if message is None:
+                return
+            message_type, payload = message
+            if message_type == MSG_SNAPSHOT:
+                snapshot = decode_snapshot(payload)
+                player.on_snapshot(snapshot)
+                stats["snapshots"] += 1
+                stats["bytes"] += len(payload)
+                stats["latest"] = snapshot
+
+    receiver = asyncio.create_task(receive())
+    step = 0
+    start = time.perf_counter()
+    while time.perf_counter() < deadline and not receiver.done():
+        writer.write(encode_input([player.next_sample(stats["latest"], step)]))
+        step += 1
+        await asyncio.sleep(max(0, start + step * step_ms / 1000 - time.perf_counter()))
+    elapsed = time.perf_counter() - start
+    writer.close()
+    receiver.cancel()
+
+    latest = stats["latest"] or {}
+    results.append({
+        "index": index,
+        "session": session_id,
+        "seed": seed,
+        "snapshots_per_second": stats["snapshots"] / elapsed,
+        "bytes_per_snapshot": stats["bytes"] / stats["snapshots"] if stats["snapshots"] else 0,
+        "state": latest.get("state"),
+        "score": latest.get("score"),
+        "sanity": latest.get("sanity"),
+        "hand_stage": latest.get("hand_stage"),
+    })
+
+async def run(args):
+    results = []
+    sessions = []
+    for i in range(args.sessions):
+        sessions.append(asyncio.create_task(run_session(args.host, args.port, i, args.seconds, results)))
+        await asyncio.sleep(args.ramp / max(1, args.sessions)) # Stagger connects
+    await asyncio.gather(*sessions)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test client for the Radicchio Kitchens server.")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=10, help="how long each session plays")
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds over which sessions connect")
+    parser.add_argument("--output", help="JSON file to write per-session results to")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    connected = [r for r in results if "error" not in r]
+    failed = len(results) - len(connected)
+    if connected:
+        rates = [r["snapshots_per_second"] for r in connected]
+        sustained = sum(rate >= SIM_RATE * SUSTAINED_FRACTION for rate in rates)
+        print(f"{len(connected)} sessions connected, {failed} failed")
+        print(f"snapshots/s per session: min {min(rates):.1f}, median {statistics.median(rates):.1f} "
+              f"(target {SIM_RATE})")
+        print(f"sustained at >= {SUSTAINED_FRACTION:.0%} of tick rate: {sustained}/{len(connected)}")
+        print(f"mean snapshot size: {statistics.mean(r['bytes_per_snapshot'] for r in connected):.1f} bytes")
+        states = {}
+        for r in connected:
+            states[r["state"]] = states.get(r["state"], 0) + 1
+        print(f"final states: {states}")
+    else:
+        print(f"No sessions connected ({failed} failed)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,183 @@
+"""
+Per-frame memory utilities: a reusable surface pool, a fixed-size ring buffer,
+and a tracemalloc-based debug guard that catches frames which allocate.
+"""
+
+import gc
+import os
+import tracemalloc
+
+import pygame
+from settings import *
+
+class SurfacePool:
+    """
+    Hands out preallocated Surfaces keyed by (size, flags).
+    Overlays acquire their surface once and release it when they are discarded,
+    so nothing full-screen is ever allocated inside the frame loop.
+    """
+    def __init__(self):
+        self.free = {}
+
+    def preallocate(self, size, flags=0, count=1):
+        key = (tuple(size), flags)
+        bucket = self.free.setdefault(key, [])
+        for _ in range(count):
+            bucket.append(pygame.Surface(size, flags))
+
+    def acquire(self, size, flags=0):
+        bucket = self.free.get((tuple(size), flags))
+        if bucket:
+            return bucket.pop()
+        return pygame.Surface(size, flags) # Pool empty: allocate (outside steady state)
+
+    def release(self, surface):
+        surface.set_alpha(None)
+        key = (surface.get_size(), surface.get_flags() & pygame.SRCALPHA)
+        self.free.setdefault(key, []).append(surface)
+
+# Shared instance used by overlay sprites
+surface_pool = SurfacePool()
+
+class RingBuffer:
+    """
+    Fixed-capacity FIFO that overwrites its oldest item when full.
+    Supports len(), indexing and iteration (oldest first), so it can be passed
+    anywhere a short sequence is expected. `version` changes whenever the contents do.
+    """
+    def __init__(self, capacity):
+        self.items = [None] * capacity
+        self.capacity = capacity
+        self.start = 0
+        self.count = 0
+        self.version = 0
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("RingBuffer index out of range")
+        return self.items[(self.start + index) % self.capacity]
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.items[(self.start + i) % self.capacity]
+
+    def append(self, item):
+        if self.count < self.capacity:
+            self.items[(self.start + self.count) % self.capacity] = item
+            self.count += 1
+        else:
+            # Full: overwrite the oldest item
+            self.items[self.start] = item
+            self.start = (self.start + 1) % self.capacity
+        self.version += 1
+
+    def clear(self):
+        if self.count:
+            for i in range(self.capacity):
+                self.items[i] = None
+            self.start = 0
+            self.count = 0
+            self.version += 1
+
+class FrameAllocationError(RuntimeError):
+    """Raised by FrameAllocationGuard when a steady-state frame allocates."""
+
+class FrameAllocationGuard:
+    """
+    Debug helper that uses tracemalloc to find frames which allocate.
+    After a warm-up period, every frame is checked for:
+    - a garbage collection running during the frame (the hitch this exists to prevent),
+    - a net increase of more than FRAME_ALLOC_RETAINED_BUDGET bytes allocated by this game's
+      code (anywhere in the call stack) and still alive at the end of the frame, and
+    - a transient peak above FRAME_ALLOC_PEAK_BUDGET bytes.
+    Offending frames are reported with their top allocation sites, and when strict,
+    FrameAllocationError is raised.
+    Only the Python heap is visible to tracemalloc; SDL pixel buffers are not.
+    """
+    def __init__(self, warmup_frames=FRAME_ALLOC_WARMUP_FRAMES, retained_budget=FRAME_ALLOC_RETAINED_BUDGET,
+                 peak_budget=FRAME_ALLOC_PEAK_BUDGET, strict=True):
+        self.warmup_frames = warmup_frames
+        self.retained_budget = retained_budget
+        self.peak_budget = peak_budget
+        self.strict = strict
+        self.frame = 0
+        self.start_snapshot = None
+        self.start_current = 0
+        self.collections = 0
+        gc.callbacks.append(self.on_gc)
+
+        self.game_dir = os.path.dirname(os.path.abspath(__file__))
+        self.filters = [
+            tracemalloc.Filter(True, os.path.join(self.game_dir, "*"), all_frames=True),
+            # Our own bookkeeping (snapshots etc.) isn't frame churn. Only allocations made
+            # right here are skipped, so the RingBuffer and pool still count when the game uses them
+            tracemalloc.Filter(False, os.path.abspath(__file__), all_frames=False),
+            tracemalloc.Filter(False, tracemalloc.__file__, all_frames=True),
+        ]
+
+    def close(self):
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
+
+    def on_gc(self, phase, info):
+        if phase == "start":
+            self.collections += 1
+
+    def innermost_game_frame(self, traceback):
+        # The deepest frame in our own code is the most useful place to point at
+        for frame in reversed(traceback):
+            if frame.filename.startswith(self.game_dir):
+                return frame
+        return traceback[-1]
+
+    def begin_frame(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(FRAME_ALLOC_TRACE_DEPTH)
+        self.frame += 1
+        if self.frame <= self.warmup_frames:
+            self.start_snapshot = None
+            return
+
+        self.start_snapshot = tracemalloc.take_snapshot().filter_traces(self.filters)
+        self.start_current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self.collections = 0
+
+    def end_frame(self, exempt=False):
+        """
+        Checks the frame started by begin_frame(). Pass exempt=True for frames that are
+        expected to allocate, such as state transitions.
+        """
+        if self.start_snapshot is None:
+            return
+        if exempt:
+            self.start_snapshot = None
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        transient = peak - self.start_current
+        collections = self.collections
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(self.filters)
+        stats = snapshot.compare_to(self.start_snapshot, "traceback")
+        self.start_snapshot = None
+
+        # Judge the net change: freelists (lists, dicts, tuples...) make blocks hop between
+        # allocation sites from frame to frame without any new memory being used
+        retained = sum(stat.size_diff for stat in stats)
+        if not collections and retained <= self.retained_budget and transient <= self.peak_budget:
+            return
+
+        lines = [f"Frame {self.frame} allocated: {retained} B retained (budget {self.retained_budget} B), "
+                 f"{transient} B transient peak (budget {self.peak_budget} B), {collections} GC runs"]
+        for stat in [stat for stat in stats if stat.size_diff > 0][:5]:
+            frame = self.innermost_game_frame(stat.traceback)
+            lines.append(f"  +{stat.size_diff} B in {stat.count_diff} blocks at {frame.filename}:{frame.lineno}")
+        report = "\n".join(lines)
+        if self.strict:
+            raise FrameAllocationError(report)
+        print(report)
@@ -0,0 +1,85 @@
+"""
+Input sources the simulation reads the player's mouse from.
+StateManager polls its source once per simulation step, so gameplay can be driven
+by the real mouse, a recorded session, or any scripted source with the same interface.
+
+poll() returns the mouse samples since the previous poll as ((x, y), left_pressed)
+pairs, oldest first. There is always at least one, and the last is the current state.
+Positions are in logical pixels (SCREEN_WIDTH x SCREEN_HEIGHT) whatever the RENDER_SCALE.
+"""
+
+import pygame
+from settings import *
+
+def logical_pos(pos):
+    """
+    Maps a window mouse position (render framebuffer pixels) to logical pixels.
+    """
+    if RENDER_SCALE == 1:
+        return pos
+    return int(pos[0] / RENDER_SCALE), int(pos[1] / RENDER_SCALE)
+
+class MouseInput:
+    """
+    Live input: collects every mouse motion and left-button event passed to handle_event(),
+    so fast strokes keep their shape between frames whatever the frame rate.
+    Steps without new events hold the last event's state (several steps can run per frame);
+    until the first event arrives, the pygame mouse is sampled instead.
+    The returned list is reused by the next poll.
+    """
+    def __init__(self):
+        self.pending = []
+        self.batch = []
+        self.last_sample = None
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEMOTION:
+            self.pending.append((logical_pos(event.pos), bool(event.buttons[0])))
+        elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP) and event.button == 1:
+            self.pending.append((logical_pos(event.pos), event.type == pygame.MOUSEBUTTONDOWN))
+
+    def poll(self):
+        batch = self.batch
+        batch.clear()
+        if self.pending:
+            batch.extend(self.pending)
+            self.pending.clear()
+            self.last_sample = batch[-1]
+        elif self.last_sample is not None:
+            batch.append(self.last_sample)
+        else:
+            batch.append((logical_pos(pygame.mouse.get_pos()), pygame.mouse.get_pressed()[0]))
+        return batch
+
+    def close(self):
+        pass
+
+class ScriptedInput:
+    """
+    Input source that plays a fixed script, one step per poll(): `steps` is a list with
+    the samples of each step, where an empty list holds the previous state.
+    Once the script runs out, the last state is held. The returned list is reused by the
+    next poll.
+    """
+    def __init__(self, steps, initial=((0, 0), False)):
+        self.steps = steps
+        self.step = 0
+        self.last_sample = initial
+        self.batch = []
+
+    def handle_event(self, event):
+        pass # Input comes from the script
+
+    def poll(self):
+        batch = self.batch
+        batch.clear()
+        if self.step < len(self.steps) and self.steps[self.step]:
+            batch.extend(self.steps[self.step])
+            self.last_sample = batch[-1]
+        else:
+            batch.append(self.last_sample)
+        self.step += 1
+        return batch
+
+    def close(self):
+        pass
@@ -5,9 +5,49 @@ Initializes Pygame, sets up the display, and runs the main game loop.
 
 import pygame
 import sys
+import gc
+import random
 from settings import *
 from state_manager import StateManager
-from sprites import ChefHand, Cursor
+from sprites import ChefHand, Cursor, ProfilerOverlay, render_px
+from assets import assets
+from audio import audio
+from post_processing import PostProcessor
+from frame_memory import FrameAllocationGuard, surface_pool
+from input_source import MouseInput
+from profiler import profiler, trace_export_path
+from telemetry import telemetry
+from replay import SessionRecorder, new_session_seed, session_log_path
+
+def show_loading_screen(screen, clock):
+    """
+    Shows a progress bar while preloaded assets decode on worker threads, pumping events
+    so the window stays responsive. Returns False if the window was closed meanwhile.
+    """
+    font = pygame.font.Font(None, render_px(36))
+    label = font.render("Loading...", True, WHITE)
+    label_rect = label.get_rect(midbottom=(RENDER_WIDTH // 2, RENDER_HEIGHT // 2 - render_px(10)))
+    bar = pygame.Rect((0, 0), (render_px(LOADING_BAR_SIZE[0]), render_px(LOADING_BAR_SIZE[1])))
+    bar.midtop = (RENDER_WIDTH // 2, RENDER_HEIGHT // 2 + render_px(10))
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+
+        done, total = assets.load_progress()
+        screen.fill(BLACK)
+        screen.blit(label, label_rect)
+        pygame.draw.rect(screen, GREY, bar, 1)
+        if total:
+            filled = bar.copy()
+            filled.width = bar.width * done // total
+            pygame.draw.rect(screen, WHITE, filled)
+        pygame.display.flip()
+
+        if done == total:
+            return True
+        clock.tick(FPS)
 
 def main():
     """
@@ -15,47 +55,149 @@ def main():
     Handles event processing, updates game state, and renders the scene.
     """
     # Initialize Pygame
+    audio.pre_init()
     pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    # Start decoding images right away; the window opens while the workers run
+    assets.preload(PRELOAD_IMAGES)
+    # Below full render scale, SDL upscales the smaller framebuffer to the window on the GPU
+    # and reports mouse positions in framebuffer pixels
+    screen = pygame.display.set_mode((RENDER_WIDTH, RENDER_HEIGHT), pygame.SCALED if RENDER_SCALE < 1 else 0)
     pygame.display.set_caption(CAPTION)
+    # Full-screen scratch surfaces for the slice trail and the death fade, so neither
+    # is allocated when it first shows up mid-session
+    surface_pool.preallocate((RENDER_WIDTH, RENDER_HEIGHT))
+    surface_pool.preallocate((RENDER_WIDTH, RENDER_HEIGHT), pygame.SRCALPHA)
     clock = pygame.time.Clock()
+    # Every cue is decoded up front (alongside the image workers), so playing one never touches the disk
+    audio.load()
     
     # Load custom cursor or use ChefHand sprite
     pygame.mouse.set_visible(False) 
+
+    if not show_loading_screen(screen, clock):
+        pygame.quit()
+        sys.exit()
     
+    # Every session is reproducible from its seed and input, which can be recorded for replay.py
+    seed = SESSION_SEED if SESSION_SEED is not None else new_session_seed()
+    input_source = MouseInput()
+    if RECORD_SESSIONS:
+        input_source = SessionRecorder(session_log_path(), seed, input_source)
+        print(f"Recording session to {input_source.path}")
+    if TELEMETRY_ENABLED:
+        telemetry.start({"seed": seed, "trainee": TELEMETRY_TRAINEE})
+
     # Initialize Game Components
-    state_manager = StateManager()
+    state_manager = StateManager(random.Random(seed), input_source)
     hand = ChefHand()
     cursor = Cursor()
-    all_sprites = pygame.sprite.Group(hand, cursor)
+    all_sprites = state_manager.all_sprites
+    all_sprites.add(*hand.sprites, layer=LAYER_HANDS)
+    all_sprites.add(cursor, layer=LAYER_CURSOR)
+    profiler_overlay = ProfilerOverlay(profiler)
+    all_sprites.add(profiler_overlay, layer=LAYER_PROFILER)
+    # Sanity-driven screen effects; the scene is drawn offscreen while they're showing
+    post_processor = PostProcessor(screen)
+
+    # Startup objects live for the whole session; keep them out of the GC's generations
+    # so collections during play only scan what the frame loop creates
+    gc.freeze()
+
+    # Debug: fail on any frame that allocates once the game has warmed up
+    alloc_guard = FrameAllocationGuard() if DEBUG_FRAME_ALLOCATIONS else None
+
+    # Fixed-timestep loop: real time accumulates in the state manager and is consumed in
+    # SIM_STEP_MS steps, and rendering interpolates between the last two steps
+    alpha = 0.0
+    previous_ticks = pygame.time.get_ticks()
+    # Adaptive pacing: ms the screen can stay as it is without input, measured after each draw
+    idle_ms = 0
 
     running = True
     while running:
+        profiler.begin_frame()
+        if alloc_guard:
+            alloc_guard.begin_frame()
+            frame_state = state_manager.state
+
         # 1. Event Handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            
-            # Pass events to state manager
-            state_manager.handle_input(event)
+        events = pygame.event.get()
+        slept_ms = 0
+        if not events and idle_ms >= PACING_MIN_IDLE_MS:
+            # Nothing will change on screen for a while: sleep until it does, or until
+            # input arrives, which brings the loop straight back to full rate
+            with profiler.section("idle"):
+                sleep_start = pygame.time.get_ticks()
+                event = pygame.event.wait(int(min(idle_ms, PACING_MAX_SLEEP_MS)))
+                slept_ms = pygame.time.get_ticks() - sleep_start
+            if event.type != pygame.NOEVENT:
+                events.append(event)
+                events.extend(pygame.event.get())
+
+        with profiler.section("events"):
+            for event in events:
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.WINDOWEXPOSED:
+                    # Window contents may have been lost while hidden; present everything again
+                    all_sprites.repaint_rect(screen.get_rect())
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == PROFILER_OVERLAY_KEY:
+                        profiler_overlay.toggle()
+                    elif event.key == PROFILER_EXPORT_KEY:
+                        path = trace_export_path()
+                        count = profiler.export_chrome_trace(path)
+                        print(f"Wrote {count} profiler events to {path}")
+
+                # Pass events to state manager
+                state_manager.handle_input(event)
 
         # 2. Update
-        state_manager.update(hand)
-        all_sprites.update()
+        with profiler.section("update"):
+            ticks = pygame.time.get_ticks()
+            # Time slept on purpose is simulated in full (catching up costs little when idle)
+            alpha = state_manager.advance(min(ticks - previous_ticks, MAX_FRAME_TIME + slept_ms), hand)
+            previous_ticks = ticks
+
+            # Hands and cursor follow the mouse directly, once per rendered frame
+            with profiler.section("hand"):
+                hand.update()
+            cursor.update()
 
         # 3. Draw
-        screen.fill(BLACK) # Clear screen
-        
-        # State Manager handles drawing game state
-        state_manager.draw(screen)
-        
-        # Draw hand on top
-        all_sprites.draw(screen)
-
-        # 4. Refresh Display
-        pygame.display.flip()
-        clock.tick(FPS)
+        # State Manager draws the game state, hands and cursor as dirty sprites
+        with profiler.section("draw"):
+            profiler_overlay.update()
+            if post_processor.set_distress(state_manager.sanity, state_manager.hand_stage):
+                all_sprites.repaint_rect(screen.get_rect())
+            dirty_rects = state_manager.draw(post_processor.target(screen), alpha)
+
+        # 4. Post-process the regions that changed
+        with profiler.section("post"):
+            dirty_rects = post_processor.apply(screen, dirty_rects)
+
+        # 5. Refresh Display (only the regions that changed)
+        with profiler.section("flip"):
+            pygame.display.update(dirty_rects)
+
+        # 6. Pacing: with no animation running, the next frame can wait for the next change
+        idle_ms = 0
+        if ADAPTIVE_PACING and not profiler_overlay.visible:
+            if pygame.display.get_active():
+                idle_ms = state_manager.time_until_change() - state_manager.accumulator
+            else:
+                idle_ms = PACING_MAX_SLEEP_MS # Minimized: nothing to show, just keep simulating
+
+        if alloc_guard:
+            # State transitions (e.g. building a new nerve path) are allowed to allocate
+            alloc_guard.end_frame(exempt=state_manager.state != frame_state)
+        with profiler.section("tick"):
+            clock.tick(FPS)
+        profiler.end_frame()
 
+    state_manager.close()
+    input_source.close()
+    telemetry.stop()
     pygame.quit()
     sys.exit()
 
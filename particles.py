@@ -0,0 +1,207 @@
+"""
+Particle effects: juice and vein fragments when an ingredient is cut, blood spatter when
+the nerve is injured.
+Particle state lives in preallocated NumPy arrays of fixed capacity, so thousands of
+particles cost a handful of whole-array operations and one batched pixel write per frame
+rather than a Python object each. Particles are purely visual; without NumPy none are shown.
+"""
+
+import pygame
+from settings import *
+from sprites import RenderSprite, render_px
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Particle kinds (indices into PARTICLE_COLORS)
+JUICE = 0
+FRAGMENT = 1
+BLOOD = 2
+
+class ParticleSystem(RenderSprite):
+    """
+    Every particle in one set of column arrays, drawn as a single sprite.
+    Every particle lives exactly PARTICLE_LIFETIME ms, so slots are handed out round-robin:
+    the next slot always holds the oldest particle, and emitting more than PARTICLE_CAPACITY
+    within one lifetime just cuts the oldest short.
+    Particles fly ballistically, so where each one is follows directly from its age: there
+    is no per-step integration, and drawing at an interpolated time is exact.
+    While any particle is alive, each frame runs the same whole-array operations over every
+    slot (unused and expired slots come out hidden) into preallocated scratch arrays, so a
+    frame allocates nothing; nothing runs once all particles have expired.
+    The canvas is colorkeyed rather than per-pixel alpha, which blits several times faster
+    over a wide spray; instead of fading, each particle vanishes after its own random share
+    of the lifetime, so a burst thins out.
+    Positions are logical pixels, velocities px per ms and times simulation ms.
+    """
+    def __init__(self, capacity=PARTICLE_CAPACITY, seed=0):
+        super().__init__()
+        self.capacity = capacity
+        # Cosmetic randomness has its own generator, so effects never disturb gameplay's;
+        # it is seeded so a replayed session also looks the same
+        self.rng = np.random.default_rng(seed)
+        self.x0 = np.zeros(capacity)
+        self.y0 = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.born = np.full(capacity, -1e9) # Long expired
+        self.fade = np.ones(capacity) # Share of the lifetime the particle stays visible
+        self.kind = np.zeros(capacity, np.intp)
+        self.next_slot = 0
+        self.last_emitted = -1e9
+
+        # Per-frame scratch
+        self.age = np.zeros(capacity)
+        self.px = np.zeros(capacity)
+        self.py = np.zeros(capacity)
+        self.fade_end = np.zeros(capacity)
+        self.hidden = np.zeros(capacity, bool)
+        self.outside = np.zeros(capacity, bool)
+        self.index = np.zeros(capacity, np.intp)
+        self.offset = np.zeros(capacity, np.intp)
+        self.colors = np.zeros(capacity, np.uint32)
+
+        self.size = render_px(PARTICLE_SIZE)
+        self.canvas = None # Created with the render layers or for the first particle, so headless sessions never need one
+        self.palette = None
+        self.row_pixels = 0
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.source_rect = pygame.Rect(0, 0, 0, 0)
+
+    def active(self, now):
+        """
+        Whether any particle is still alive at `now`.
+        """
+        return now - self.last_emitted < PARTICLE_LIFETIME
+
+    def emit(self, now, pos, count, kind, angle, spread, speed):
+        """
+        Emits `count` particles of `kind` from logical `pos`, heading `angle` degrees
+        (Cartesian, Y up, like StateManager.slice_angle) give or take `spread`, at a speed
+        between speed[0] and speed[1] px per ms.
+        """
+        count = min(count, self.capacity)
+        slots = np.arange(self.next_slot, self.next_slot + count) % self.capacity
+        self.next_slot = (self.next_slot + count) % self.capacity
+
+        rng = self.rng
+        theta = np.radians(angle + rng.uniform(-spread, spread, count))
+        speeds = rng.uniform(speed[0], speed[1], count)
+        self.x0[slots] = pos[0]
+        self.y0[slots] = pos[1]
+        self.vx[slots] = np.cos(theta) * speeds
+        self.vy[slots] = -np.sin(theta) * speeds
+        self.born[slots] = now
+        self.fade[slots] = rng.uniform(0.5, 1.0, count)
+        self.kind[slots] = kind
+        self.last_emitted = now
+
+    def emit_slice(self, now, pos, angle):
+        # Juice sprays along the stroke; vein fragments fly off both sides of the cut
+        self.emit(now, pos, PARTICLE_SLICE_JUICE, JUICE, angle, 25, (0.15, 0.45))
+        self.emit(now, pos, PARTICLE_SLICE_FRAGMENTS // 2, FRAGMENT, angle + 90, 20, (0.05, 0.2))
+        self.emit(now, pos, PARTICLE_SLICE_FRAGMENTS - PARTICLE_SLICE_FRAGMENTS // 2, FRAGMENT,
+                  angle - 90, 20, (0.05, 0.2))
+
+    def emit_blood(self, now, pos):
+        self.emit(now, pos, PARTICLE_BLOOD, BLOOD, 90, 180, (0.05, 0.3))
+
+    def create_canvas(self):
+        """
+        Creates the canvas and draws one throwaway particle, so NumPy's one-off setup for
+        the draw path happens here rather than in the frame the first burst appears.
+        """
+        # 32-bit, so the pixel buffer can be addressed as one uint32 per pixel
+        self.canvas = pygame.Surface((RENDER_WIDTH, RENDER_HEIGHT), 0, 32)
+        self.canvas.set_colorkey(BLACK)
+        self.image = self.canvas
+        self.palette = np.array([self.canvas.map_rgb(color) for color in PARTICLE_COLORS], np.uint32)
+        self.row_pixels = self.canvas.get_pitch() // 4
+
+        born = self.born[0]
+        self.born[0] = 0
+        self.render(0)
+        self.born[0] = born
+        self.canvas.fill(BLACK)
+        self.source_rect.size = (0, 0)
+
+    def set_time(self, now):
+        """
+        Redraws the particles as they are at `now`.
+        """
+        if self.canvas is None:
+            if not self.active(now):
+                return
+            self.create_canvas()
+
+        # Clear only what the previous frame drew
+        self.image.fill(BLACK, self.source_rect)
+        if not (self.active(now) and self.render(now)):
+            if self.source_rect.size != (0, 0):
+                self.source_rect.size = (0, 0)
+                self.rect.size = (0, 0)
+                self.dirty = 1
+            return
+        self.rect.topleft = self.source_rect.topleft
+        self.rect.size = self.source_rect.size
+        self.dirty = 1
+
+    def render(self, now):
+        """
+        Draws the visible particles into the canvas and sets source_rect to their bounding box.
+        Returns False if none are visible.
+        """
+        size = self.size
+        age = np.subtract(now, self.born, out=self.age)
+        np.maximum(age, 0, out=age) # Emitted in a step the render hasn't caught up to yet
+
+        # x = x0 + vx * t and y = y0 + vy * t + g * t^2 / 2, in render pixels
+        px = np.multiply(self.vx, age, out=self.px)
+        px += self.x0
+        px *= RENDER_SCALE
+        py = np.multiply(age, 0.5 * PARTICLE_GRAVITY, out=self.py)
+        py += self.vy
+        py *= age
+        py += self.y0
+        py *= RENDER_SCALE
+
+        hidden = np.less(px, 0, out=self.hidden)
+        outside = self.outside
+        np.logical_or(hidden, np.less(py, 0, out=outside), out=hidden)
+        np.logical_or(hidden, np.greater(px, RENDER_WIDTH - size, out=outside), out=hidden)
+        np.logical_or(hidden, np.greater(py, RENDER_HEIGHT - size, out=outside), out=hidden)
+        fade_end = np.multiply(self.fade, PARTICLE_LIFETIME, out=self.fade_end)
+        np.logical_or(hidden, np.greater_equal(age, fade_end, out=outside), out=hidden)
+        first_visible = int(np.argmin(hidden))
+        if hidden[first_visible]:
+            return False
+        colors = np.take(self.palette, self.kind, out=self.colors, mode="clip")
+
+        # Hidden particles become duplicates of a visible one, so the batch can draw them all
+        np.copyto(px, px[first_visible], where=hidden)
+        np.copyto(py, py[first_visible], where=hidden)
+        np.copyto(colors, colors[first_visible], where=hidden)
+
+        # Flat pixel index of each particle's top-left corner
+        index = self.index
+        offset = self.offset
+        np.copyto(index, py, casting="unsafe")
+        index *= self.row_pixels
+        np.copyto(offset, px, casting="unsafe")
+        index += offset
+
+        buffer = self.image.get_buffer()
+        pixels = np.frombuffer(buffer, np.uint32)
+        for dy in range(size):
+            for dx in range(size):
+                np.add(index, dy * self.row_pixels + dx, out=offset)
+                np.put(pixels, offset, colors)
+        del pixels, buffer # Unlocks the canvas for blitting
+
+        left = int(px.min())
+        top = int(py.min())
+        self.source_rect.topleft = (left, top)
+        self.source_rect.size = (int(px.max()) - left + size, int(py.max()) - top + size)
+        return True
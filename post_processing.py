@@ -0,0 +1,288 @@
+"""
+Sanity-driven post-processing: a vignette, desaturation, chromatic shift and a subtle
+screen warp that deepen as sanity drops and the hands get hurt.
+The scene is drawn into an offscreen surface and only the regions redrawn this frame are
+processed into the screen, with whole-array NumPy operations on packed 32-bit pixels.
+Everything that depends on the distress level (the vignette mask and the warp's row
+displacements) is built once per level up front. Without NumPy the scene is shown as is.
+"""
+
+import math
+import time
+
+import pygame
+from settings import *
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# In order of importance: over budget, the last one still on is dropped first
+EFFECTS = ("vignette", "desaturation", "chromatic shift", "warp")
+UFUNC_BUFFER_SIZE = 64 # Elements
+
+class PostProcessor:
+    """
+    Processes dirty regions of the offscreen scene into the screen.
+    Pixels are handled packed, one uint32 each: channels are scaled two at a time in the
+    even and odd bytes (SWAR), and the shifts move whole pixels or masked channels, so a
+    region costs a few dozen array operations however many sprites were drawn into it.
+    Every operation writes into preallocated full-screen scratch arrays, so a frame
+    allocates nothing beyond array views.
+    Processing time is measured every frame: after POST_FX_DEGRADE_FRAMES frames over
+    POST_FX_BUDGET_MS the least important effect still on is dropped (down to the vignette
+    alone), and after POST_FX_RECOVER_FRAMES frames well under it one is restored.
+    Nothing is processed until the player is distressed, so a calm game draws straight
+    to the screen.
+    """
+    def __init__(self, screen):
+        self.active = False
+        self.processing = False
+        self.scene = None
+        self.configured = None # (level, effects) processing is currently set up for
+        self.level = 0
+        self.effects = len(EFFECTS)
+        self.over_budget = 0
+        self.under_budget = 0
+        if not POST_FX_ENABLED:
+            return
+        if np is None:
+            print("Post-processing unavailable: NumPy is not installed")
+            return
+        if screen.get_bitsize() != 32:
+            print(f"Post-processing unavailable for a {screen.get_bitsize()}-bit display")
+            return
+
+        self.width, self.height = screen.get_size()
+        self.scene = pygame.Surface(screen.get_size(), 0, screen)
+        red_mask, _, blue_mask, _ = screen.get_masks()
+        self.red_mask = red_mask
+        self.blue_mask = blue_mask
+        self.rest_mask = ~(red_mask | blue_mask) & 0xFFFFFFFF # Green and any padding
+        red_shift, green_shift, blue_shift, _ = screen.get_shifts()
+        self.luma_shifts = ((red_shift, 77), (green_shift, 150), (blue_shift, 29)) # 8.8 fixed point
+        self.gray_spread = (1 << red_shift) | (1 << green_shift) | (1 << blue_shift)
+
+        # Scratch in the same memory order as surfarray's (width, height) pixel views
+        self.work = self.scratch_array()
+        self.scratch = self.scratch_array()
+        self.gray = self.scratch_array()
+        self.factor = self.scratch_array()
+
+        # Per level: vignette darkness (0..255 per pixel) and the warp as row bands
+        falloff = self.vignette_falloff()
+        self.shades = [None]
+        self.warps = [None]
+        for level in range(1, POST_FX_LEVELS + 1):
+            strength = level / POST_FX_LEVELS
+            shade = np.empty((self.height, self.width), np.uint8).T
+            np.copyto(shade, np.rint(falloff * (255 * POST_FX_VIGNETTE * strength)), casting="unsafe")
+            self.shades.append(shade)
+            self.warps.append(self.warp_bands(POST_FX_WARP_AMPLITUDE * strength))
+        self.unwarped = ((0, self.height, 0),)
+        self.active = True
+
+    def scratch_array(self):
+        return np.zeros((self.height, self.width), np.uint32).T
+
+    def vignette_falloff(self):
+        """
+        0 inside POST_FX_VIGNETTE_RADIUS of the centre, easing to 1 in the corners.
+        Distances are relative to the half-screen, so the vignette follows its aspect ratio.
+        """
+        x = (np.arange(self.width) + 0.5) / (self.width / 2) - 1
+        y = (np.arange(self.height) + 0.5) / (self.height / 2) - 1
+        distance = np.sqrt(x[:, None] ** 2 + y[None, :] ** 2)
+        t = np.clip((distance - POST_FX_VIGNETTE_RADIUS) / (math.sqrt(2) - POST_FX_VIGNETTE_RADIUS), 0, 1)
+        return t * t * (3 - 2 * t)
+
+    def warp_bands(self, amplitude):
+        """
+        The warp as (top, bottom, dx) runs of rows that all shift dx px sideways.
+        """
+        amplitude *= RENDER_SCALE
+        wavelength = POST_FX_WARP_WAVELENGTH * RENDER_SCALE
+        bands = []
+        for y in range(self.height):
+            dx = round(amplitude * math.sin(2 * math.pi * y / wavelength))
+            if bands and bands[-1][2] == dx:
+                bands[-1][1] = y + 1
+            else:
+                bands.append([y, y + 1, dx])
+        return tuple(tuple(band) for band in bands)
+
+    def set_distress(self, sanity, hand_stage):
+        """
+        Picks the effect level for the current sanity and hand stage. Returns True if
+        the look of the whole screen changes, in which case it must all be redrawn.
+        """
+        if not self.active:
+            return False
+        distress = min(1.0, 1 - max(sanity, 0) / INITIAL_SANITY + POST_FX_STAGE_DISTRESS * hand_stage)
+        self.level = min(POST_FX_LEVELS, int(distress * POST_FX_LEVELS))
+        configured = (self.level, self.effects)
+        if configured == self.configured:
+            return False
+        self.configured = configured
+        self.configure()
+        return True
+
+    def configure(self):
+        level, effects = self.configured
+        self.processing = level > 0
+        if not self.processing:
+            return
+        strength = level / POST_FX_LEVELS
+        self.shade = self.shades[level]
+        self.desaturation = round(256 * POST_FX_DESATURATION * strength) if effects > 1 else 0
+        chroma = round(POST_FX_CHROMA_SHIFT * RENDER_SCALE * strength) if effects > 2 else 0
+        self.bands = self.warps[level] if effects > 3 else self.unwarped
+        if chroma:
+            self.channels = ((self.red_mask, chroma), (self.rest_mask, 0), (self.blue_mask, -chroma))
+        else:
+            self.channels = ((0xFFFFFFFF, 0),)
+        # How far sideways a pixel can be read from
+        self.reach = chroma + max(abs(dx) for _, _, dx in self.bands)
+
+    def target(self, screen):
+        """
+        The surface to draw the scene into this frame.
+        """
+        return self.scene if self.processing else screen
+
+    def apply(self, screen, dirty_rects):
+        """
+        Processes the scene's `dirty_rects` into `screen`.
+        Returns the list of screen rects that changed, for pygame.display.update().
+        """
+        if not self.processing:
+            return dirty_rects
+        start = time.perf_counter()
+        # A shifted pixel shows up to `reach` px from where it was drawn. The rects are the
+        # draw's own fresh copies, so they're widened in place
+        for rect in dirty_rects:
+            left = max(rect.left - self.reach, 0)
+            rect.width = min(rect.right + self.reach, self.width) - left
+            rect.left = left
+
+        source = pygame.surfarray.pixels2d(self.scene)
+        # NumPy gathers the short rows of a region into buffers of this many elements, which
+        # by default means allocating tens of KB per operation; small ones cost nothing extra
+        buffer_size = np.setbufsize(UFUNC_BUFFER_SIZE)
+        try:
+            for rect in dirty_rects:
+                x0, x1, y0, y1 = rect.left, rect.right, rect.top, rect.bottom
+                if self.reach:
+                    self.displace(source, x0, x1, y0, y1)
+                else:
+                    np.copyto(self.work[x0:x1, y0:y1], source[x0:x1, y0:y1])
+                self.grade(x0, x1, y0, y1)
+                # Locked only for the copy, which keeps the frame's peak memory down
+                output = pygame.surfarray.pixels2d(screen)
+                np.copyto(output[x0:x1, y0:y1], self.work[x0:x1, y0:y1])
+                del output
+        finally:
+            np.setbufsize(buffer_size)
+        del source # Unlocks the scene for the next frame's blits
+        self.measure((time.perf_counter() - start) * 1000)
+        return dirty_rects
+
+    def grade(self, x0, x1, y0, y1):
+        """
+        Desaturates and vignettes work[x0:x1, y0:y1] in place.
+        Each channel becomes (a * channel + b * gray) / 256, where a + b is the vignette's
+        brightness (256 - shade) and b the share of it that is desaturated.
+        """
+        work = self.work[x0:x1, y0:y1]
+        scratch = self.scratch[x0:x1, y0:y1]
+        factor = self.factor[x0:x1, y0:y1]
+        np.copyto(factor, self.shade[x0:x1, y0:y1])
+        np.subtract(256, factor, out=factor)
+        lanes = scratch
+        if self.desaturation:
+            gray = self.gray[x0:x1, y0:y1]
+            self.luma(work, scratch, gray)
+            brightness = factor
+            factor = scratch
+            np.multiply(brightness, 256 - self.desaturation, out=factor)
+            np.right_shift(factor, 8, out=factor)
+            np.subtract(brightness, factor, out=brightness)
+            np.multiply(gray, brightness, out=gray)
+            np.right_shift(gray, 16, out=gray)
+            np.multiply(gray, self.gray_spread, out=gray)
+            lanes = brightness # Free again
+
+        # Even and odd bytes scaled separately, so channels can't carry into each other
+        np.bitwise_and(work, 0x00FF00FF, out=lanes)
+        np.multiply(lanes, factor, out=lanes)
+        np.right_shift(lanes, 8, out=lanes)
+        np.bitwise_and(lanes, 0x00FF00FF, out=lanes)
+        np.right_shift(work, 8, out=work)
+        np.bitwise_and(work, 0x00FF00FF, out=work)
+        np.multiply(work, factor, out=work)
+        np.bitwise_and(work, 0xFF00FF00, out=work)
+        np.bitwise_or(work, lanes, out=work)
+        if self.desaturation:
+            np.add(work, gray, out=work)
+
+    def luma(self, pixels, scratch, out):
+        """
+        Luma of packed `pixels` in 8.8 fixed point, into `out`.
+        """
+        for i, (shift, weight) in enumerate(self.luma_shifts):
+            channel = out if i == 0 else scratch
+            np.right_shift(pixels, shift, out=channel)
+            np.bitwise_and(channel, 0xFF, out=channel)
+            np.multiply(channel, weight, out=channel)
+            if i:
+                np.add(out, channel, out=out)
+
+    def displace(self, source, x0, x1, y0, y1):
+        """
+        Copies the scene into work with each band of rows shifted by the warp, and red
+        and blue pulled apart by the chromatic shift.
+        """
+        work = self.work
+        scratch = self.scratch
+        for top, bottom, dx in self.bands:
+            if bottom <= y0:
+                continue
+            if top >= y1:
+                break
+            top = max(top, y0)
+            bottom = min(bottom, y1)
+            for i, (mask, offset) in enumerate(self.channels):
+                shift = dx + offset
+                out = work if i == 0 else scratch
+                # Columns whose source would be off screen keep their own pixel
+                lo = min(max(x0, shift), x1)
+                hi = max(min(x1, self.width + shift), lo)
+                np.bitwise_and(source[lo - shift:hi - shift, top:bottom], mask, out=out[lo:hi, top:bottom])
+                if lo > x0:
+                    np.bitwise_and(source[x0:lo, top:bottom], mask, out=out[x0:lo, top:bottom])
+                if hi < x1:
+                    np.bitwise_and(source[hi:x1, top:bottom], mask, out=out[hi:x1, top:bottom])
+                if i:
+                    np.bitwise_or(work[x0:x1, top:bottom], out[x0:x1, top:bottom], out=work[x0:x1, top:bottom])
+
+    def measure(self, ms):
+        """
+        Drops or restores an effect based on how long processing has been taking.
+        The change takes effect at the next set_distress(), which asks for a full redraw.
+        """
+        if ms > POST_FX_BUDGET_MS:
+            self.under_budget = 0
+            self.over_budget += 1
+            if self.over_budget >= POST_FX_DEGRADE_FRAMES and self.effects > 1:
+                self.over_budget = 0
+                self.effects -= 1
+        else:
+            self.over_budget = 0
+            if ms < POST_FX_BUDGET_MS / 2 and self.effects < len(EFFECTS):
+                self.under_budget += 1
+                if self.under_budget >= POST_FX_RECOVER_FRAMES:
+                    self.under_budget = 0
+                    self.effects += 1
+            else:
+                self.under_budget = 0
@@ -0,0 +1,175 @@
+"""
+Always-on frame profiler.
+Records per-phase and per-subsystem timings into fixed-size ring buffers, so the
+last few seconds of play can be inspected in-game or exported as a Chrome trace
+(chrome://tracing, ui.perfetto.dev) after a stutter.
+"""
+
+import json
+import os
+import time
+from array import array
+
+from settings import *
+
+perf_counter_ns = time.perf_counter_ns
+
+class ProfileSection:
+    """
+    Reusable timing scope for one named section: `with profiler.section("draw"): ...`
+    Sections are cached per name, so entering one doesn't allocate.
+    """
+    __slots__ = ("profiler", "index", "start")
+
+    def __init__(self, profiler, index):
+        self.profiler = profiler
+        self.index = index
+        self.start = 0
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.profiler.record(self.index, self.start, perf_counter_ns())
+        return False
+
+class FrameProfiler:
+    """
+    Two ring buffers, both preallocated:
+    - per frame: start time, duration and each section's total time within the frame
+      (last `frame_capacity` frames), and
+    - per section run: section, start and duration (last `event_capacity` runs),
+      which is what the trace export is built from.
+    Times are perf_counter_ns values.
+    """
+    def __init__(self, frame_capacity=PROFILER_FRAME_CAPACITY, event_capacity=PROFILER_EVENT_CAPACITY,
+                 sections=PROFILER_SECTIONS):
+        self.enabled = PROFILER_ENABLED
+        self.frame_capacity = frame_capacity
+        self.event_capacity = event_capacity
+
+        self.names = []
+        self.sections = {}
+        self.section_totals = [] # Per section: ns spent in each frame slot
+
+        self.frame_count = 0 # Frames completed
+        self.frame_slot = 0
+        self.frame_starts = array("q", [0]) * frame_capacity
+        self.frame_durations = array("q", [0]) * frame_capacity
+
+        self.event_count = 0
+        self.event_sections = array("i", [0]) * event_capacity
+        self.event_starts = array("q", [0]) * event_capacity
+        self.event_durations = array("q", [0]) * event_capacity
+
+        for name in sections:
+            self.section(name)
+
+    def section(self, name):
+        section = self.sections.get(name)
+        if section is None:
+            section = ProfileSection(self, len(self.names))
+            self.sections[name] = section
+            self.names.append(name)
+            self.section_totals.append(array("q", [0]) * self.frame_capacity)
+        return section
+
+    def record(self, index, start, end):
+        if not self.enabled:
+            return
+        duration = end - start
+        slot = self.event_count % self.event_capacity
+        self.event_sections[slot] = index
+        self.event_starts[slot] = start
+        self.event_durations[slot] = duration
+        self.event_count += 1
+        self.section_totals[index][self.frame_slot] += duration
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        slot = self.frame_slot
+        self.frame_starts[slot] = perf_counter_ns()
+        for totals in self.section_totals:
+            totals[slot] = 0
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        slot = self.frame_slot
+        self.frame_durations[slot] = perf_counter_ns() - self.frame_starts[slot]
+        self.frame_count += 1
+        self.frame_slot = self.frame_count % self.frame_capacity
+
+    def recent_slots(self, frames):
+        # Ring slots of the last `frames` completed frames, oldest first
+        frames = min(frames, self.frame_count, self.frame_capacity)
+        first = self.frame_count - frames
+        return [(first + i) % self.frame_capacity for i in range(frames)]
+
+    def recent_frame_times(self, frames):
+        """
+        Durations (ms) of the last `frames` completed frames, oldest first.
+        """
+        return [self.frame_durations[slot] / 1e6 for slot in self.recent_slots(frames)]
+
+    def worst_offenders(self, frames, count):
+        """
+        The `count` busy sections with the highest per-frame time over the last `frames` frames,
+        as (name, average ms, max ms), worst first.
+        """
+        slots = self.recent_slots(frames)
+        if not slots:
+            return []
+        stats = []
+        for name, totals in zip(self.names, self.section_totals):
+            if name in PROFILER_IDLE_SECTIONS:
+                continue
+            values = [totals[slot] for slot in slots]
+            stats.append((name, sum(values) / len(values) / 1e6, max(values) / 1e6))
+        stats.sort(key=lambda stat: stat[2], reverse=True)
+        return stats[:count]
+
+    def export_chrome_trace(self, path):
+        """
+        Writes the buffered frames and section runs as Chrome trace event JSON.
+        Returns the number of events written.
+        """
+        events = []
+        slots = self.recent_slots(self.frame_capacity)
+        runs = min(self.event_count, self.event_capacity)
+        first_run = self.event_count - runs
+
+        # Timestamps are relative to the oldest buffered frame or section run
+        starts = [self.frame_starts[slot] for slot in slots[:1]]
+        if runs:
+            starts.append(self.event_starts[first_run % self.event_capacity])
+        origin = min(starts, default=0)
+
+        first_frame = self.frame_count - len(slots)
+        for i, slot in enumerate(slots):
+            events.append({
+                "name": "frame", "cat": "frame", "ph": "X", "pid": 1, "tid": 1,
+                "ts": (self.frame_starts[slot] - origin) / 1000,
+                "dur": self.frame_durations[slot] / 1000,
+                "args": {"frame": first_frame + i},
+            })
+        for i in range(first_run, self.event_count):
+            slot = i % self.event_capacity
+            events.append({
+                "name": self.names[self.event_sections[slot]], "cat": "section", "ph": "X", "pid": 1, "tid": 1,
+                "ts": (self.event_starts[slot] - origin) / 1000,
+                "dur": self.event_durations[slot] / 1000,
+            })
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+def trace_export_path(trace_dir=PROFILER_TRACE_DIR):
+    return os.path.join(trace_dir, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+
+# Shared instance used by the main loop and instrumented subsystems
+profiler = FrameProfiler()
@@ -0,0 +1,222 @@
+"""
+Deterministic session recording and headless replay.
+
+A session is fully determined by its RNG seed and the input seen at each simulation step,
+so a recording is just those: a small header followed by a record for every mouse sample
+of each step whose input differs from simply holding the previous state.
+Replaying feeds the records back through a fresh StateManager with the same seed, stepping
+as fast as the CPU allows instead of at SIM_RATE.
+
+Usage:
+    python replay.py sessions/*.rkrec
+    python replay.py session.rkrec --draw --output replay_results.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import struct
+import sys
+import time
+
+import pygame
+from settings import *
+
+# Log layout: header, then records until an end record (or EOF, if the game crashed)
+# Header: magic, format version, seed, simulation step (ms)
+# Record: steps since the previous record, x, y, flags
+# Records with a step delta of 0 are further samples within the same step, oldest first.
+# Version 1 logs (one sample per step) read the same way.
+LOG_MAGIC = b"RKSL"
+LOG_VERSION = 2
+LOG_READABLE_VERSIONS = (1, 2)
+LOG_HEADER = struct.Struct("<4sHQd")
+LOG_RECORD = struct.Struct("<HhhB")
+FLAG_PRESSED = 0x01
+FLAG_END = 0x40
+MAX_STEP_GAP = 0xFFFF
+
+def new_session_seed():
+    return random.SystemRandom().randrange(2 ** 32)
+
+def session_log_path(log_dir=SESSION_LOG_DIR):
+    return os.path.join(log_dir, time.strftime("session-%Y%m%d-%H%M%S.rkrec"))
+
+class SessionRecorder:
+    """
+    Input source wrapper that records everything the simulation polls.
+    Steps where the mouse is just held still write nothing; records are buffered
+    by the file object and never block the frame loop on disk writes.
+    """
+    def __init__(self, path, seed, source, step_ms=SIM_STEP_MS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.source = source
+        self.file = open(path, "wb")
+        self.file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, seed, step_ms))
+        self.step = 0
+        self.last_step = 0
+        self.last_input = None
+
+    def handle_event(self, event):
+        self.source.handle_event(event)
+
+    def poll(self):
+        samples = self.source.poll()
+        pos, pressed = samples[-1]
+        state = (pos, bool(pressed))
+        if len(samples) > 1 or state != self.last_input:
+            for x_y, sample_pressed in samples:
+                self.write_record(x_y[0], x_y[1], FLAG_PRESSED if sample_pressed else 0)
+            self.last_input = state
+        self.step += 1
+        return samples
+
+    def write_record(self, x, y, flags):
+        gap = self.step - self.last_step
+        # Bridge gaps too long for one record by repeating the input held until now
+        while gap > MAX_STEP_GAP:
+            (px, py), pressed = self.last_input
+            self.file.write(LOG_RECORD.pack(MAX_STEP_GAP, px, py, FLAG_PRESSED if pressed else 0))
+            gap -= MAX_STEP_GAP
+        self.file.write(LOG_RECORD.pack(gap, x, y, flags))
+        self.last_step = self.step
+
+    def close(self):
+        if self.file.closed:
+            return
+        x, y = self.last_input[0] if self.last_input else (0, 0)
+        self.write_record(x, y, FLAG_END)
+        self.file.close()
+        self.source.close()
+
+class SessionLog:
+    """
+    A recording loaded into memory: seed, step size and a list of
+    (step, (x, y), pressed) samples, plus the session length in steps.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < LOG_HEADER.size:
+            raise ValueError(f"{path}: not a session log (file too short)")
+        magic, version, self.seed, self.step_ms = LOG_HEADER.unpack_from(data)
+        if magic != LOG_MAGIC or version not in LOG_READABLE_VERSIONS:
+            raise ValueError(f"{path}: not a supported session log (version {version})")
+
+        self.path = path
+        self.samples = []
+        self.complete = False
+        step = 0
+        body_end = len(data) - (len(data) - LOG_HEADER.size) % LOG_RECORD.size # Drop a torn tail
+        for gap, x, y, flags in LOG_RECORD.iter_unpack(memoryview(data)[LOG_HEADER.size:body_end]):
+            step += gap
+            if flags & FLAG_END:
+                self.complete = True
+                break
+            self.samples.append((step, (x, y), bool(flags & FLAG_PRESSED)))
+        self.steps = step
+
+class ReplayInput:
+    """
+    Input source that plays a SessionLog back, one step per poll().
+    """
+    def __init__(self, log):
+        self.samples = log.samples
+        self.next_sample = 0
+        self.step = 0
+        self.state = ((0, 0), False)
+        self.batch = []
+
+    def handle_event(self, event):
+        pass # Input comes from the log
+
+    def poll(self):
+        samples = self.samples
+        batch = self.batch
+        batch.clear()
+        while self.next_sample < len(samples) and samples[self.next_sample][0] == self.step:
+            _, pos, pressed = samples[self.next_sample]
+            batch.append((pos, pressed))
+            self.next_sample += 1
+        if batch:
+            self.state = batch[-1]
+        else:
+            batch.append(self.state) # Held since the last recorded sample
+        self.step += 1
+        return batch
+
+    def close(self):
+        pass
+
+def replay_session(log, screen=None):
+    """
+    Re-simulates a recorded session headlessly and returns its outcome.
+    With a screen, every step is also drawn, so rendering is covered too.
+    """
+    # Imported lazily so callers can set up the display first
+    from state_manager import StateManager
+
+    if log.step_ms != SIM_STEP_MS:
+        print(f"Warning: {log.path} was recorded at {log.step_ms:g} ms steps, replaying at {SIM_STEP_MS:g} ms")
+
+    state_manager = StateManager(random.Random(log.seed), ReplayInput(log))
+    start = time.perf_counter()
+    for _ in range(log.steps):
+        state_manager.update(None, SIM_STEP_MS)
+        if screen is not None:
+            state_manager.draw(screen)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "log": log.path,
+        "seed": log.seed,
+        "steps": log.steps,
+        "complete": log.complete,
+        "state": state_manager.state,
+        "score": state_manager.score,
+        "sanity": state_manager.sanity,
+        "hand_stage": state_manager.hand_stage,
+        "sim_seconds": log.steps * SIM_STEP_MS / 1000,
+        "wall_seconds": elapsed,
+        "speedup": log.steps * SIM_STEP_MS / 1000 / elapsed if elapsed else 0.0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded Radicchio Kitchens sessions headlessly.")
+    parser.add_argument("logs", nargs="+", help="session logs (globs are expanded)")
+    parser.add_argument("--draw", action="store_true", help="also render every step to an offscreen display")
+    parser.add_argument("--output", help="JSON file to write per-session results to")
+    args = parser.parse_args(argv)
+
+    paths = [p for pattern in args.logs for p in (sorted(glob.glob(pattern)) or [pattern])]
+
+    # Headless: must be set before pygame initializes its video/audio subsystems
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+    screen = pygame.display.set_mode((RENDER_WIDTH, RENDER_HEIGHT)) if args.draw else None
+
+    results = []
+    for path in paths:
+        try:
+            log = SessionLog(path)
+        except (OSError, ValueError) as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        result = replay_session(log, screen)
+        results.append(result)
+        print(f"{path}: {result['steps']} steps ({result['sim_seconds']:.0f}s) in {result['wall_seconds']:.2f}s "
+              f"({result['speedup']:.0f}x) -> {result['state']} score={result['score']} "
+              f"sanity={result['sanity']} hand_stage={result['hand_stage']}"
+              + ("" if result["complete"] else " [truncated log]"))
+    pygame.quit()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,91 @@
+"""
+Timers on simulated time.
+Pending game events (the next spawn, each ingredient's warning and expiry, the next blink
+edge) wait in one min-heap ordered by due time, so a step handles just the events that are
+due instead of polling every timer and ingredient, and the next wake-up is the heap's head.
+"""
+
+import heapq
+import math
+
+# Timer kinds
+TIMER_SPAWN = "spawn"
+TIMER_WARNING = "warning"
+TIMER_BLINK = "blink"
+TIMER_EXPIRE = "expire"
+
+def earliest(condition, guess):
+    """
+    The earliest time t at which `condition(t)` holds, for a condition that stays true
+    once it is, searched float by float from `guess`.
+    A timer due then fires on exactly the step the equivalent polled check would have
+    passed: simulated time is a sum of float steps, so `start + delay` can land either
+    side of the step where `now - start > delay` first holds.
+    """
+    if math.isinf(guess):
+        return guess
+    t = guess
+    while not condition(t):
+        t = math.nextafter(t, math.inf)
+    while condition(earlier := math.nextafter(t, -math.inf)):
+        t = earlier
+    return t
+
+def time_after(start, delay):
+    """
+    The earliest time by which more than `delay` ms have passed since `start`.
+    """
+    return earliest(lambda t: t - start > delay, start + delay)
+
+class Scheduler:
+    """
+    Min-heap of pending timers.
+    A timer is a [time, seq, kind, target] list: lists compare element-wise in C, and the
+    unique seq breaks ties in scheduling order, so events due together come out in the
+    order they were scheduled. Cancelling a timer just blanks its kind; the entry is
+    dropped when it reaches the top of the heap.
+    """
+    def __init__(self):
+        self.heap = []
+        self.seq = 0
+        self.due = [] # Scratch list returned by pop_due()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, time, kind, target=None):
+        """
+        Schedules `kind` (with `target`) for `time` and returns the timer, for cancel().
+        """
+        self.seq += 1
+        timer = [time, self.seq, kind, target]
+        heapq.heappush(self.heap, timer)
+        return timer
+
+    def cancel(self, timer):
+        if timer is not None:
+            timer[2] = None
+
+    def next_time(self):
+        """
+        When the next timer is due, or infinity if none is pending.
+        """
+        heap = self.heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else math.inf
+
+    def pop_due(self, now):
+        """
+        Removes and returns every timer due by `now`, earliest first.
+        A timer cancelled after this call keeps its blank kind, so handlers should skip
+        those. The returned list is reused by the next call.
+        """
+        due = self.due
+        due.clear()
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            timer = heapq.heappop(heap)
+            if timer[2] is not None:
+                due.append(timer)
+        return due
@@ -0,0 +1,357 @@
+"""
+Headless multi-session game server.
+One asyncio event loop hosts many concurrent StateManager sessions without a display.
+Every session steps at SIM_RATE on the server's clock, applies the input batches its
+client sent since the previous step, and answers with a compact state snapshot.
+With --workers N, N processes share the listening port (SO_REUSEPORT) and the kernel
+spreads new connections across them.
+
+Protocol (all little-endian), each message framed as u16 payload length, u8 type:
+    server -> client  WELCOME   protocol version, session id, seed, step ms
+    client -> server  INPUT     u16 count, then count x (i16 x, i16 y, u8 left button)
+    server -> client  SNAPSHOT  step, state, flags, sanity, score, hand stage, fade alpha,
+                                grace ms left, then whichever of ingredients, nerve path and
+                                feedback text changed since the last snapshot sent (see flags);
+                                the ingredient list is a u16 count, then count x (i16 x, i16 y,
+                                u16 angle, u8 bright)
+A client whose INPUT payload doesn't match its sample count is disconnected.
+
+Usage:
+    python server.py --port 7777 --workers 4
+    python client.py --sessions 200 --seconds 30
+"""
+
+import os
+
+# Headless: must be set before pygame initializes its video/audio subsystems
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import random
+import struct
+import sys
+import time
+import traceback
+
+import pygame
+from settings import *
+from replay import SessionRecorder, new_session_seed
+
+PROTOCOL_VERSION = 2 # Bumped on any change to the messages below
+FRAME = struct.Struct("<HB") # Payload length, message type
+MSG_WELCOME = 1
+MSG_INPUT = 2
+MSG_SNAPSHOT = 3
+
+WELCOME = struct.Struct("<HIQd") # Protocol version, session id, seed, step ms
+INPUT_COUNT = struct.Struct("<H")
+INPUT_SAMPLE = struct.Struct("<hhB") # x, y, left button
+SNAPSHOT = struct.Struct("<IBBhiBBH") # Step, state, flags, sanity, score, hand stage, fade alpha, grace ms
+INGREDIENT_COUNT = struct.Struct("<H")
+INGREDIENT = struct.Struct("<hhHB") # x, y, angle, bright
+PATH_COUNT = struct.Struct("<H")
+PATH_POINT = struct.Struct("<hh")
+TEXT_LENGTH = struct.Struct("<B")
+
+STATES = ("PREP", "TRAUMA")
+
+# Snapshot flags
+SNAP_GRACE = 0x01 # TRAUMA grace period (countdown running)
+SNAP_DEVIATED = 0x02
+SNAP_FLASH = 0x04 # Damage flash
+SNAP_FEEDBACK = 0x08 # Cut feedback text is showing
+SNAP_INGREDIENTS = 0x10 # Ingredient list follows
+SNAP_PATH = 0x20 # Nerve path follows
+SNAP_TEXT = 0x40 # Feedback text follows
+
+def frame(message_type, payload):
+    return FRAME.pack(len(payload), message_type) + payload
+
+async def read_message(reader):
+    """
+    Reads one framed message; returns (type, payload), or None once the peer has closed.
+    """
+    try:
+        length, message_type = FRAME.unpack(await reader.readexactly(FRAME.size))
+        return message_type, await reader.readexactly(length)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+
+def encode_input(samples):
+    parts = [INPUT_COUNT.pack(len(samples))]
+    parts.extend(INPUT_SAMPLE.pack(x, y, pressed) for (x, y), pressed in samples)
+    return frame(MSG_INPUT, b"".join(parts))
+
+def decode_snapshot(payload):
+    """
+    Snapshot payload -> dict. Optional sections are only present when they changed.
+    """
+    step, state, flags, sanity, score, hand_stage, fade_alpha, grace_ms = SNAPSHOT.unpack_from(payload)
+    snapshot = {
+        "step": step, "state": STATES[state], "flags": flags, "sanity": sanity, "score": score,
+        "hand_stage": hand_stage, "fade_alpha": fade_alpha, "grace_ms": grace_ms,
+    }
+    offset = SNAPSHOT.size
+    if flags & SNAP_INGREDIENTS:
+        (count,) = INGREDIENT_COUNT.unpack_from(payload, offset)
+        offset += INGREDIENT_COUNT.size
+        snapshot["ingredients"] = [INGREDIENT.unpack_from(payload, offset + i * INGREDIENT.size) for i in range(count)]
+        offset += count * INGREDIENT.size
+    if flags & SNAP_PATH:
+        (count,) = PATH_COUNT.unpack_from(payload, offset)
+        offset += PATH_COUNT.size
+        snapshot["path"] = [PATH_POINT.unpack_from(payload, offset + i * PATH_POINT.size) for i in range(count)]
+        offset += count * PATH_POINT.size
+    if flags & SNAP_TEXT:
+        (length,) = TEXT_LENGTH.unpack_from(payload, offset)
+        offset += TEXT_LENGTH.size
+        snapshot["text"] = payload[offset:offset + length].decode()
+    return snapshot
+
+class NetworkInput:
+    """
+    Input source fed by a client's INPUT messages. Like MouseInput, a step gets every
+    sample received since the previous one (up to the newest SERVER_MAX_INPUT_SAMPLES),
+    or holds the last state if none arrived.
+    """
+    def __init__(self):
+        self.pending = []
+        self.batch = []
+        self.last_sample = ((0, 0), False)
+
+    def push(self, payload):
+        """
+        Queues the samples of an INPUT payload; returns False, queueing nothing, if the
+        payload's size doesn't match its sample count.
+        """
+        if len(payload) < INPUT_COUNT.size:
+            return False
+        (count,) = INPUT_COUNT.unpack_from(payload)
+        if len(payload) != INPUT_COUNT.size + count * INPUT_SAMPLE.size:
+            return False
+        pending = self.pending
+        for x, y, pressed in INPUT_SAMPLE.iter_unpack(memoryview(payload)[INPUT_COUNT.size:]):
+            pending.append(((x, y), bool(pressed)))
+        if len(pending) > SERVER_MAX_INPUT_SAMPLES:
+            del pending[:-SERVER_MAX_INPUT_SAMPLES]
+        return True
+
+    def handle_event(self, event):
+        pass # Input comes from the network
+
+    def poll(self):
+        batch = self.batch
+        batch.clear()
+        if self.pending:
+            batch.extend(self.pending)
+            self.pending.clear()
+            self.last_sample = batch[-1]
+        else:
+            batch.append(self.last_sample)
+        return batch
+
+    def close(self):
+        pass
+
+class Session:
+    """
+    One trainee: a StateManager stepped by the server, its network input and the
+    connection snapshots are written to. Remembers what the client was last sent,
+    so unchanged ingredients, paths and text aren't resent.
+    """
+    def __init__(self, session_id, writer):
+        # Imported lazily so the headless environment is set up first
+        from state_manager import StateManager
+
+        self.id = session_id
+        self.seed = new_session_seed()
+        self.writer = writer
+        self.input = NetworkInput()
+        source = self.input
+        if RECORD_SESSIONS:
+            path = os.path.join(SESSION_LOG_DIR, time.strftime(f"server-%Y%m%d-%H%M%S-{session_id}.rkrec"))
+            source = SessionRecorder(path, self.seed, source)
+        self.source = source
+        self.state_manager = StateManager(random.Random(self.seed), source)
+        self.step_count = 0
+        self.skipped = 0
+
+        self.sent_ingredients = None
+        self.sent_path = None
+        self.sent_text = None
+
+    def step(self):
+        self.state_manager.update(None, SIM_STEP_MS)
+        self.step_count += 1
+
+    def snapshot(self):
+        sm = self.state_manager
+        flags = 0
+        parts = []
+        grace_ms = 0
+        if sm.state == "TRAUMA":
+            if sm.is_grace_period:
+                flags |= SNAP_GRACE
+                grace_ms = max(0, min(0xFFFF, int(GRACE_PERIOD_DURATION - (sm.time - sm.trauma_start_time))))
+            if sm.deviated:
+                flags |= SNAP_DEVIATED
+            if sm.damage_flash_timer > 0:
+                flags |= SNAP_FLASH
+        elif sm.feedback_timer > 0:
+            flags |= SNAP_FEEDBACK
+
+        ingredients = tuple((i.hitbox.x, i.hitbox.y, i.angle, i.alpha == 255) for i in sm.ingredients)
+        if ingredients != self.sent_ingredients:
+            flags |= SNAP_INGREDIENTS
+            parts.append(INGREDIENT_COUNT.pack(len(ingredients)))
+            parts.extend(INGREDIENT.pack(*ingredient) for ingredient in ingredients)
+            self.sent_ingredients = ingredients
+
+        path = sm.nerve_path if sm.state == "TRAUMA" else None
+        if path is not None and path is not self.sent_path:
+            flags |= SNAP_PATH
+            parts.append(PATH_COUNT.pack(len(path.points)))
+            parts.extend(PATH_POINT.pack(int(x), int(y)) for x, y in path.points)
+        self.sent_path = path
+
+        if sm.last_feedback != self.sent_text:
+            flags |= SNAP_TEXT
+            text = sm.last_feedback.encode()[:255]
+            parts.append(TEXT_LENGTH.pack(len(text)) + text)
+            self.sent_text = sm.last_feedback
+
+        header = SNAPSHOT.pack(self.step_count & 0xFFFFFFFF, STATES.index(sm.state), flags, sm.sanity,
+                               sm.score, sm.hand_stage & 0xFF, int(sm.fade_alpha), grace_ms)
+        return header + b"".join(parts)
+
+    def send_snapshot(self):
+        # A client that can't keep up skips snapshots instead of queueing them without bound;
+        # changes are only marked as sent when they go out, so the next one catches it up
+        if self.writer.transport.get_write_buffer_size() > SERVER_MAX_SEND_BUFFER:
+            self.skipped += 1
+            return
+        self.writer.write(frame(MSG_SNAPSHOT, self.snapshot()))
+
+    def close(self):
+        self.source.close()
+
+class GameServer:
+    """
+    Accepts connections and steps every session from one fixed-rate tick loop.
+    """
+    def __init__(self, worker_index=0):
+        self.sessions = {}
+        self.ids = itertools.count(worker_index << 24)
+        self.tick_times = []
+        self.overruns = 0
+
+    async def handle_client(self, reader, writer):
+        session = Session(next(self.ids), writer)
+        writer.write(frame(MSG_WELCOME, WELCOME.pack(PROTOCOL_VERSION, session.id, session.seed, SIM_STEP_MS)))
+        self.sessions[session.id] = session
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+                message_type, payload = message
+                if message_type == MSG_INPUT and not session.input.push(payload):
+                    print(f"Session {session.id} sent a malformed INPUT message and was dropped", flush=True)
+                    break
+        finally:
+            self.drop(session)
+
+    def drop(self, session):
+        if self.sessions.pop(session.id, None) is not None:
+            session.close()
+            session.writer.close()
+
+    async def tick_loop(self):
+        loop = asyncio.get_running_loop()
+        step = SIM_STEP_MS / 1000
+        next_tick = loop.time()
+        while True:
+            start = time.perf_counter()
+            for session in list(self.sessions.values()):
+                try:
+                    session.step()
+                    session.send_snapshot()
+                except Exception:
+                    # Every session shares this loop, so a failing one is dropped on its own
+                    print(f"Session {session.id} failed and was dropped:", flush=True)
+                    traceback.print_exc()
+                    self.drop(session)
+            self.tick_times.append(time.perf_counter() - start)
+
+            next_tick += step
+            delay = next_tick - loop.time()
+            if delay < -MAX_FRAME_TIME / 1000:
+                # Too far behind to catch up: drop the backlog rather than burst through it
+                self.overruns += 1
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(max(0, delay))
+
+    async def report_loop(self, label):
+        while True:
+            await asyncio.sleep(SERVER_STATS_INTERVAL)
+            times = sorted(self.tick_times)
+            self.tick_times.clear()
+            if not times:
+                continue
+            budget = SIM_STEP_MS
+            p95 = times[int(0.95 * (len(times) - 1))] * 1000
+            skipped = sum(session.skipped for session in self.sessions.values())
+            print(f"{label}: {len(self.sessions)} sessions, {len(times) / SERVER_STATS_INTERVAL:.1f} ticks/s, "
+                  f"tick p95 {p95:.2f} ms of {budget:.2f} ms budget ({100 * p95 / budget:.0f}%), "
+                  f"overruns {self.overruns}, snapshots skipped {skipped}", flush=True)
+
+async def serve(host, port, worker_index=0, reuse_port=False):
+    from profiler import profiler
+
+    # Fonts are all StateManager needs without a display. Initializing video or events would
+    # also let SDL take over SIGINT/SIGTERM, and the server would ignore them.
+    pygame.font.init()
+    profiler.enabled = False # Sessions share this process; frame profiling means nothing here
+
+    game_server = GameServer(worker_index)
+    server = await asyncio.start_server(game_server.handle_client, host, port, reuse_port=reuse_port or None)
+    label = f"worker {worker_index}"
+    print(f"{label}: listening on {host}:{port}", flush=True)
+    async with server:
+        await asyncio.gather(server.serve_forever(), game_server.tick_loop(), game_server.report_loop(label))
+
+def run_worker(host, port, worker_index, reuse_port):
+    try:
+        asyncio.run(serve(host, port, worker_index, reuse_port))
+    except KeyboardInterrupt:
+        pass
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless multi-session Radicchio Kitchens server.")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=1, help="processes sharing the port (needs SO_REUSEPORT)")
+    args = parser.parse_args(argv)
+
+    if args.workers == 1:
+        run_worker(args.host, args.port, 0, False)
+        return
+
+    workers = [multiprocessing.Process(target=run_worker, args=(args.host, args.port, i, True))
+               for i in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.join()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -10,9 +10,20 @@ import pygame
 # Dimensions of the game window
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
-FPS = 60
+FPS = 60 # Render rate cap; gameplay runs on the fixed simulation step below
+SIM_RATE = 60 # Simulation steps per second
+SIM_STEP_MS = 1000 / SIM_RATE
+MAX_FRAME_TIME = 250 # ms; longer stalls are dropped rather than simulated all at once
 CAPTION = "Radicchio Kitchens: Employee Training Module"
 
+# --- Render Scale ---
+# The scene is drawn into a RENDER_SCALE-sized framebuffer that the GPU upscales to the window
+# (pygame.SCALED), so slow machines fill and blit fewer pixels. Gameplay, input and every
+# position in these settings stay in SCREEN_WIDTH x SCREEN_HEIGHT logical pixels.
+RENDER_SCALE = 1.0 # e.g. 0.5 renders at 640x360
+RENDER_WIDTH = round(SCREEN_WIDTH * RENDER_SCALE)
+RENDER_HEIGHT = round(SCREEN_HEIGHT * RENDER_SCALE)
+
 # --- Colors ---
 # Format: (R, G, B)
 RADICCHIO_RED = (142, 35, 68)
@@ -22,14 +33,127 @@ WHITE = (255, 255, 255)
 GREY = (100, 100, 100)
 GREEN = (0, 255, 0)
 
+# --- Text ---
+TEXT_CACHE_SIZE = 128 # Rendered text surfaces kept (least recently used are evicted)
+
+# --- Frame Memory ---
+SLICE_TRAIL_LENGTH = 10 # Points kept in the slice trail ring buffer
+DEBUG_FRAME_ALLOCATIONS = False # Check every frame for allocations with tracemalloc (slow)
+FRAME_ALLOC_WARMUP_FRAMES = 300 # Frames ignored while caches and pools fill up
+FRAME_ALLOC_RETAINED_BUDGET = 2048 # bytes a frame may leave allocated (freelist/dict-resize noise)
+FRAME_ALLOC_PEAK_BUDGET = 4096 # bytes of short-lived allocation tolerated per frame
+FRAME_ALLOC_TRACE_DEPTH = 16 # Stack frames recorded per allocation
+
+# --- Session Recording ---
+RECORD_SESSIONS = False # Write each session's seed and input to SESSION_LOG_DIR for replay.py
+SESSION_LOG_DIR = "sessions"
+SESSION_SEED = None # Fixed RNG seed for every session, or None for a fresh random seed
+
+# --- Server ---
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 7777
+SERVER_STATS_INTERVAL = 5 # seconds between tick-time reports
+SERVER_MAX_SEND_BUFFER = 65536 # bytes queued to a client before its snapshots are skipped
+SERVER_MAX_INPUT_SAMPLES = 64 # Mouse samples a session keeps per step; a flood keeps only the newest
+
+# --- Telemetry ---
+TELEMETRY_ENABLED = False # Write gameplay events to TELEMETRY_DIR as JSONL, from a background thread
+TELEMETRY_DIR = "telemetry"
+TELEMETRY_TRAINEE = None # Trainee identifier written into each session's telemetry
+TELEMETRY_CAPACITY = 4096 # Events buffered for the writer (oldest dropped if it falls this far behind)
+TELEMETRY_FLUSH_INTERVAL = 1.0 # seconds between batched writes
+TELEMETRY_MAX_FILE_BYTES = 1000000 # A session's file rotates to a new one past this size
+
+# --- Audio ---
+AUDIO_ENABLED = True
+AUDIO_FREQUENCY = 44100
+AUDIO_BUFFER = 256 # Samples per mixer buffer (a power of 2); 256 at 44.1 kHz is ~6 ms of latency
+AUDIO_CHANNELS = 8 # Fixed channel pool; when all are busy, lower-priority cues are cut off
+AUDIO_FALLBACK_AMPLITUDE = 8000 # Peak of the tone synthesized for a missing sound file (16-bit)
+# cue -> (file in ASSET_DIR_SOUNDS, priority (higher wins a channel), volume, fallback tone (Hz, ms))
+AUDIO_CUES = {
+    "perfect": ("perfect.wav", 1, 0.8, (880, 80)),
+    "poor_angle": ("poor_angle.wav", 1, 0.8, (440, 120)),
+    "bad_cut": ("bad_cut.wav", 2, 0.9, (220, 180)),
+    "injury": ("injury.wav", 2, 0.9, (150, 100)),
+    "countdown": ("countdown.wav", 1, 0.7, (660, 60)),
+    "hand_stage": ("hand_stage.wav", 3, 1.0, (110, 600)),
+}
+
+# --- Profiler ---
+PROFILER_ENABLED = True # Cheap enough to leave on; records into fixed-size ring buffers
+PROFILER_FRAME_CAPACITY = 600 # Frames of per-section totals kept (10 s at 60 FPS)
+PROFILER_EVENT_CAPACITY = 16384 # Individual section runs kept for trace export
+# Sections registered up front (others register on first use, which allocates)
+PROFILER_SECTIONS = ("events", "update", "hand", "hit_test", "nerve", "draw", "particles", "hud", "post", "flip", "tick", "idle")
+PROFILER_IDLE_SECTIONS = ("tick", "idle") # Time spent waiting, never listed as an offender
+PROFILER_OVERLAY_KEY = pygame.K_F3 # Toggles the frame-time overlay
+PROFILER_EXPORT_KEY = pygame.K_F4 # Writes a Chrome trace to PROFILER_TRACE_DIR
+PROFILER_TRACE_DIR = "traces"
+PROFILER_GRAPH_FRAMES = 150 # Frames shown in the overlay graph
+PROFILER_OVERLAY_REFRESH = 10 # Frames between overlay redraws
+PROFILER_OFFENDERS = 4 # Slowest sections listed in the overlay
+
+# --- Frame Pacing ---
+# When nothing on screen will change for a while (no input, no animation), the main loop
+# sleeps until the next scheduled change or input instead of redrawing identical frames
+ADAPTIVE_PACING = True
+PACING_MIN_IDLE_MS = 50 # Shorter quiet spells keep running at FPS
+PACING_MAX_SLEEP_MS = 1000 # Longest single sleep; the simulation catches up on waking
+
+# --- Render Layers ---
+# Draw order for the dirty-rect renderer (higher draws on top)
+LAYER_INGREDIENTS = 0
+LAYER_PARTICLES = 1
+LAYER_TRAIL = 2
+LAYER_HUD = 3
+LAYER_FADE = 4
+LAYER_HANDS = 5
+LAYER_PROFILER = 6
+LAYER_CURSOR = 7
+
+# --- Particles ---
+# Juice and vein fragments on every cut, blood on every injury tick. Purely visual; needs NumPy
+PARTICLE_CAPACITY = 4096 # Live particles at most; beyond this, new ones replace the oldest
+PARTICLE_LIFETIME = 700 # ms the slot is held; each particle disappears after a random share of it
+PARTICLE_SIZE = 2 # px square drawn per particle
+PARTICLE_GRAVITY = 0.0015 # px per ms^2
+PARTICLE_SLICE_JUICE = 48 # Juice droplets per cut, sprayed along the stroke
+PARTICLE_SLICE_FRAGMENTS = 16 # Vein fragments per cut, thrown off both sides of it
+PARTICLE_BLOOD = 64 # Blood droplets per injury tick
+PARTICLE_COLORS = ((120, 200, 60), (245, 240, 230), (170, 10, 30)) # Juice, vein fragment, blood
+
+# --- Post-Processing ---
+# Full-screen effects that deepen as sanity drops and the hands get hurt. Needs NumPy
+POST_FX_ENABLED = True
+POST_FX_LEVELS = 5 # Distress is quantized to this many steps; each step's masks are built once
+POST_FX_STAGE_DISTRESS = 0.2 # Distress added per hand stage (losing all sanity adds 1)
+POST_FX_VIGNETTE = 0.75 # How much the corners darken at full distress
+POST_FX_VIGNETTE_RADIUS = 0.5 # Share of the half-screen around the centre left untouched
+POST_FX_DESATURATION = 0.7 # Share of color drained at full distress
+POST_FX_CHROMA_SHIFT = 4 # px the red and blue channels drift apart at full distress
+POST_FX_WARP_AMPLITUDE = 3 # px rows are pushed sideways at full distress
+POST_FX_WARP_WAVELENGTH = 180 # px between warp crests
+POST_FX_BUDGET_MS = 4.0 # Post-processing time allowed per frame
+POST_FX_DEGRADE_FRAMES = 3 # Frames over budget in a row before the costliest effect is dropped
+POST_FX_RECOVER_FRAMES = 300 # Frames under half the budget in a row before one is restored
+
 # --- Gameplay Settings ---
 INITIAL_SANITY = 100
 TRAUMA_THRESHOLD = 20
 SANITY_PENALTY_MISS = 15
 NERVE_DEVIATION_LIMIT = 22 # medium restriction
+NERVE_SEARCH_WINDOW = 3 # Segments either side of the player's progress checked first
+NERVE_END_ZONE = 60 # px of path length from the end that counts as completing it
 DAMAGE_TICK_INTERVAL = 750 # ms
 INGREDIENT_LIFETIME = 10000 # 10 seconds
 INGREDIENT_WARNING_TIME = 6000 # 6 seconds
+INGREDIENT_BLINK_INTERVAL = 200 # ms between blink edges once the warning time has passed
+INGREDIENT_ANGLE_STEP = 1 # degrees between pre-rotated ingredient images
+INGREDIENT_POOL_SIZE = 32 # Ingredient slots preallocated for recycling
+INGREDIENT_GRID_CELL_SIZE = 80 # px; spatial index cell size for slice hit-tests
+SLICE_ANGLE_BASELINE = 20 # px of stroke the slice angle is measured over
+SLICE_ANGLE_HISTORY = 32 # Mouse samples of the current stroke kept for measuring it
 
 # --- Assets Paths ---
 # Create empty folders for:
@@ -37,6 +161,9 @@ INGREDIENT_WARNING_TIME = 6000 # 6 seconds
 # assets/sounds/
 ASSET_DIR_IMAGES = "assets/images"
 ASSET_DIR_SOUNDS = "assets/sounds"
+ASSET_CACHE_DIR = "assets/cache" # Pre-scaled pixel cache, safe to delete
+ASSET_CACHE_VERSION = 1 # Bump to invalidate every cached asset
+ASSET_LOAD_WORKERS = 4 # Threads decoding and scaling images behind the loading screen
 
 # --- Image Assets ---
 IMG_HAND_RIGHT = "Right Hand.png"
@@ -47,11 +174,30 @@ IMG_HANDS_KNIFE = "Hands with knife.png"
 IMG_CURSOR_KNIFE = "Knife Cursor.png"
 
 # --- Scaling ---
+# Relative to the source images; loaded at these times RENDER_SCALE
 HAND_SCALE = 0.3
 CURSOR_SCALE = 0.08
 
+# --- Preloading ---
+# (image, scale) pairs decoded in the background at startup, behind the loading screen.
+# Anything not listed here still loads, just synchronously on first use.
+PRELOAD_IMAGES = (
+    (IMG_HAND_RIGHT, HAND_SCALE * RENDER_SCALE),
+    (IMG_HAND_LEFT_NORMAL, HAND_SCALE * RENDER_SCALE),
+    (IMG_HAND_LEFT_DAMAGED, HAND_SCALE * RENDER_SCALE),
+    (IMG_HAND_LEFT_BADLY_DAMAGED, HAND_SCALE * RENDER_SCALE),
+    (IMG_HANDS_KNIFE, HAND_SCALE * RENDER_SCALE),
+    (IMG_CURSOR_KNIFE, CURSOR_SCALE * RENDER_SCALE),
+)
+LOADING_BAR_SIZE = (400, 12)
+
+# --- Hand Rotation ---
+HAND_ROTATION_STEP = 1 # degrees; hand angles are snapped to this step and cached
+HAND_RIGHT_ANGLE_RANGE = (-30, 0) # Right hand rotates clockwise only
+HAND_LEFT_ANGLE_RANGE = (0, 30) # Left hand rotates counter-clockwise only
+
 # --- Minigame Settings ---
 GRACE_PERIOD_DURATION = 3000 # ms
 START_POINT_RADIUS = 30
-PULSE_SPEED = 0.1 # Factor for sine wave speed
-FADE_SPEED = 5 # Alpha change per frame for fade out/in
+PULSE_SPEED = 0.006 # Radians per ms for the grace period pulse
+FADE_SPEED = 0.3 # Alpha change per ms for fade out/in
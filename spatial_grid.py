@@ -0,0 +1,162 @@
+"""
+Uniform grid spatial index used to narrow down slice hit-tests to nearby ingredients.
+"""
+
+import math
+
+import pygame
+
+class SpatialGrid:
+    """
+    Buckets sprites by the grid cells their rect (or the rect given on insert) overlaps.
+    Sprites are assumed not to move while indexed (ingredients are static once spawned),
+    so callers insert on spawn and remove on slice/expiry.
+    Cells are lists preallocated to `cell_capacity` sprites (doubling if one ever fills up),
+    and each sprite keeps its entry (the span of cells it covers) after removal, so indexing
+    a recycled sprite again doesn't allocate.
+    """
+    def __init__(self, bounds, cell_size, cell_capacity=8):
+        self.bounds = pygame.Rect(bounds)
+        self.cell_size = cell_size
+        self.cols = max(1, math.ceil(self.bounds.width / cell_size))
+        self.rows = max(1, math.ceil(self.bounds.height / cell_size))
+        # The sprites in each cell, in insertion order, so queries are deterministic
+        self.cells = [[None] * cell_capacity for _ in range(self.cols * self.rows)]
+        self.cell_counts = [0] * (self.cols * self.rows)
+        self.sprite_cells = {} # sprite -> [x0, y0, x1, y1] cells it covers; x0 is None while not indexed
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def cell_coords(self, x, y):
+        cx = int((x - self.bounds.x) // self.cell_size)
+        cy = int((y - self.bounds.y) // self.cell_size)
+        return max(0, min(self.cols - 1, cx)), max(0, min(self.rows - 1, cy))
+
+    def insert(self, sprite, rect=None):
+        if rect is None:
+            rect = sprite.rect
+        # A pixel of margin, so rasterized segments that graze a cell edge still find the sprite
+        x0, y0 = self.cell_coords(rect.left - 1, rect.top - 1)
+        x1, y1 = self.cell_coords(rect.right, rect.bottom)
+
+        span = self.sprite_cells.get(sprite)
+        if span is None:
+            span = self.sprite_cells[sprite] = [None] * 4
+        elif span[0] is not None:
+            self.remove(sprite)
+        span[0], span[1], span[2], span[3] = x0, y0, x1, y1
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                self.add_to_cell(cy * self.cols + cx, sprite)
+        self.count += 1
+
+    def remove(self, sprite):
+        span = self.sprite_cells.get(sprite)
+        if span is None or span[0] is None:
+            return
+        x0, y0, x1, y1 = span
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                self.remove_from_cell(cy * self.cols + cx, sprite)
+        span[0] = None
+        self.count -= 1
+
+    def add_to_cell(self, index, sprite):
+        cell = self.cells[index]
+        count = self.cell_counts[index]
+        if count == len(cell):
+            cell.extend([None] * count) # Full: double it
+        cell[count] = sprite
+        self.cell_counts[index] = count + 1
+
+    def remove_from_cell(self, index, sprite):
+        cell = self.cells[index]
+        count = self.cell_counts[index] - 1
+        # Shift the later sprites down, keeping insertion order
+        for i in range(cell.index(sprite, 0, count + 1), count):
+            cell[i] = cell[i + 1]
+        cell[count] = None
+        self.cell_counts[index] = count
+
+    def clear(self):
+        for index, cell in enumerate(self.cells):
+            for i in range(self.cell_counts[index]):
+                cell[i] = None
+            self.cell_counts[index] = 0
+        for span in self.sprite_cells.values():
+            span[0] = None
+        self.count = 0
+
+    def cells_on_segment(self, start, end):
+        """
+        Yields the index of every cell the segment from start to end passes through
+        (a grid traversal in the style of Amanatides & Woo). Parts of the segment
+        outside the grid bounds are clipped away first.
+        """
+        clipped = self.bounds.clipline(start, end)
+        if not clipped:
+            return
+        (x0, y0), (x1, y1) = clipped
+
+        cx, cy = self.cell_coords(x0, y0)
+        end_cx, end_cy = self.cell_coords(x1, y1)
+        yield cy * self.cols + cx
+
+        dx = x1 - x0
+        dy = y1 - y0
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        # Parametric distance (0..1 along the segment) to the next vertical/horizontal cell edge
+        if dx:
+            edge_x = self.bounds.x + (cx + (step_x > 0)) * self.cell_size
+            t_max_x = (edge_x - x0) / dx
+            t_delta_x = self.cell_size / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if dy:
+            edge_y = self.bounds.y + (cy + (step_y > 0)) * self.cell_size
+            t_max_y = (edge_y - y0) / dy
+            t_delta_y = self.cell_size / abs(dy)
+        else:
+            t_max_y = t_delta_y = math.inf
+
+        for _ in range(abs(end_cx - cx) + abs(end_cy - cy)):
+            if t_max_x == t_max_y:
+                # Passing exactly through a corner: include both side cells
+                if 0 <= cx + step_x < self.cols:
+                    yield cy * self.cols + cx + step_x
+                if 0 <= cy + step_y < self.rows:
+                    yield (cy + step_y) * self.cols + cx
+                cx += step_x
+                cy += step_y
+                t_max_x += t_delta_x
+                t_max_y += t_delta_y
+            elif t_max_x < t_max_y:
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                cy += step_y
+                t_max_y += t_delta_y
+            if not (0 <= cx < self.cols and 0 <= cy < self.rows):
+                break
+            yield cy * self.cols + cx
+            if (cx, cy) == (end_cx, end_cy):
+                break
+
+    def query_segment(self, start, end, out=None):
+        """
+        Returns the sprites in the cells crossed by the segment, without duplicates,
+        in a deterministic order. A point query is a segment with start == end.
+        Pass a reusable dict as `out` to avoid allocating one per query; its keys are the result.
+        """
+        if out is None:
+            out = {}
+        else:
+            out.clear()
+        for index in self.cells_on_segment(start, end):
+            cell = self.cells[index]
+            for i in range(self.cell_counts[index]):
+                out[cell[i]] = None
+        return out
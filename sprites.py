@@ -3,41 +3,74 @@ import pygame
 import random
 import math
 from settings import *
+from assets import assets
+from text_cache import text_cache
+from frame_memory import surface_pool
+from scheduler import Scheduler, TIMER_WARNING, TIMER_BLINK, TIMER_EXPIRE, earliest, time_after
 
-import os
+def render_px(length):
+    """
+    Converts a logical length to render framebuffer pixels (at least 1).
+    """
+    return max(1, round(length * RENDER_SCALE))
+
+def render_pos(pos):
+    """
+    Converts a logical (x, y) position to render framebuffer coordinates.
+    """
+    return int(pos[0] * RENDER_SCALE), int(pos[1] * RENDER_SCALE)
 
-class ChefHand(pygame.sprite.Sprite):
+class RenderSprite(pygame.sprite.DirtySprite):
+    """
+    Base class for everything drawn through the LayeredDirty renderer.
+    Only marks itself dirty when its image, position or visibility actually changes,
+    so unchanged sprites cost nothing per frame.
+    """
+    def __init__(self, *groups):
+        super().__init__(*groups)
+        self.image = pygame.Surface((0, 0))
+        self.rect = self.image.get_rect()
+
+    def set_image(self, image, **anchor):
+        rect = image.get_rect(**anchor)
+        if image is not self.image or rect != self.rect:
+            self.image = image
+            self.rect = rect
+            self.dirty = 1
+
+    def set_visible(self, visible):
+        visible = 1 if visible else 0
+        if self.visible != visible:
+            self.visible = visible
+
+class ChefHand:
     """
     Represents the chef's hands on the screen.
     Handles loading, positioning, and rendering of hand sprites, including state changes based on damage.
+    Each hand is its own tightly bounded sprite; add `sprites` to the render group.
+    The hands are purely visual, so they work in render framebuffer pixels throughout.
     """
     def __init__(self):
-        super().__init__()
         self.load_images()
         
-        # Base surface for composition
-        self.image = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        self.rect = self.image.get_rect()
+        self.right_sprite = RenderSprite()
+        self.left_sprite = RenderSprite()
+        self.sprites = (self.right_sprite, self.left_sprite)
         
         # State
         self.left_hand_state = "normal" # "normal", "damaged", "badly_damaged"
         self.is_attacking = False
+
+        # Rotation cache: (image key, quantized angle, left hand state) -> rotated surface
+        self.rotation_cache = {}
+        self.last_visual_key = None
+        self.prewarm_rotation_cache()
         
         self.update_visuals()
 
     def load_images(self):
         def load(name):
-            path = os.path.join(ASSET_DIR_IMAGES, name)
-            try:
-                img = pygame.image.load(path).convert_alpha()
-                # Scale by factor
-                new_size = (int(img.get_width() * HAND_SCALE), int(img.get_height() * HAND_SCALE))
-                return pygame.transform.smoothscale(img, new_size)
-            except Exception as e:
-                print(f"Error loading {name}: {e}")
-                s = pygame.Surface((100, 100))
-                s.fill((255, 0, 255))
-                return s
+            return assets.load_image(name, HAND_SCALE * RENDER_SCALE)
 
         self.img_right = load(IMG_HAND_RIGHT)
         self.img_left_normal = load(IMG_HAND_LEFT_NORMAL)
@@ -45,76 +78,123 @@ class ChefHand(pygame.sprite.Sprite):
         self.img_left_badly = load(IMG_HAND_LEFT_BADLY_DAMAGED)
         self.img_attack = load(IMG_HANDS_KNIFE)
 
+    def get_left_image(self):
+        if self.left_hand_state == "normal":
+            return self.img_left_normal
+        elif self.left_hand_state == "damaged":
+            return self.img_left_damaged
+        elif self.left_hand_state == "badly_damaged":
+            return self.img_left_badly
+        return None
+
+    def quantize_angle(self, angle):
+        return int(round(angle / HAND_ROTATION_STEP) * HAND_ROTATION_STEP)
+
+    def cache_key(self, side, angle):
+        # The right hand never changes with damage, so it shares one set of entries
+        stage = self.left_hand_state if side == "left" else None
+        return (side, angle, stage)
+
+    def get_rotated(self, side, img, angle):
+        """
+        Returns img rotated by the quantized angle, rendering it only on a cache miss.
+        """
+        if angle == 0:
+            return img
+        key = self.cache_key(side, angle)
+        rotated = self.rotation_cache.get(key)
+        if rotated is None:
+            rotated = pygame.transform.rotate(img, angle)
+            self.rotation_cache[key] = rotated
+        return rotated
+
+    def prewarm_rotation_cache(self):
+        """
+        Renders every quantized angle within the clamp ranges up front,
+        so rotating the hands during play is a dictionary lookup.
+        """
+        lo, hi = HAND_RIGHT_ANGLE_RANGE
+        for angle in range(self.quantize_angle(lo), self.quantize_angle(hi) + 1, HAND_ROTATION_STEP):
+            self.get_rotated("right", self.img_right, angle)
+
+        img_left = self.get_left_image()
+        if img_left:
+            lo, hi = HAND_LEFT_ANGLE_RANGE
+            for angle in range(self.quantize_angle(lo), self.quantize_angle(hi) + 1, HAND_ROTATION_STEP):
+                self.get_rotated("left", img_left, angle)
+
+    def invalidate_left_rotations(self):
+        # Drop the rotations of the left hand image that is being swapped out
+        for key in [k for k in self.rotation_cache if k[0] == "left"]:
+            del self.rotation_cache[key]
+
     def update_visuals(self, angle_right=0, angle_left=0):
-        self.image.fill((0, 0, 0, 0)) # Clear
-        
-        offset = SCREEN_WIDTH // 5
+        angle_right = self.quantize_angle(angle_right)
+        angle_left = self.quantize_angle(angle_left)
+
+        # Skip recomposition if nothing visible changed since the last frame
+        visual_key = (angle_right, angle_left, self.left_hand_state, self.is_attacking)
+        if visual_key == self.last_visual_key:
+            return
+        self.last_visual_key = visual_key
+
+        offset = RENDER_WIDTH // 5
+
+        # Helper to place image centered on its hand's resting spot, with optional rotation
+        def place_centered(sprite, img, offset_x=0, rotation_angle=0, side=None):
+            # Calculate center of where standard sprite sits (aligned to bottom)
+            # Logic assumes pivot is roughly center of image for simplicity
+            base_x = (RENDER_WIDTH - img.get_width()) // 2 + offset_x
+            base_y = RENDER_HEIGHT - img.get_height()
+            center = (base_x + img.get_width() // 2, base_y + img.get_height() // 2)
 
-        # Helper to center image with optional x offset and rotation
-        def blit_centered(img, offset_x=0, rotation_angle=0):
             if rotation_angle != 0:
-                # Rotate around center
-                # Logic assumes pivot is roughly center of image for simplicity
-                img_rotated = pygame.transform.rotate(img, rotation_angle)
-                
-                # Calculate center of where standard sprite sits
-                base_x = (SCREEN_WIDTH - img.get_width()) // 2 + offset_x
-                base_y = SCREEN_HEIGHT - img.get_height()
-                center = (base_x + img.get_width() // 2, base_y + img.get_height() // 2)
-                
-                rect = img_rotated.get_rect(center=center)
-                self.image.blit(img_rotated, rect.topleft)
-            else:
-                x = (SCREEN_WIDTH - img.get_width()) // 2 + offset_x
-                y = SCREEN_HEIGHT - img.get_height() # Align bottom
-                self.image.blit(img, (x, y))
+                img = self.get_rotated(side, img, rotation_angle)
+            sprite.set_image(img, center=center)
+            sprite.set_visible(True)
 
         if self.is_attacking:
-            blit_centered(self.img_attack)
+            place_centered(self.right_sprite, self.img_attack)
+            self.left_sprite.set_visible(False)
         else:
             # Draw Right Hand (offset to right, rotated)
-            blit_centered(self.img_right, offset, angle_right)
+            place_centered(self.right_sprite, self.img_right, offset, angle_right, "right")
             
             # Draw Left Hand based on state (offset to left, rotated)
-            img_left = None
-            if self.left_hand_state == "normal":
-                img_left = self.img_left_normal
-            elif self.left_hand_state == "damaged":
-                img_left = self.img_left_damaged
-            elif self.left_hand_state == "badly_damaged":
-                img_left = self.img_left_badly
-            
+            img_left = self.get_left_image()
             if img_left:
-                blit_centered(img_left, -offset, angle_left)
+                place_centered(self.left_sprite, img_left, -offset, angle_left, "left")
+            else:
+                self.left_sprite.set_visible(False)
 
     def update(self):
         mx, my = pygame.mouse.get_pos()
-        offset = SCREEN_WIDTH // 5
+        offset = RENDER_WIDTH // 5
         
         # --- Right Hand Calculation ---
         w_r, h_r = self.img_right.get_size()
-        cx_r = (SCREEN_WIDTH - w_r) // 2 + offset + w_r // 2
-        cy_r = SCREEN_HEIGHT - h_r // 2
+        cx_r = (RENDER_WIDTH - w_r) // 2 + offset + w_r // 2
+        cy_r = RENDER_HEIGHT - h_r // 2
         
         dx_r = mx - cx_r
         dy_r = my - cy_r
         
         angle_r = -math.degrees(math.atan2(dy_r, dx_r)) - 90
         # Clamp Right: -30 to 0 (Right/Clockwise only)
-        angle_r = max(-30, min(0, angle_r))
+        angle_r = max(HAND_RIGHT_ANGLE_RANGE[0], min(HAND_RIGHT_ANGLE_RANGE[1], angle_r))
         
         # --- Left Hand Calculation ---
         # Assuming Left Hand is roughly same size/position logic mirrored
         w_l, h_l = self.img_left_normal.get_size()
-        cx_l = (SCREEN_WIDTH - w_l) // 2 - offset + w_l // 2
-        cy_l = SCREEN_HEIGHT - h_l // 2
+        cx_l = (RENDER_WIDTH - w_l) // 2 - offset + w_l // 2
+        cy_l = RENDER_HEIGHT - h_l // 2
         
         dx_l = mx - cx_l
         dy_l = my - cy_l
         
         angle_l = -math.degrees(math.atan2(dy_l, dx_l)) - 90
         # Clamp Left: 0 to 30 (Left/CCW only)
-        angle_l = max(0, min(30, angle_l))
+        angle_l = max(HAND_LEFT_ANGLE_RANGE[0], min(HAND_LEFT_ANGLE_RANGE[1], angle_l))
         
         self.update_visuals(angle_r, angle_l)
 
@@ -125,12 +205,17 @@ class ChefHand(pygame.sprite.Sprite):
         1 = Damaged
         2+ = Badly Damaged
         """
+        previous_state = self.left_hand_state
         if stage == 0:
             self.left_hand_state = "normal"
         elif stage == 1:
             self.left_hand_state = "damaged"
         else:
             self.left_hand_state = "badly_damaged"
+
+        if self.left_hand_state != previous_state:
+            self.invalidate_left_rotations()
+            self.prewarm_rotation_cache()
         
         self.update_visuals()
 
@@ -139,84 +224,527 @@ class ChefHand(pygame.sprite.Sprite):
             self.is_attacking = attacking
             self.update_visuals()
 
-class Cursor(pygame.sprite.Sprite):
+class Cursor(RenderSprite):
     """
     Represents the player's cursor (aiming point) in the game.
-    Follows the mouse position.
+    Follows the mouse position (already in render framebuffer pixels).
     """
     def __init__(self):
         super().__init__()
-        path = os.path.join(ASSET_DIR_IMAGES, IMG_CURSOR_KNIFE)
-        try:
-            img = pygame.image.load(path).convert_alpha()
-            new_size = (int(img.get_width() * CURSOR_SCALE), int(img.get_height() * CURSOR_SCALE))
-            self.image = pygame.transform.smoothscale(img, new_size)
-        except:
-            self.image = pygame.Surface((20, 20))
-            self.image.fill(RADICCHIO_RED)
-            
+        self.image = assets.load_image(IMG_CURSOR_KNIFE, CURSOR_SCALE * RENDER_SCALE,
+                                       fallback_size=(render_px(20), render_px(20)), fallback_color=RADICCHIO_RED)
         self.rect = self.image.get_rect()
 
     def update(self):
-        self.rect.center = pygame.mouse.get_pos()
+        pos = pygame.mouse.get_pos()
+        if self.rect.center != pos:
+            self.rect.center = pos
+            self.dirty = 1
 
-class Ingredient(pygame.sprite.Sprite):
+class Ingredient(RenderSprite):
     """
     Represents a sliceable ingredient in the PREP phrase.
-    Handles random spawning, rotation, and blinking before expiry.
+    A thin rendering view of one IngredientStore slot: it holds the image and rect,
+    while angle, creation time and blink state live in the store's columns.
+    Images come from a shared atlas of pre-rotated frames.
+    `hitbox` is the ingredient's area in logical pixels, which gameplay hit-tests against;
+    `rect` is where it is drawn in the render framebuffer.
     """
-    def __init__(self):
+    # angle -> (bright image, dim image), shared by every instance
+    atlas = None
+    # angle -> logical (width, height) of the rotated ingredient
+    sizes = None
+
+    def __init__(self, store, slot):
         super().__init__()
+        self.store = store
+        self.slot = slot
+        self.hitbox = pygame.Rect(0, 0, 0, 0)
+
+    @classmethod
+    def build_atlas(cls):
+        """
+        Pre-renders the ingredient at every INGREDIENT_ANGLE_STEP, plus a dimmed copy for blinking.
+        The atlas surfaces are never modified after this, so they are safe to share.
+        Frames are rendered at RENDER_SCALE; their logical sizes are kept separately so
+        spawning and hit-testing don't depend on the render resolution.
+        """
         # Placeholder for ingredient image.
-        # Ideally: self.image = pygame.image.load(os.path.join(ASSET_DIR_IMAGES, 'radicchio.png')).convert_alpha()
+        # Ideally: base = assets.load_image('radicchio.png')
         
         # Base surface
         base_size = 64
-        self.image = pygame.Surface((base_size, base_size), pygame.SRCALPHA)
-        self.image.fill(GREEN)
+        base = pygame.Surface((base_size, base_size), pygame.SRCALPHA)
+        base.fill(GREEN)
         
         # Draw a visual "cut line" (Horizontal Center)
         # This represents 0 degrees rotation
         mid_y = base_size // 2
-        pygame.draw.line(self.image, VEIN_WHITE, (0, mid_y), (base_size, mid_y), 3)
-        
-        # Random Rotation
-        self.angle = random.randint(0, 360)
-        self.image = pygame.transform.rotate(self.image, self.angle)
-        
-        self.rect = self.image.get_rect()
-        self.rect.x = random.randrange(0, SCREEN_WIDTH - self.rect.width)
+        pygame.draw.line(base, VEIN_WHITE, (0, mid_y), (base_size, mid_y), 3)
+
+        render_base = base
+        if RENDER_SCALE != 1:
+            render_base = pygame.transform.smoothscale(base, (render_px(base_size), render_px(base_size)))
+
+        cls.atlas = {}
+        cls.sizes = {}
+        for angle in range(0, 360, INGREDIENT_ANGLE_STEP):
+            bright = pygame.transform.rotate(render_base, angle)
+            if render_base is base:
+                cls.sizes[angle] = bright.get_size()
+            else:
+                cls.sizes[angle] = pygame.transform.rotate(base, angle).get_size()
+            dim = bright.copy()
+            dim.set_alpha(50) # Dim
+            cls.atlas[angle] = (bright, dim)
+
+    def alive(self):
+        # The sprite stays in the render group while its slot is free, hidden
+        return self.store.alive[self.slot]
+
+    @property
+    def angle(self):
+        return self.store.angle[self.slot]
+
+    @property
+    def creation_time(self):
+        return self.store.created[self.slot]
+
+    @property
+    def alpha(self):
+        return 255 if self.store.bright[self.slot] else 50
+
+    def show(self, angle, x, y):
+        self.bright_image, self.dim_image = Ingredient.atlas[angle]
+        self.image = self.bright_image
+        self.hitbox.topleft = (x, y)
+        self.hitbox.size = Ingredient.sizes[angle]
+        self.rect = self.image.get_rect(topleft=render_pos((x, y)))
+        self.dirty = 1
+
+    def set_bright(self, bright):
+        # Swap images rather than set_alpha, since the atlas surfaces are shared between instances
+        self.image = self.bright_image if bright else self.dim_image
+        self.dirty = 1
+
+class IngredientStore:
+    """
+    Struct-of-arrays state for every ingredient: position, angle, creation time, alive flag
+    and blink state are columns indexed by slot, with one Ingredient sprite per slot as its view.
+    Freed slots are recycled, so spawning doesn't allocate; the columns grow on demand.
+    A slot's sprite is only hidden while the slot is free, so it can stay in the render group.
+    Iterating the store yields the live ingredients' sprites, in slot order.
+    Nothing is polled: each ingredient's warning and expiry, and the next blink edge while
+    any is blinking, are timers on `scheduler`, and handle_timers() acts on the due ones.
+    Releasing an ingredient (slicing it) cancels its timers.
+    Ingredients are placed with `rng`, so a seeded generator makes spawns reproducible.
+    """
+    def __init__(self, size=INGREDIENT_POOL_SIZE, rng=random, scheduler=None):
+        self.rng = rng
+        self.scheduler = scheduler if scheduler is not None else Scheduler()
+        self.sprites = []
+        self.x = []
+        self.y = []
+        self.angle = []
+        self.created = []
+        self.alive = []
+        self.bright = []
+        self.warning_timers = []
+        self.expiry_timers = []
+        self.blinking = set() # Slots past their warning time
+        self.blink_timer = None # Next blink edge, pending while any slot is blinking
+        self.free = [] # Free slots; the last one is used next
+        self.live = 0
+        self.expired = [] # Scratch list returned by handle_timers()
+        self.grow(size)
+        # Initial slots are placed up front; this draws from rng, so seeded sessions depend on it
+        for slot in self.free:
+            self.place(slot, 0)
+
+    def __len__(self):
+        return self.live
+
+    def __iter__(self):
+        for slot, alive in enumerate(self.alive):
+            if alive:
+                yield self.sprites[slot]
+
+    def grow(self, size):
+        first = len(self.sprites)
+        for slot in range(first, size):
+            ingredient = Ingredient(self, slot)
+            ingredient.visible = 0
+            self.sprites.append(ingredient)
+            self.x.append(0)
+            self.y.append(0)
+            self.angle.append(0)
+            self.created.append(0.0)
+            self.alive.append(False)
+            self.bright.append(True)
+            self.warning_timers.append(None)
+            self.expiry_timers.append(None)
+        self.free.extend(range(first, size))
+
+    def place(self, slot, now):
+        """
+        (Re)initializes a slot at a fresh random angle and position.
+        `now` is the simulation time in ms.
+        """
+        if Ingredient.atlas is None:
+            Ingredient.build_atlas()
+        rng = self.rng
+
+        # Random Rotation, snapped to the atlas step
+        angle = rng.randint(0, 360)
+        angle = (round(angle / INGREDIENT_ANGLE_STEP) * INGREDIENT_ANGLE_STEP) % 360
+        width, height = Ingredient.sizes[angle]
+        x = rng.randrange(0, SCREEN_WIDTH - width)
         # Limit spawning to the top 1/3 of the screen
-        max_y = SCREEN_HEIGHT // 3 - self.rect.height
-        self.rect.y = random.randrange(0, max(1, max_y)) 
-        self.creation_time = pygame.time.get_ticks()
+        max_y = SCREEN_HEIGHT // 3 - height
+        y = rng.randrange(0, max(1, max_y))
+
+        self.x[slot] = x
+        self.y[slot] = y
+        self.angle[slot] = angle
+        self.created[slot] = now
+        self.set_bright(slot, True)
+        self.sprites[slot].show(angle, x, y)
+
+    def spawn(self, now):
+        """
+        Places an ingredient in a free slot, schedules its warning and expiry, and returns its sprite.
+        """
+        if not self.free:
+            self.grow(len(self.sprites) * 2) # Store exhausted: double the columns
+        slot = self.free.pop()
+        self.place(slot, now)
+        self.sprites[slot].set_visible(True)
+        self.alive[slot] = True
+        self.live += 1
+        scheduler = self.scheduler
+        self.warning_timers[slot] = scheduler.schedule(time_after(now, INGREDIENT_WARNING_TIME), TIMER_WARNING, slot)
+        self.expiry_timers[slot] = scheduler.schedule(time_after(now, INGREDIENT_LIFETIME), TIMER_EXPIRE, slot)
+        return self.sprites[slot]
+
+    def release(self, ingredient):
+        ingredient.set_visible(False)
+        slot = ingredient.slot
+        self.alive[slot] = False
+        self.live -= 1
+        self.scheduler.cancel(self.warning_timers[slot])
+        self.scheduler.cancel(self.expiry_timers[slot])
+        self.warning_timers[slot] = self.expiry_timers[slot] = None
+        self.blinking.discard(slot)
+        if not self.blinking:
+            self.scheduler.cancel(self.blink_timer)
+            self.blink_timer = None
+        self.free.append(slot)
+
+    def set_bright(self, slot, bright):
+        if self.bright[slot] != bright:
+            self.bright[slot] = bright
+            self.sprites[slot].set_bright(bright)
+
+    def schedule_blink(self, now):
+        # The next edge is where the blink interval count next goes up
+        phase = now // INGREDIENT_BLINK_INTERVAL
+        edge = earliest(lambda t: t // INGREDIENT_BLINK_INTERVAL > phase, (phase + 1) * INGREDIENT_BLINK_INTERVAL)
+        self.blink_timer = self.scheduler.schedule(edge, TIMER_BLINK)
+
+    def handle_timers(self, timers, now):
+        """
+        Acts on the ingredient timers among `timers` (due by `now`, from Scheduler.pop_due()):
+        ingredients past INGREDIENT_WARNING_TIME start blinking, every blink edge flips them,
+        and the sprites of those past INGREDIENT_LIFETIME are returned, in slot order.
+        The returned list is reused by the next call.
+        """
+        expired = self.expired
+        expired.clear()
+        # Blinking is in phase for every ingredient: dim on even intervals
+        dim = int(now // INGREDIENT_BLINK_INTERVAL) % 2 == 0
+        for _, _, kind, slot in timers:
+            if kind == TIMER_WARNING:
+                self.blinking.add(slot)
+                self.set_bright(slot, not dim)
+                if self.blink_timer is None:
+                    self.schedule_blink(now)
+            elif kind == TIMER_BLINK:
+                for blinking in self.blinking:
+                    self.set_bright(blinking, not dim)
+                self.blink_timer = None
+                if self.blinking:
+                    self.schedule_blink(now)
+            elif kind == TIMER_EXPIRE:
+                expired.append(self.sprites[slot])
+        if len(expired) > 1:
+            expired.sort(key=lambda ingredient: ingredient.slot)
+        return expired
+
+class TextSprite(RenderSprite):
+    """
+    A line of text anchored to a fixed screen position (e.g. topleft or center).
+    Re-renders only when the text or color changes.
+    """
+    def __init__(self, font, **anchor):
+        super().__init__()
+        self.font = font
+        self.anchor = anchor
+        self.text = None
+        self.color = None
+
+    def set_text(self, text, color):
+        if text == self.text and color == self.color:
+            return
+        self.text = text
+        self.color = color
+        self.set_image(text_cache.render(self.font, text, color), **self.anchor)
+
+class LabelSprite(RenderSprite):
+    """
+    A static prefix followed by an integer, e.g. "Score: 12".
+    The prefix is drawn once and each digit comes from the text cache, so a value change
+    only re-composes a few glyphs and never rasterizes text.
+    """
+    GLYPHS = "-0123456789"
+
+    def __init__(self, font, prefix, color, topleft, max_digits=10):
+        super().__init__()
+        self.glyphs = {c: text_cache.render(font, c, color) for c in self.GLYPHS}
+        prefix_img = text_cache.render(font, prefix, color)
+        self.prefix_width = prefix_img.get_width()
+        self.max_digits = max_digits
+        glyph_width = max(g.get_width() for g in self.glyphs.values())
+        height = max(prefix_img.get_height(), font.get_height())
+
+        self.image = pygame.Surface((self.prefix_width + glyph_width * max_digits, height), pygame.SRCALPHA)
+        self.image.fill((0, 0, 0, 0))
+        # BLEND_RGBA_MAX onto a transparent surface copies the glyph pixels exactly
+        self.image.blit(prefix_img, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        self.topleft = topleft
+        self.source_rect = pygame.Rect(0, 0, self.prefix_width, height)
+        self.rect = pygame.Rect(topleft, self.source_rect.size)
+        self.value = None
+
+    def set_value(self, value):
+        if value == self.value:
+            return
+        self.value = value
+
+        # Clear the old digits, then lay out the new ones after the prefix
+        height = self.image.get_height()
+        self.image.fill((0, 0, 0, 0), (self.prefix_width, 0, self.image.get_width() - self.prefix_width, height))
+        x = self.prefix_width
+        for c in str(value)[:self.max_digits]:
+            glyph = self.glyphs[c]
+            self.image.blit(glyph, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            x += glyph.get_width()
+
+        self.source_rect = pygame.Rect(0, 0, x, height)
+        self.rect = pygame.Rect(self.topleft, self.source_rect.size)
+        self.dirty = 1
+
+class TrailSprite(RenderSprite):
+    """
+    The slice trail polyline.
+    Draws into one pooled screen-sized scratch surface and only blits the trail's bounding box.
+    The scratch surface is acquired by create_canvas() along with the other render layers,
+    so headless sessions never need one.
+    """
+    def __init__(self, width=3, color=WHITE):
+        super().__init__()
+        self.canvas = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.source_rect = pygame.Rect(0, 0, 0, 0)
+        self.line_width = render_px(width)
+        self.color = color
+        self.trail = None
+        self.version = None
+        self.points = [] # Trail scaled to render pixels, reused (unused at RENDER_SCALE 1)
+
+    def create_canvas(self):
+        self.canvas = surface_pool.acquire((RENDER_WIDTH, RENDER_HEIGHT), pygame.SRCALPHA)
+        self.canvas.fill((0, 0, 0, 0))
+        self.image = self.canvas
+
+    def set_trail(self, trail):
+        """
+        Redraws from a RingBuffer of logical points, only when its contents changed.
+        Pass None to hide the trail.
+        """
+        version = trail.version if trail is not None else None
+        if trail is self.trail and version == self.version:
+            return
+        self.trail = trail
+        self.version = version
+
+        # Clear only what the previous trail touched
+        self.image.fill((0, 0, 0, 0), self.source_rect)
+        if trail is not None and len(trail) > 1:
+            points = trail
+            if RENDER_SCALE != 1:
+                points = self.points
+                points.clear()
+                for x, y in trail:
+                    points.append((x * RENDER_SCALE, y * RENDER_SCALE))
+            self.source_rect = pygame.draw.lines(self.image, self.color, False, points, self.line_width)
+        else:
+            self.source_rect.size = (0, 0)
+
+        self.rect.topleft = self.source_rect.topleft
+        self.rect.size = self.source_rect.size
+        self.dirty = 1
+
+    def release_canvas(self):
+        """
+        Hands the scratch surface back to the pool and hides the trail.
+        """
+        if self.canvas is not None:
+            surface_pool.release(self.canvas)
+            self.canvas = None
+            self.image = pygame.Surface((0, 0))
+            self.trail = self.version = None
+            self.source_rect.size = (0, 0)
+            self.rect.size = (0, 0)
+            self.dirty = 1
+
+class FadeOverlay(RenderSprite):
+    """
+    Full-screen black overlay used for the death fade.
+    Hidden while fully transparent so it costs nothing outside of a fade.
+    The overlay surface is acquired by create_surface() along with the other render layers.
+    """
+    def __init__(self):
+        super().__init__()
+        self.rect = pygame.Rect(0, 0, RENDER_WIDTH, RENDER_HEIGHT)
+        self.alpha = 0
+        self.visible = 0
+
+    def create_surface(self):
+        self.image = surface_pool.acquire(self.rect.size)
+        self.image.fill(BLACK)
+        self.image.set_alpha(self.alpha)
+
+    def set_alpha(self, alpha):
+        if alpha != self.alpha:
+            self.alpha = alpha
+            self.image.set_alpha(alpha)
+            self.dirty = 1
+        self.set_visible(alpha > 0)
+
+    def release_surface(self):
+        """
+        Hands the overlay surface back to the pool and hides the overlay.
+        """
+        if self.image.get_size() == self.rect.size:
+            surface_pool.release(self.image)
+            self.image = pygame.Surface((0, 0))
+            self.alpha = 0
+            self.set_visible(False)
+
+class ProfilerOverlay(RenderSprite):
+    """
+    Debug panel with a frame-time graph and the slowest profiled sections.
+    Hidden until toggled; while shown it redraws every PROFILER_OVERLAY_REFRESH frames.
+    """
+    def __init__(self, profiler, topright=(RENDER_WIDTH - render_px(10), render_px(10))):
+        super().__init__()
+        self.profiler = profiler
+        self.font = pygame.font.Font(None, render_px(20))
+        self.line_height = self.font.get_linesize()
+        self.padding = render_px(5)
+        self.bar_width = render_px(2)
+        self.graph_height = render_px(80)
+        width = PROFILER_GRAPH_FRAMES * self.bar_width + 2 * self.padding
+        height = self.line_height * (PROFILER_OFFENDERS + 1) + self.graph_height + 3 * self.padding
+        self.image = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.rect = self.image.get_rect(topright=topright)
+        self.visible = 0
+        self.frames_until_refresh = 0
+
+    def toggle(self):
+        self.set_visible(not self.visible)
+        self.frames_until_refresh = 0
 
     def update(self):
-        now = pygame.time.get_ticks()
-        elapsed = now - self.creation_time
-        
-        # Blinking effect if warning time passed
-        if elapsed > INGREDIENT_WARNING_TIME:
-            # Blink interval: 200ms
-            if (now // 200) % 2 == 0:
-                self.image.set_alpha(50) # Dim
-            else:
-                self.image.set_alpha(255) # Bright
+        if not self.visible:
+            return
+        self.frames_until_refresh -= 1
+        if self.frames_until_refresh > 0:
+            return
+        self.frames_until_refresh = PROFILER_OVERLAY_REFRESH
+        self.redraw()
+        self.dirty = 1
+
+    def redraw(self):
+        # Numbers change on every redraw, so this renders text directly rather than through text_cache
+        budget = 1000 / FPS
+        times = self.profiler.recent_frame_times(PROFILER_GRAPH_FRAMES)
+        self.image.fill((0, 0, 0, 180))
+        x = y = self.padding
+        if times:
+            header = f"Frame: {sum(times) / len(times):.1f} ms avg, {max(times):.1f} ms max"
         else:
-            self.image.set_alpha(255) # Ensure normal alpha otherwise
+            header = "Frame: no samples yet"
+        self.image.blit(self.font.render(header, True, WHITE), (x, y))
+        y += self.line_height
+
+        # One bar per frame; the graph's full height is two frame budgets
+        scale = self.graph_height / (2 * budget)
+        bottom = y + self.graph_height
+        for i, ms in enumerate(times):
+            height = min(self.graph_height, max(1, int(ms * scale)))
+            if ms <= budget:
+                color = GREEN
+            elif ms <= 2 * budget:
+                color = (255, 165, 0) # Orange
+            else:
+                color = RADICCHIO_RED
+            self.image.fill(color, (x + i * self.bar_width, bottom - height, self.bar_width, height))
+        budget_y = bottom - int(budget * scale)
+        pygame.draw.line(self.image, WHITE, (x, budget_y), (x + PROFILER_GRAPH_FRAMES * self.bar_width - 1, budget_y))
+
+        y = bottom + self.padding
+        for name, average, worst in self.profiler.worst_offenders(PROFILER_GRAPH_FRAMES, PROFILER_OFFENDERS):
+            line = f"{name}: {average:.2f} ms avg, {worst:.2f} ms max"
+            self.image.blit(self.font.render(line, True, WHITE), (x, y))
+            y += self.line_height
 
 class NervePath:
     """
     Represents the path for the TRAUMA minigame.
     Generates a random jagged path and handles collision detection for deviation.
+    Segment data is precomputed once, and the player's progress along the path is tracked
+    so most queries only search a few segments around it.
     """
-    def __init__(self):
-        self.points = self.generate_path()
+    def __init__(self, points=None, rng=random):
+        # A fixed list of points can be given instead (e.g. for benchmarks)
+        self.points = list(points) if points is not None else self.generate_path(rng)
         self.start_point = self.points[0]
         self.end_point = self.points[-1]
         self.width = 30 # Thickness of the "safe zone" is implied, visual line thickness might be different
+        self.precompute_segments()
+        self.progress_index = 0 # Segment the player was last nearest to
 
-    def generate_path(self):
+    def precompute_segments(self):
+        # Per segment: start point, direction vector, 1 / squared length (0 for degenerate
+        # segments, which makes them behave like their start point) and arc length so far
+        starts = self.points[:-1]
+        dirs = [(x2 - x1, y2 - y1) for (x1, y1), (x2, y2) in zip(self.points, self.points[1:])]
+        lengths = [math.hypot(dx, dy) for dx, dy in dirs]
+        inv_len_sq = [1 / (l * l) if l else 0.0 for l in lengths]
+        arc_starts = [0.0]
+        for l in lengths[:-1]:
+            arc_starts.append(arc_starts[-1] + l)
+
+        self.segment_count = len(dirs)
+        self.length = sum(lengths)
+        self.seg_starts = starts
+        self.seg_dirs = dirs
+        self.seg_inv_len_sq = inv_len_sq
+        self.seg_lengths = lengths
+        self.seg_arc_starts = arc_starts[:len(dirs)]
+
+    def generate_path(self, rng=random):
         # Generate a random jagged line across the screen
         points = []
         start_x = 50
@@ -227,8 +755,8 @@ class NervePath:
         current_y = start_y
 
         while current_x < SCREEN_WIDTH - 50:
-            current_x += random.randint(30, 80)
-            current_y += random.randint(-50, 50)
+            current_x += rng.randint(30, 80)
+            current_y += rng.randint(-50, 50)
             # Clamp Y
             # Limit to top 1/3 of screen to avoid hand obstruction
             max_y = SCREEN_HEIGHT // 3
@@ -238,37 +766,56 @@ class NervePath:
         return points
 
     def draw(self, surface):
+        # Onto a render framebuffer-sized surface
         if len(self.points) > 1:
-            pygame.draw.lines(surface, VEIN_WHITE, False, self.points, 5)
+            points = self.points
+            if RENDER_SCALE != 1:
+                points = [(x * RENDER_SCALE, y * RENDER_SCALE) for x, y in points]
+            pygame.draw.lines(surface, VEIN_WHITE, False, points, render_px(5))
 
-    def get_distance_to_segment(self, point, segment_start, segment_end):
-        # Calculate distance from point to line segment
+    def nearest_in_range(self, point, lo, hi):
+        """
+        Returns (distance, segment index, t along that segment) for the segment in [lo, hi)
+        closest to point.
+        """
         px, py = point
-        x1, y1 = segment_start
-        x2, y2 = segment_end
+        best = (float('inf'), lo, 0.0)
+        for i in range(lo, hi):
+            x1, y1 = self.seg_starts[i]
+            dx, dy = self.seg_dirs[i]
+            t = max(0, min(1, ((px - x1) * dx + (py - y1) * dy) * self.seg_inv_len_sq[i]))
+            dist = math.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+            if dist < best[0]:
+                best = (dist, i, t)
+        return best
 
-        dx = x2 - x1
-        dy = y2 - y1
-
-        if dx == 0 and dy == 0:
-            return math.hypot(px - x1, py - y1)
+    def query(self, mouse_pos):
+        """
+        Returns (distance, segment index, arc-length progress) for the nearest point on the
+        part of the path the player has followed so far.
+        Progress only extends through consecutive segments the player is within
+        NERVE_DEVIATION_LIMIT of, starting from the tracked segment, so it can't skip ahead:
+        being near the path further along counts as deviating. The NERVE_SEARCH_WINDOW
+        segments up to the tracked one are searched first, and the rest of the path behind
+        it only if the player isn't within NERVE_DEVIATION_LIMIT of those.
+        """
+        if self.segment_count == 0:
+            return math.hypot(mouse_pos[0] - self.start_point[0], mouse_pos[1] - self.start_point[1]), 0, 0.0
 
-        t = ((px - x1) * dx + (py - y1) * dy) / (dx * dx + dy * dy)
-        t = max(0, min(1, t)) # Clamp to segment
+        current = self.progress_index
+        while (current + 1 < self.segment_count
+               and self.nearest_in_range(mouse_pos, current + 1, current + 2)[0] <= NERVE_DEVIATION_LIMIT):
+            current += 1
 
-        closest_x = x1 + t * dx
-        closest_y = y1 + t * dy
+        lo = max(0, current - NERVE_SEARCH_WINDOW)
+        dist, index, t = self.nearest_in_range(mouse_pos, lo, current + 1)
+        if dist > NERVE_DEVIATION_LIMIT and lo > 0:
+            dist, index, t = self.nearest_in_range(mouse_pos, 0, current + 1)
 
-        return math.hypot(px - closest_x, py - closest_y)
+        self.progress_index = index
+        progress = self.seg_arc_starts[index] + t * self.seg_lengths[index]
+        return dist, index, progress
 
     def check_deviation(self, mouse_pos):
-        # Check if mouse is too far from ALL segments (simplified collision)
-        # In a real game, you might track progress along the path.
-        # Here we just check if the player is close to ANY part of the line.
-        min_dist = float('inf')
-        for i in range(len(self.points) - 1):
-            dist = self.get_distance_to_segment(mouse_pos, self.points[i], self.points[i+1])
-            if dist < min_dist:
-                min_dist = dist
-        
-        return min_dist
+        # Distance from the mouse to the nearest part of the line
+        return self.query(mouse_pos)[0]
@@ -1,24 +1,54 @@
 
 import pygame
 import math
+import random
 from settings import *
 from sprites import *
+from spatial_grid import SpatialGrid
+from scheduler import Scheduler, TIMER_SPAWN, time_after
+from particles import ParticleSystem
+from frame_memory import RingBuffer
+from input_source import MouseInput
+from profiler import profiler
+from telemetry import (telemetry, EVENT_SLICE, EVENT_MISS, EVENT_INJURY, EVENT_TRAUMA_ENTER,
+                       EVENT_TRAUMA_EXIT, EVENT_HAND_STAGE)
+from audio import audio, CUE_PERFECT, CUE_POOR_ANGLE, CUE_BAD_CUT, CUE_INJURY, CUE_COUNTDOWN, CUE_HAND_STAGE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None # Particle effects are skipped without NumPy
 
 class StateManager:
     """
     Manages the game state, transitions, and core game logic.
     Handles switching between PREP and TRAUMA modes, managing sanity, score, and input.
+    All timers run on simulated time (`self.time`, in ms), advanced only by update(),
+    so gameplay is identical whatever the render rate.
+    Randomness comes only from `rng` and input only from `input_source` (polled once per step),
+    so a seed plus the recorded input reproduces a session exactly.
     """
-    def __init__(self):
+    def __init__(self, rng=random, input_source=None):
+        self.rng = rng
+        self.input = input_source if input_source is not None else MouseInput()
         self.state = "PREP"
+        self.time = 0 # Simulated ms since the session started
+        self.last_dt = SIM_STEP_MS
+        self.accumulator = 0.0 # Real ms passed to advance() not yet simulated
         self.sanity = INITIAL_SANITY
         self.score = 0
-        self.font = pygame.font.Font(None, 36)
-        self.large_font = pygame.font.Font(None, 100) # For countdown
+        self.font = pygame.font.Font(None, render_px(36))
+        self.large_font = pygame.font.Font(None, render_px(100)) # For countdown
         
         # PREP State variables
-        self.ingredients = pygame.sprite.Group()
-        self.spawn_timer = 0
+        self.scheduler = Scheduler() # Spawn and ingredient timers
+        self.ingredient_store = IngredientStore(rng=rng, scheduler=self.scheduler)
+        self.ingredients = self.ingredient_store # The live ingredients' sprites
+        self.ingredient_sprites = 0 # Store sprites added to the render group so far
+        # Ingredients only spawn in the top third, so that's all the grid needs to cover
+        self.ingredient_grid = SpatialGrid((0, 0, SCREEN_WIDTH, SCREEN_HEIGHT // 3), INGREDIENT_GRID_CELL_SIZE)
+        self.spawn_timer = 0 # When the last ingredient spawned
+        self.spawn_event = None
         self.spawn_interval = 2000 # milliseconds
 
         # TRAUMA State variables
@@ -26,12 +56,13 @@ class StateManager:
         self.deviated = False
         self.trauma_start_time = 0
         self.is_grace_period = False
+        self.countdown_second = None # Last countdown number a cue was played for
         self.pulse_timer = 0
         self.deviation_timer = 0
-        self.last_frame_time = 0
         self.damage_flash_timer = 0
         self.last_mouse_pos = None
-        self.slice_trail = []
+        self.slice_trail = RingBuffer(SLICE_TRAIL_LENGTH)
+        self.slice_samples = RingBuffer(SLICE_ANGLE_HISTORY) # Mouse samples of the current stroke
         self.last_feedback = ""
         self.last_feedback_color = WHITE
         self.feedback_timer = 0
@@ -39,40 +70,216 @@ class StateManager:
         # Reset & Progression Variables
         self.hand_stage = 0
         self.fade_alpha = 0
+        self.previous_fade_alpha = 0 # For interpolating the fade between steps
         self.fade_state = "IDLE" # IDLE, FADING_OUT, FADING_IN
 
+        # Scratch containers reused every frame instead of reallocated
+        self.slice_candidates = {}
+        self.slice_hits = []
+
+        # Rendering: everything on screen is a dirty sprite drawn over a static background,
+        # in render framebuffer pixels (RENDER_WIDTH x RENDER_HEIGHT).
+        # Backgrounds are pre-rendered layers swapped in as the backdrop changes; the TRAUMA ones
+        # include the nerve path and are only redrawn when the path changes.
+        # The layers are created on the first draw(), so headless sessions never allocate them.
+        self.backgrounds = None
+        self.background = None
+        self.background_key = None
+        self.path_layer_surface = None # Full-screen scratch the path layer is rendered on
+        self.path_layer = None # Copy of just the drawn area of path_layer_surface
+        self.path_layer_rect = None
+        self.layers_path = None # The nerve path the layers were rendered for
+        self.particles = None # Created with the layers when NumPy is available; effects need no gameplay state
+        self.all_sprites = pygame.sprite.LayeredDirty()
+        self.trail_sprite = TrailSprite()
+        self.feedback_text = TextSprite(self.font, center=(RENDER_WIDTH//2, RENDER_HEIGHT//2))
+        self.countdown_text = TextSprite(self.large_font, center=(RENDER_WIDTH//2, RENDER_HEIGHT//2))
+        self.sanity_text = LabelSprite(self.font, "Sanity: ", WHITE, render_pos((10, 10)))
+        self.score_text = LabelSprite(self.font, "Score: ", WHITE, render_pos((10, 50)))
+        self.fade_overlay = FadeOverlay()
+        self.all_sprites.add(self.trail_sprite, layer=LAYER_TRAIL)
+        self.all_sprites.add(self.feedback_text, self.countdown_text, self.sanity_text, self.score_text, layer=LAYER_HUD)
+        self.all_sprites.add(self.fade_overlay, layer=LAYER_FADE)
+        self.add_ingredient_sprites()
+
+    @property
+    def spawn_interval(self):
+        return self._spawn_interval
+
+    @spawn_interval.setter
+    def spawn_interval(self, interval):
+        # Tools tune this on a live session, so the pending spawn moves with it
+        self._spawn_interval = interval
+        self.schedule_spawn()
+
+    def schedule_spawn(self):
+        # Due once more than spawn_interval has passed since the last spawn
+        self.scheduler.cancel(self.spawn_event)
+        self.spawn_event = self.scheduler.schedule(time_after(self.spawn_timer, self.spawn_interval), TIMER_SPAWN)
+
+    def add_ingredient_sprites(self):
+        # Each slot's sprite joins the render group once and stays there, hidden while the
+        # slot is free, and its grid entry and cells' tables are created up front, so
+        # spawning and removing ingredients never adds to or resizes either
+        new = self.ingredient_store.sprites[self.ingredient_sprites:]
+        for ingredient in new:
+            self.all_sprites.add(ingredient, layer=LAYER_INGREDIENTS)
+            self.ingredient_grid.insert(ingredient, ingredient.hitbox)
+        for ingredient in new:
+            self.ingredient_grid.remove(ingredient)
+        self.ingredient_sprites += len(new)
+
+    def spawn_ingredient(self):
+        ingredient = self.ingredient_store.spawn(self.time)
+        if self.ingredient_sprites < len(self.ingredient_store.sprites):
+            self.add_ingredient_sprites() # The store grew
+        self.ingredient_grid.insert(ingredient, ingredient.hitbox)
+
+    def remove_ingredient(self, ingredient):
+        # Hides the sprite and frees its store slot
+        self.ingredient_grid.remove(ingredient)
+        self.ingredient_store.release(ingredient)
+
+    def clear_ingredients(self):
+        for ingredient in self.ingredients:
+            self.remove_ingredient(ingredient)
+
     def reset_trauma(self):
         """
         Resets the state for the TRAUMA minigame.
         Generates a new nerve path and resets timers.
         """
-        self.nerve_path = NervePath()
+        self.nerve_path = NervePath(rng=self.rng)
         self.deviated = False
-        self.trauma_start_time = pygame.time.get_ticks()
+        self.trauma_start_time = self.time
         self.is_grace_period = True
+        self.countdown_second = None
         self.deviation_timer = 0
-        self.last_frame_time = pygame.time.get_ticks()
         self.damage_flash_timer = 0
         self.last_mouse_pos = None
-        self.slice_trail = []
+        self.slice_trail.clear()
+        self.slice_samples.clear()
+        self.clear_ingredients() # Not shown during TRAUMA and discarded on the way out
 
     def handle_input(self, event):
-        # Input handling for prep moved to update for continuous drag detection
-        if self.state == "TRAUMA":
-            # Input handling for trauma mostly happens in update via mouse pos
-            pass
+        # Mouse events are batched by the input source and processed on the next update
+        self.input.handle_event(event)
 
-    def update(self, hand=None):
+    def slice_angle(self, mouse_pos):
         """
-        Main update loop for the game state.
+        Direction (degrees, Cartesian with Y up) of the stroke arriving at mouse_pos.
+        Measured from the latest stroke sample at least SLICE_ANGLE_BASELINE px back,
+        so closely spaced sub-frame samples don't quantize the angle.
+        """
+        anchor = self.last_mouse_pos
+        samples = self.slice_samples
+        # The newest sample is mouse_pos itself
+        for i in range(len(samples) - 2, -1, -1):
+            anchor = samples[i]
+            if math.hypot(mouse_pos[0] - anchor[0], mouse_pos[1] - anchor[1]) >= SLICE_ANGLE_BASELINE:
+                break
+        if not anchor or anchor == mouse_pos:
+            return 0 # Default if no movement
+        dx = mouse_pos[0] - anchor[0]
+        dy = mouse_pos[1] - anchor[1]
+        # Cartesian Angle (Y up)
+        return math.degrees(math.atan2(-dy, dx))
+
+    def process_slice(self, mouse_pos):
+        """
+        Hit-tests the slice segment from the previous mouse sample to mouse_pos and scores any cuts.
+        """
+        with profiler.section("hit_test"):
+            # Check for collisions with ingredients
+            # Only ingredients in grid cells crossed by this sample's slice segment can be hit
+            slice_start = self.last_mouse_pos or mouse_pos
+            candidates = self.ingredient_grid.query_segment(slice_start, mouse_pos, self.slice_candidates)
+            hits = self.slice_hits
+            hits.clear()
+            for ingredient in candidates:
+                # Check point (stationary slice - ignores angle)
+                # Actually, stationary slice has no angle. Disallow? 
+                # Or treat as "Bad Cut"? "Drag" implies movement.
+                # Let's require movement for a "Good" cut.
+
+                hit = False
+                if ingredient.hitbox.collidepoint(mouse_pos):
+                     hit = True # Simple hit
+
+                # Check line (fast slice)
+                if not hit and self.last_mouse_pos:
+                     if ingredient.hitbox.clipline(self.last_mouse_pos, mouse_pos):
+                         hit = True
+
+                if hit:
+                    hits.append(ingredient)
+
+        for hit in hits:
+            slice_angle = self.slice_angle(mouse_pos)
+
+            # Normalize angles to [0, 180)
+            slice_norm = slice_angle % 180
+            target_norm = hit.angle % 180
+
+            diff = abs(slice_norm - target_norm)
+            diff = min(diff, 180 - diff) # Handle wrap around (e.g. 179 vs 1)
+
+            # Scoring Logic
+            if diff <= 15:
+                self.score += 1
+                telemetry.record(EVENT_SLICE, self.time, diff, 1, 0)
+                audio.play(CUE_PERFECT)
+                self.last_feedback = "Perfect!"
+                self.last_feedback_color = GREEN
+            elif diff <= 30:
+                self.sanity -= 5
+                telemetry.record(EVENT_SLICE, self.time, diff, 0, -5)
+                audio.play(CUE_POOR_ANGLE)
+                self.last_feedback = "Poor Angle!"
+                self.last_feedback_color = (255, 165, 0) # Orange
+            else:
+                self.sanity -= 10
+                telemetry.record(EVENT_SLICE, self.time, diff, 0, -10)
+                audio.play(CUE_BAD_CUT)
+                self.last_feedback = "BAD CUT!"
+                self.last_feedback_color = RADICCHIO_RED
+
+            self.feedback_timer = 1000 # Show for 1s
+            if self.particles is not None:
+                self.particles.emit_slice(self.time, hit.hitbox.center, slice_angle)
+            self.remove_ingredient(hit)
+
+    def advance(self, elapsed, hand=None):
+        """
+        Adds `elapsed` ms of real time and runs every whole SIM_STEP_MS step that completes;
+        the remainder carries over to the next call, so the steps run are the same however
+        the time is split into frames. Returns how far (0..1) the render falls between the
+        last two steps, for draw().
+        """
+        self.accumulator += elapsed
+        while self.accumulator >= SIM_STEP_MS:
+            self.update(hand, SIM_STEP_MS)
+            self.accumulator -= SIM_STEP_MS
+        return self.accumulator / SIM_STEP_MS
+
+    def update(self, hand=None, dt=SIM_STEP_MS):
+        """
+        Advances the simulation by one fixed step of dt ms.
         Handles logic for PREP (slicing) and TRAUMA (path following) modes.
         """
+        self.time += dt
+        self.last_dt = dt
+        self.previous_fade_alpha = self.fade_alpha
+        # Sampled on every step, even ones that return early, so recordings stay aligned
+        samples = self.input.poll() # (position, left button) for each event since the last step
+
         # --- Handle Fading Logic ---
         if self.sanity <= 0 and self.fade_state == "IDLE":
             self.fade_state = "FADING_OUT"
+            audio.play(CUE_HAND_STAGE)
 
         if self.fade_state == "FADING_OUT":
-            self.fade_alpha += FADE_SPEED
+            self.fade_alpha += FADE_SPEED * dt
             if self.fade_alpha >= 255:
                 self.fade_alpha = 255
                 # Perform Hard Reset
@@ -80,14 +287,15 @@ class StateManager:
                 self.sanity = INITIAL_SANITY
                 self.state = "PREP"
                 self.hand_stage += 1
+                telemetry.record(EVENT_HAND_STAGE, self.time, self.hand_stage)
                 if hand:
                     hand.set_hand_stage(self.hand_stage)
-                self.ingredients.empty()
+                self.clear_ingredients()
                 self.score = 0 # Optional: Reset score on "death"? Keeping it for now.
             return # Block other updates while fading out
 
         elif self.fade_state == "FADING_IN":
-            self.fade_alpha -= FADE_SPEED
+            self.fade_alpha -= FADE_SPEED * dt
             if self.fade_alpha <= 0:
                 self.fade_alpha = 0
                 self.fade_state = "IDLE"
@@ -101,105 +309,50 @@ class StateManager:
             if self.sanity <= TRAUMA_THRESHOLD and self.fade_state == "IDLE": # Only enter trauma if not dying
                 self.state = "TRAUMA"
                 self.reset_trauma()
+                telemetry.record(EVENT_TRAUMA_ENTER, self.time, self.sanity)
                 return
 
-            # Spawn Ingredients
-            now = pygame.time.get_ticks()
-            if now - self.spawn_timer > self.spawn_interval:
-                self.ingredients.add(Ingredient())
-                self.spawn_timer = now
+            # Timers due this step: the spawn is handled first, the ingredients' after slicing
+            now = self.time
+            timers = self.scheduler.pop_due(now)
+            for _, _, kind, _ in timers:
+                if kind == TIMER_SPAWN:
+                    self.spawn_ingredient()
+                    self.spawn_timer = now
+                    self.schedule_spawn()
 
             # Interaction & Expiry Logic
-            mouse_pos = pygame.mouse.get_pos()
-            mouse_pressed = pygame.mouse.get_pressed()[0] # Left Click
-            
-            # Slicing Logic: active if mouse is down
-            if mouse_pressed:
-                self.slice_trail.append(mouse_pos)
-                if len(self.slice_trail) > 10: # Max trail length
-                    self.slice_trail.pop(0)
-
-                # Check for collisions with ingredients
-                hits = []
-                for ingredient in self.ingredients:
-                    # Check point (stationary slice - ignores angle)
-                    # Actually, stationary slice has no angle. Disallow? 
-                    # Or treat as "Bad Cut"? "Drag" implies movement.
-                    # Let's require movement for a "Good" cut.
-                    
-                    hit = False
-                    if ingredient.rect.collidepoint(mouse_pos):
-                         hit = True # Simple hit
-                    
-                    # Check line (fast slice)
-                    if not hit and self.last_mouse_pos:
-                         if ingredient.rect.clipline(self.last_mouse_pos, mouse_pos):
-                             hit = True
-                    
-                    if hit:
-                        hits.append(ingredient)
-
-                for hit in hits:
-                    # Angle Calculation
-                    if self.last_mouse_pos and self.last_mouse_pos != mouse_pos:
-                        dx = mouse_pos[0] - self.last_mouse_pos[0]
-                        dy = mouse_pos[1] - self.last_mouse_pos[1]
-                        # Cartesian Angle (Y up)
-                        slice_angle = math.degrees(math.atan2(-dy, dx))
-                    else:
-                        slice_angle = 0 # Default if no movement
-                    
-                    # Normalize angles to [0, 180)
-                    slice_norm = slice_angle % 180
-                    target_norm = hit.angle % 180
-                    
-                    diff = abs(slice_norm - target_norm)
-                    diff = min(diff, 180 - diff) # Handle wrap around (e.g. 179 vs 1)
-                    
-                    # Scoring Logic
-                    if diff <= 15:
-                        self.score += 1
-                        print(f"Excellent Cut! Diff: {diff:.1f}")
-                        self.last_feedback = "Perfect!"
-                        self.last_feedback_color = GREEN
-                    elif diff <= 30:
-                        self.sanity -= 5
-                        print(f"Good/Bad Cut? Diff: {diff:.1f}")
-                        self.last_feedback = "Poor Angle!"
-                        self.last_feedback_color = (255, 165, 0) # Orange
-                    else:
-                        self.sanity -= 10
-                        print(f"Bad Cut! Diff: {diff:.1f}")
-                        self.last_feedback = "BAD CUT!"
-                        self.last_feedback_color = RADICCHIO_RED
-
-                    self.feedback_timer = 1000 # Show for 1s
-                    hit.kill()
+            # Slicing Logic: every mouse sample since the last step is processed in order,
+            # so a fast stroke is hit-tested along the path it actually took
+            for mouse_pos, mouse_pressed in samples:
+                if mouse_pressed:
+                    self.slice_samples.append(mouse_pos)
+                    self.process_slice(mouse_pos)
+                else:
+                    self.slice_samples.clear()
+                self.last_mouse_pos = mouse_pos
 
+            # The trail shows where the knife was at each step
+            if mouse_pressed:
+                self.slice_trail.append(mouse_pos) # Ring buffer drops the oldest point
             else:
                 self.slice_trail.clear()
 
-            # Update Ingredients (handles blinking)
-            self.ingredients.update()
-            
-            # Check for Expiry logic...
-            
-            # Check for Expiry
-            for ingredient in self.ingredients:
-                elapsed = now - ingredient.creation_time
-                if elapsed > INGREDIENT_LIFETIME:
-                    ingredient.kill()
-                    self.sanity -= SANITY_PENALTY_MISS
-                    # Optional: Text feedback for miss
-            
-            # Update last mouse pos for next frame slicing
-            self.last_mouse_pos = mouse_pos
+            if self.feedback_timer > 0:
+                self.feedback_timer -= dt
+
+            # Update Ingredients: blinking and expiry, for just the ingredients with a timer due
+            for ingredient in self.ingredient_store.handle_timers(timers, now):
+                self.remove_ingredient(ingredient)
+                self.sanity -= SANITY_PENALTY_MISS
+                telemetry.record(EVENT_MISS, now, -SANITY_PENALTY_MISS)
+                # Optional: Text feedback for miss
 
         elif self.state == "TRAUMA":
             if not self.nerve_path:
                 self.reset_trauma()
 
-            now = pygame.time.get_ticks()
+            now = self.time
             elapsed = now - self.trauma_start_time
             
             if self.is_grace_period:
@@ -207,24 +360,34 @@ class StateManager:
                     self.is_grace_period = False
                 else:
                     # In grace period, just update pulse timer and return
-                    self.pulse_timer += 1
+                    self.pulse_timer += dt
+                    # Tick as each countdown number appears
+                    second = int((GRACE_PERIOD_DURATION - elapsed) // 1000) + 1
+                    if second != self.countdown_second:
+                        self.countdown_second = second
+                        audio.play(CUE_COUNTDOWN)
                     return
 
             # Active Game Logic (Post Grace Period)
-            mouse_pos = pygame.mouse.get_pos()
-            distance = self.nerve_path.check_deviation(mouse_pos)
-            
-            dt = now - self.last_frame_time
-            self.last_frame_time = now
+            # Every sample since the last step has to stay on the path, not just the latest
+            deviated = False
+            with profiler.section("nerve"):
+                for mouse_pos, _ in samples:
+                    distance, _, progress = self.nerve_path.query(mouse_pos)
+                    if distance > NERVE_DEVIATION_LIMIT:
+                        deviated = True
 
-            if distance > NERVE_DEVIATION_LIMIT:
+            if deviated:
                 self.deviated = True
                 
                 # Damage tick logic
                 self.deviation_timer += dt
                 if self.deviation_timer >= DAMAGE_TICK_INTERVAL:
-                    print("INJURY! Deviation too high.")
                     self.sanity -= 1 
+                    telemetry.record(EVENT_INJURY, now, -1)
+                    audio.play(CUE_INJURY)
+                    if self.particles is not None:
+                        self.particles.emit_blood(now, mouse_pos)
                     self.deviation_timer = 0 # Reset after damage
                     self.damage_flash_timer = 150 # Flash for 150ms
             else:
@@ -233,77 +396,180 @@ class StateManager:
                 
                 # Healing mechanic? Or just survive? 
                 # If they reach the end, maybe restore sanity to PREP state?
-                # Simplified: if x > SCREEN_WIDTH - 50, success
-                if mouse_pos[0] > SCREEN_WIDTH - 100:
+                # Success once the player has followed the nerve to its end
+                if progress >= self.nerve_path.length - NERVE_END_ZONE:
                     self.sanity = 50 # Restore some sanity
                     self.state = "PREP"
-                    self.ingredients.empty()
+                    telemetry.record(EVENT_TRAUMA_EXIT, now, self.sanity)
+                    self.clear_ingredients()
             
             if self.damage_flash_timer > 0:
                 self.damage_flash_timer -= dt
 
-    def draw(self, surface):
-        if self.state == "PREP":
-            surface.fill(BLACK) # Kitchen background placeholder
-            self.ingredients.draw(surface)
-            
-            # Draw Slice Trail
-            if len(self.slice_trail) > 1:
-                pygame.draw.lines(surface, WHITE, False, self.slice_trail, 3)
+    def time_until_change(self):
+        """
+        Simulated ms until the screen next changes on its own, assuming no further input:
+        the next spawn, blink edge, expiry, feedback timeout or damage tick.
+        0 while something animates continuously (fades, the grace period pulse and countdown,
+        the slice trail, particles); infinity if nothing is scheduled. Used for adaptive frame pacing.
+        """
+        if self.fade_state != "IDLE" or self.sanity <= 0:
+            return 0
+        now = self.time
+        if self.particles is not None and self.particles.active(now):
+            return 0
 
-            # Draw Feedback
+        if self.state == "PREP":
+            if self.sanity <= TRAUMA_THRESHOLD or len(self.slice_trail):
+                return 0
+            wait = self.scheduler.next_time() - now
             if self.feedback_timer > 0:
-                text = self.font.render(self.last_feedback, True, self.last_feedback_color)
-                rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
-                surface.blit(text, rect)
-                self.feedback_timer -= (pygame.time.get_ticks() - self.last_frame_time) # Approx dt
+                wait = min(wait, self.feedback_timer)
+        else:
+            if not self.nerve_path or self.is_grace_period:
+                return 0
+            wait = float("inf")
+            if self.deviated:
+                wait = DAMAGE_TICK_INTERVAL - self.deviation_timer
+            if self.damage_flash_timer > 0:
+                wait = min(wait, self.damage_flash_timer)
+        return max(0, wait)
 
-        
-        elif self.state == "TRAUMA":
-            # Background
+    def create_render_layers(self):
+        self.backgrounds = {name: pygame.Surface((RENDER_WIDTH, RENDER_HEIGHT))
+                            for name in ("PREP", "TRAUMA", "FLASH", "PULSE")}
+        self.backgrounds["PREP"].fill(BLACK) # Kitchen background placeholder
+        self.background = self.backgrounds["PREP"]
+        # Nerve path and start marker over a colorkey, composited onto the grace period pulse.
+        # A colorkeyed, RLE-encoded layer blits much faster than one with per-pixel alpha.
+        self.path_layer_surface = pygame.Surface((RENDER_WIDTH, RENDER_HEIGHT))
+        self.path_layer_surface.set_colorkey(BLACK)
+        self.trail_sprite.create_canvas()
+        self.fade_overlay.create_surface()
+        if np is not None:
+            self.particles = ParticleSystem()
+            self.particles.create_canvas()
+            self.all_sprites.add(self.particles, layer=LAYER_PARTICLES)
+
+    def close(self):
+        """
+        Returns the pooled full-screen surfaces, so the next session reuses them.
+        """
+        self.trail_sprite.release_canvas()
+        self.fade_overlay.release_surface()
+
+    def build_path_layers(self):
+        """
+        Pre-renders everything static about the current nerve path: the plain and
+        damage-flash TRAUMA backgrounds, and the path layer for the grace period.
+        """
+        path = self.nerve_path
+        for name, color in (("TRAUMA", RADICCHIO_RED), ("FLASH", WHITE)):
+            background = self.backgrounds[name]
+            background.fill(color)
+            path.draw(background)
+
+        layer = self.path_layer_surface
+        layer.fill(BLACK)
+        path.draw(layer)
+        # Highlight Start Point during grace period
+        start_pos = render_pos(path.start_point)
+        # Draw glowing green circle
+        pygame.draw.circle(layer, GREEN, start_pos, render_px(START_POINT_RADIUS), render_px(3))
+        self.path_layer_rect = layer.get_bounding_rect() # Pixels other than the colorkey
+        self.path_layer = layer.subsurface(self.path_layer_rect).copy()
+        self.path_layer.set_colorkey(BLACK, pygame.RLEACCEL)
+
+        self.layers_path = path
+        self.background_key = None
+
+    def render_background(self, lag):
+        """
+        Selects the background layer for the current backdrop.
+        Any change forces a full repaint; otherwise only sprites' dirty rects are redrawn.
+        Only the grace period pulse is rendered while playing (a fill and one blit);
+        every other backdrop is pre-rendered.
+        `lag` is how many ms the rendered moment trails the latest simulation step.
+        """
+        if self.backgrounds is None:
+            self.create_render_layers()
+        if self.state == "TRAUMA" and self.nerve_path:
+            if self.layers_path is not self.nerve_path:
+                self.build_path_layers()
             if self.is_grace_period:
                 # Pulsating Red
-                import math
-                pulse = (math.sin(self.pulse_timer * PULSE_SPEED) + 1) / 2 # 0 to 1
+                pulse = (math.sin((self.pulse_timer - lag) * PULSE_SPEED) + 1) / 2 # 0 to 1
                 # Interpolate between BLACK and RADICCHIO_RED
                 # Dark: (0, 0, 0), Bright: RADICCHIO_RED (142, 35, 68)
                 r = int(0 + (RADICCHIO_RED[0] - 0) * pulse)
                 g = int(0 + (RADICCHIO_RED[1] - 0) * pulse)
                 b = int(0 + (RADICCHIO_RED[2] - 0) * pulse)
-                surface.fill((r, g, b))
+                name, color = "PULSE", (r, g, b)
             elif self.damage_flash_timer > 0:
-                 # Flash White (same as countdown)
-                 surface.fill(WHITE)
+                # Flash White (same as countdown)
+                name, color = "FLASH", WHITE
             else:
-                surface.fill(RADICCHIO_RED)
+                name, color = "TRAUMA", RADICCHIO_RED
+        else:
+            name, color = "PREP", BLACK
 
-            if self.nerve_path:
-                self.nerve_path.draw(surface)
-                
-                # Highlight Start Point during grace period
-                if self.is_grace_period:
-                    start_pos = self.nerve_path.start_point
-                    # Draw glowing green circle
-                    pygame.draw.circle(surface, GREEN, (int(start_pos[0]), int(start_pos[1])), START_POINT_RADIUS, 3)
-                    
-                    # Draw Countdown
-                    remaining = max(0, GRACE_PERIOD_DURATION - (pygame.time.get_ticks() - self.trauma_start_time))
-                    seconds = (remaining // 1000) + 1
-                    timer_text = self.large_font.render(str(seconds), True, WHITE)
-                    text_rect = timer_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
-                    surface.blit(timer_text, text_rect)
-            
-            # Removed Text Blit
+        key = (name, color)
+        if key == self.background_key:
+            return
+        self.background_key = key
+
+        self.background = self.backgrounds[name]
+        if name == "PULSE":
+            self.background.fill(color)
+            self.background.blit(self.path_layer, self.path_layer_rect)
+
+        self.all_sprites.repaint_rect(self.background.get_rect())
+
+    def draw(self, surface, alpha=1.0):
+        """
+        Renders the current state through the dirty sprite group.
+        `alpha` (0..1) is how far the render falls between the previous and latest
+        simulation step; time-driven visuals are interpolated by it. Drawing never
+        changes gameplay state.
+        Returns the list of screen rects that changed, for pygame.display.update().
+        """
+        lag = (1 - alpha) * self.last_dt
+        self.render_background(lag)
+
+        if self.state == "PREP":
+            # Draw Slice Trail
+            self.trail_sprite.set_trail(self.slice_trail)
+
+            # Draw Feedback
+            if self.feedback_timer > 0:
+                self.feedback_text.set_text(self.last_feedback, self.last_feedback_color)
+                self.feedback_text.set_visible(True)
+            else:
+                self.feedback_text.set_visible(False)
+        else:
+            self.trail_sprite.set_trail(None)
+            self.feedback_text.set_visible(False)
+
+        # Draw Countdown
+        if self.state == "TRAUMA" and self.nerve_path and self.is_grace_period:
+            remaining = max(0, GRACE_PERIOD_DURATION - (self.time - lag - self.trauma_start_time))
+            seconds = int(remaining // 1000) + 1
+            self.countdown_text.set_text(str(seconds), WHITE)
+            self.countdown_text.set_visible(True)
+        else:
+            self.countdown_text.set_visible(False)
+
+        if self.particles is not None:
+            with profiler.section("particles"):
+                self.particles.set_time(self.time - lag)
 
         # HUD
-        sanity_text = self.font.render(f"Sanity: {self.sanity}", True, WHITE)
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-        surface.blit(sanity_text, (10, 10))
-        surface.blit(score_text, (10, 50))
+        with profiler.section("hud"):
+            self.sanity_text.set_value(self.sanity)
+            self.score_text.set_value(self.score)
 
         # --- Draw Fade Overlay ---
-        if self.fade_alpha > 0:
-            fade_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            fade_surface.fill(BLACK)
-            fade_surface.set_alpha(self.fade_alpha)
-            surface.blit(fade_surface, (0, 0))
+        fade_alpha = self.previous_fade_alpha + (self.fade_alpha - self.previous_fade_alpha) * alpha
+        self.fade_overlay.set_alpha(int(fade_alpha))
+
+        return self.all_sprites.draw(surface, self.background)
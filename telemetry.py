@@ -0,0 +1,150 @@
+"""
+Gameplay telemetry.
+The game loop records typed events (cuts, misses, injuries, trauma entry/exit, hand stage
+changes) into a preallocated ring buffer, which costs about as much as a few list stores.
+A background thread drains the buffer in batches to JSONL files for per-trainee analytics,
+so the frame never waits on a terminal, journald or the disk.
+"""
+
+import json
+import os
+import threading
+import time
+from array import array
+
+from settings import *
+
+# Event kinds, and the names of the values recorded with each
+EVENT_SLICE = 0
+EVENT_MISS = 1
+EVENT_INJURY = 2
+EVENT_TRAUMA_ENTER = 3
+EVENT_TRAUMA_EXIT = 4
+EVENT_HAND_STAGE = 5
+EVENT_NAMES = ("slice", "miss", "injury", "trauma_enter", "trauma_exit", "hand_stage")
+EVENT_FIELDS = (
+    ("angle_diff", "score_delta", "sanity_delta"),
+    ("sanity_delta",),
+    ("sanity_delta",),
+    ("sanity",),
+    ("sanity",),
+    ("stage",),
+)
+
+def json_value(value):
+    value = round(value, 3)
+    return int(value) if value.is_integer() else value
+
+class Telemetry:
+    """
+    Single-producer ring buffer of (kind, simulation ms, up to three values) events plus the
+    thread that writes them out. Only the game loop calls record(); only the writer reads.
+    If the writer ever falls a full buffer behind, the oldest events are dropped and counted.
+    Nothing is recorded until start() is called, so headless tools pay nothing.
+    """
+    def __init__(self, capacity=TELEMETRY_CAPACITY):
+        self.capacity = capacity
+        self.kinds = array("B", [0]) * capacity
+        self.times = array("d", [0]) * capacity
+        self.values = [array("d", [0]) * capacity for _ in range(3)]
+        self.count = 0 # Events recorded (written only by the producer)
+        self.drained = 0 # Events consumed (written only by the writer)
+        self.dropped = 0
+
+        self.active = False
+        self.session = None
+        self.path = None
+        self.file = None
+        self.file_index = 0
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def record(self, kind, time_ms, a=0.0, b=0.0, c=0.0):
+        if not self.active:
+            return
+        slot = self.count % self.capacity
+        self.kinds[slot] = kind
+        self.times[slot] = time_ms
+        values = self.values
+        values[0][slot] = a
+        values[1][slot] = b
+        values[2][slot] = c
+        self.count += 1 # Publishes the event to the writer
+
+    def start(self, session, log_dir=TELEMETRY_DIR):
+        """
+        Opens a new telemetry file and starts the writer thread.
+        `session` (seed, trainee, ...) is written as the first line of every file.
+        """
+        os.makedirs(log_dir, exist_ok=True)
+        self.session = dict(session, started=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        self.path = os.path.join(log_dir, time.strftime("telemetry-%Y%m%d-%H%M%S"))
+        self.file_index = 0
+        self.open_file()
+        self.count = self.drained = self.dropped = 0
+        self.active = True
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def open_file(self):
+        if self.file:
+            self.file.close()
+        suffix = f"-{self.file_index}" if self.file_index else ""
+        self.file = open(f"{self.path}{suffix}.jsonl", "w")
+        self.file_index += 1
+        self.file.write(json.dumps({"event": "session", **self.session}) + "\n")
+
+    def run(self):
+        while not self.stop_event.wait(TELEMETRY_FLUSH_INTERVAL):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """
+        Writes every event recorded since the last flush as one batch (writer thread).
+        """
+        count = self.count
+        start = max(self.drained, count - self.capacity)
+        lines = []
+        for i in range(start, count):
+            slot = i % self.capacity
+            kind = self.kinds[slot]
+            event = {"event": EVENT_NAMES[kind], "t": json_value(self.times[slot])}
+            for name, values in zip(EVENT_FIELDS[kind], self.values):
+                event[name] = json_value(values[slot])
+            lines.append(json.dumps(event))
+
+        # Events the producer overwrote while they were being read are unreliable
+        overwritten = max(0, self.count - self.capacity - start)
+        self.dropped += start - self.drained + overwritten
+        self.drained = count
+        if not lines[overwritten:]:
+            return
+
+        try:
+            self.file.write("\n".join(lines[overwritten:]) + "\n")
+            self.file.flush()
+            if self.file.tell() >= TELEMETRY_MAX_FILE_BYTES:
+                self.open_file()
+        except OSError as e:
+            print(f"Telemetry write failed: {e}")
+
+    def stop(self):
+        """
+        Stops the writer after a final flush and closes the file.
+        """
+        if not self.active:
+            return
+        self.active = False
+        self.stop_event.set()
+        self.thread.join()
+        try:
+            self.file.write(json.dumps({"event": "session_end", "events": self.count, "dropped": self.dropped}) + "\n")
+        except OSError as e:
+            print(f"Telemetry write failed: {e}")
+        self.file.close()
+        self.file = None
+
+# Shared instance the game loop records into
+telemetry = Telemetry()
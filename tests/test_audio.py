@@ -0,0 +1,56 @@
+"""
+AudioEngine on SDL's dummy audio driver: missing sound files fall back to synthesized tones
+silently, and cues share the fixed channel pool by priority.
+"""
+
+import pygame
+import pytest
+
+from settings import *
+from audio import AudioEngine
+
+# Long tones, so every channel is still busy when the next cue is played
+CUES = {
+    "low": ("low.wav", 1, 1.0, (440, 2000)),
+    "high": ("high.wav", 2, 1.0, (880, 2000)),
+}
+
+@pytest.fixture
+def engine(tmp_path, capsys):
+    pygame.mixer.init(AUDIO_FREQUENCY, -16, 2, AUDIO_BUFFER)
+    engine = AudioEngine(sound_dir=str(tmp_path))
+    engine.load(CUES)
+    assert capsys.readouterr().out == "" # Synthesizing a missing cue is the expected path
+    yield engine
+    pygame.mixer.quit()
+
+def busy_priorities(engine):
+    return [priority if channel.get_busy() else None
+            for channel, priority in zip(engine.channels, engine.channel_priority)]
+
+def test_missing_files_are_synthesized(engine):
+    assert engine.active
+    assert set(engine.sounds) == set(CUES)
+    assert engine.sounds["high"].get_length() == pytest.approx(2.0, abs=0.01)
+
+def test_cues_take_free_channels_first(engine):
+    for plays in range(1, AUDIO_CHANNELS + 1):
+        engine.play("low")
+        assert busy_priorities(engine).count(1) == plays
+    assert engine.channel_order == list(range(1, AUDIO_CHANNELS + 1))
+
+def test_full_pool_steals_the_oldest_lowest_priority_cue(engine):
+    for _ in range(AUDIO_CHANNELS):
+        engine.play("low")
+    engine.play("high")
+    assert busy_priorities(engine) == [2] + [1] * (AUDIO_CHANNELS - 1)
+    engine.play("low") # Equal priority: replaces the oldest low cue, not the high one
+    assert engine.channel_order[1] == AUDIO_CHANNELS + 2
+    assert busy_priorities(engine) == [2] + [1] * (AUDIO_CHANNELS - 1)
+
+def test_cue_is_dropped_when_every_channel_is_more_important(engine):
+    for _ in range(AUDIO_CHANNELS):
+        engine.play("high")
+    engine.play("low")
+    assert engine.plays == AUDIO_CHANNELS
+    assert busy_priorities(engine) == [2] * AUDIO_CHANNELS
@@ -0,0 +1,71 @@
+"""
+Fixed-step simulation: the same input gives the same session whatever the render rate,
+because real time is only ever consumed in whole SIM_STEP_MS steps.
+"""
+
+import math
+import random
+
+import pygame
+import pytest
+
+from settings import *
+from input_source import ScriptedInput
+from state_manager import StateManager
+
+SEED = 6
+STEPS = 1500
+
+def script(steps=STEPS):
+    # Button-down sweeps across the spawn area, with a few samples per step
+    out = []
+    for step in range(steps):
+        samples = []
+        for i in range(1 + step % 3):
+            t = step + i / 3
+            x = int(SCREEN_WIDTH // 2 + (SCREEN_WIDTH // 2 - 40) * math.sin(t * 0.021))
+            y = int(SCREEN_HEIGHT // 6 + SCREEN_HEIGHT // 7 * math.sin(t * 0.37))
+            samples.append(((x, y), step % 120 < 100))
+        out.append(samples)
+    return out
+
+def fingerprint(sm):
+    return (sm.time, sm.state, sm.score, sm.sanity, sm.hand_stage, sm.fade_alpha, sm.deviated,
+            sm.nerve_path.points[-1] if sm.nerve_path else None,
+            tuple((tuple(i.hitbox), i.angle, i.alpha) for i in sm.ingredients))
+
+def run(frame_ms, screen=None):
+    """
+    Plays the script in frames of `frame_ms` real ms, drawing each frame when given a
+    screen; returns the state after every simulation step.
+    """
+    sm = StateManager(random.Random(SEED), ScriptedInput(script()))
+    trajectory = []
+    update = sm.update
+    def recorded_update(hand=None, dt=SIM_STEP_MS):
+        update(hand, dt)
+        trajectory.append(fingerprint(sm))
+    sm.update = recorded_update
+
+    while len(trajectory) < STEPS:
+        alpha = sm.advance(frame_ms)
+        assert 0 <= alpha < 1
+        if screen is not None:
+            sm.draw(screen, alpha)
+    return trajectory[:STEPS]
+
+@pytest.fixture
+def screen():
+    pygame.init()
+    yield pygame.display.set_mode((RENDER_WIDTH, RENDER_HEIGHT))
+    pygame.quit()
+
+def test_session_is_independent_of_render_rate(screen):
+    reference = run(SIM_STEP_MS) # One step per frame, nothing drawn
+    assert any(step[1] == "TRAUMA" for step in reference) # The script has to reach both modes
+    assert reference[-1][2] != 0 or reference[-1][3] != INITIAL_SANITY
+
+    assert run(STEPS * SIM_STEP_MS) == reference # The whole session in one call
+    assert run(MAX_FRAME_TIME, screen) == reference # Many steps per frame
+    assert run(1000 / 144, screen) == reference # Many small frames, most without a step
+    assert run(1000 / 30, screen) == reference
@@ -0,0 +1,60 @@
+"""
+Headless run of an idle PREP session under FrameAllocationGuard: once the session has
+warmed up, frames that spawn an ingredient must not allocate.
+"""
+
+import gc
+import random
+import tracemalloc
+
+import pygame
+import pytest
+
+from settings import *
+from frame_memory import FrameAllocationGuard
+from state_manager import StateManager
+
+class StillMouse:
+    """Input source for a player resting the mouse below the ingredients."""
+    samples = (((SCREEN_WIDTH // 2, SCREEN_HEIGHT - 20), False),)
+
+    def handle_event(self, event):
+        pass
+
+    def poll(self):
+        return self.samples
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def screen():
+    pygame.init()
+    yield pygame.display.set_mode((RENDER_WIDTH, RENDER_HEIGHT))
+    pygame.quit()
+
+def test_spawning_frames_do_not_allocate(screen):
+    state_manager = StateManager(random.Random(1), StillMouse())
+    state_manager.spawn_interval = 500 # A spawn every 30 steps
+    # Only the spawning frames after the first spawn are checked, against half the game's
+    # retained budget, so spawning that starts to allocate fails here before it trips a session
+    guard = FrameAllocationGuard(warmup_frames=0, retained_budget=FRAME_ALLOC_RETAINED_BUDGET // 2)
+    gc.collect()
+    gc.freeze()
+    checked = 0
+    try:
+        for step in range(1, 130):
+            spawning = step > 40 and step % 30 == 1
+            if spawning:
+                guard.begin_frame()
+            state_manager.update()
+            state_manager.draw(screen)
+            if spawning:
+                guard.end_frame()
+                checked += 1
+    finally:
+        guard.close()
+        tracemalloc.stop()
+        gc.unfreeze()
+    assert checked == 3
+    assert len(state_manager.ingredients) == 4
@@ -0,0 +1,107 @@
+"""
+NervePath progress tracking: progress only extends through consecutive segments the player
+stays on, so being near the path further along is a deviation, not a shortcut.
+"""
+
+import random
+
+import pygame
+import pytest
+
+from settings import *
+from sprites import NervePath
+from state_manager import StateManager
+
+def straight_path(segments=20, length=50):
+    return NervePath([(50 + i * length, 100) for i in range(segments + 1)])
+
+def test_following_the_path_reaches_the_end():
+    path = straight_path()
+    for x in range(50, 1051, 10):
+        distance, _, progress = path.query((x, 105))
+        assert distance == 5
+    assert progress == path.length
+
+def test_jumping_ahead_is_a_deviation():
+    path = straight_path()
+    path.query((60, 100))
+    for _ in range(10):
+        distance, index, progress = path.query((1040, 100)) # On the path, next to the end
+        assert distance > NERVE_DEVIATION_LIMIT
+        assert index == 0
+        assert progress == 50 # No further than the segment followed so far
+    assert path.progress_index == 0
+
+def test_progress_only_increases_through_visited_segments():
+    path = straight_path()
+    previous = 0
+    for x in range(50, 301, 20):
+        _, index, progress = path.query((x, 110))
+        assert index <= previous + 1
+        assert progress >= 0.0
+        previous = index
+    # Skipping two segments breaks the chain, wherever the player lands
+    _, index, _ = path.query((460, 100))
+    assert index == previous
+    assert path.progress_index == previous
+
+def test_going_back_follows_the_player():
+    path = straight_path()
+    for x in range(50, 551, 10):
+        path.query((x, 100))
+    _, index, progress = path.query((110, 100))
+    assert index == 1
+    assert progress == 60
+    # Having gone back, moving ahead again means following the path again
+    assert path.query((550, 100))[0] > NERVE_DEVIATION_LIMIT
+
+class HeldMouse:
+    """Input source holding the mouse at one position."""
+    def __init__(self):
+        self.samples = [((0, 0), False)]
+
+    def handle_event(self, event):
+        pass
+
+    def poll(self):
+        return self.samples
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def screen():
+    pygame.init()
+    yield pygame.display.set_mode((RENDER_WIDTH, RENDER_HEIGHT))
+    pygame.quit()
+
+def test_moving_straight_to_the_end_does_not_finish_trauma(screen):
+    mouse = HeldMouse()
+    state_manager = StateManager(random.Random(1), mouse)
+    state_manager.state = "TRAUMA"
+    state_manager.reset_trauma()
+    state_manager.is_grace_period = False
+    state_manager.sanity = INITIAL_SANITY
+    mouse.samples[0] = (state_manager.nerve_path.points[-1], False)
+    for _ in range(60): # One second
+        state_manager.update(None, SIM_STEP_MS)
+    assert state_manager.state == "TRAUMA"
+    assert state_manager.deviated
+    assert state_manager.sanity < INITIAL_SANITY
+
+def test_following_a_generated_nerve_finishes_trauma(screen):
+    mouse = HeldMouse()
+    state_manager = StateManager(random.Random(1), mouse)
+    state_manager.state = "TRAUMA"
+    state_manager.reset_trauma()
+    state_manager.is_grace_period = False
+    points = state_manager.nerve_path.points
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        for i in range(4): # A quarter segment per step
+            mouse.samples[0] = ((x0 + (x1 - x0) * i / 4, y0 + (y1 - y0) * i / 4), False)
+            state_manager.update(None, SIM_STEP_MS)
+            assert not state_manager.deviated
+    mouse.samples[0] = (points[-1], False)
+    state_manager.update(None, SIM_STEP_MS)
+    assert state_manager.state == "PREP"
+    assert state_manager.sanity == 50
@@ -0,0 +1,116 @@
+"""
+Server protocol: INPUT and SNAPSHOT messages round-trip through their encoders and decoders,
+and a malformed INPUT message drops just the session that sent it.
+"""
+
+import asyncio
+
+import pygame
+import pytest
+
+from settings import *
+from server import (FRAME, INPUT_COUNT, INPUT_SAMPLE, MSG_INPUT, MSG_SNAPSHOT, MSG_WELCOME, SNAP_INGREDIENTS,
+                    SNAP_PATH, SNAP_TEXT, GameServer, NetworkInput, Session, decode_snapshot, encode_input, frame)
+
+class FakeTransport:
+    def get_write_buffer_size(self):
+        return 0
+
+class FakeWriter:
+    """Collects what the server writes to a client."""
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.data = bytearray()
+        self.closed = False
+
+    def write(self, data):
+        self.data += data
+
+    def close(self):
+        self.closed = True
+
+def messages(data):
+    offset = 0
+    while offset < len(data):
+        length, message_type = FRAME.unpack_from(data, offset)
+        offset += FRAME.size
+        yield message_type, bytes(data[offset:offset + length])
+        offset += length
+
+@pytest.fixture
+def fonts():
+    pygame.font.init()
+    yield
+    pygame.font.quit()
+
+def test_input_round_trip():
+    samples = [((10, 20), True), ((-5, 700), False), ((1279, 0), True)]
+    [(message_type, payload)] = messages(encode_input(samples))
+    assert message_type == MSG_INPUT
+    source = NetworkInput()
+    assert source.push(payload)
+    assert source.poll() == samples
+    assert source.poll() == [samples[-1]] # Held until the next message
+
+@pytest.mark.parametrize("payload", [
+    b"",
+    b"\x01",
+    INPUT_COUNT.pack(2) + INPUT_SAMPLE.pack(1, 2, 1), # Fewer samples than counted
+    INPUT_COUNT.pack(0) + INPUT_SAMPLE.pack(1, 2, 1), # More
+])
+def test_malformed_input_is_rejected(payload):
+    source = NetworkInput()
+    assert not source.push(payload)
+    assert source.poll() == [((0, 0), False)]
+
+def test_input_flood_keeps_the_newest_samples():
+    source = NetworkInput()
+    samples = [((i, i), False) for i in range(SERVER_MAX_INPUT_SAMPLES * 2)]
+    for i in range(0, len(samples), 10):
+        [(_, payload)] = messages(encode_input(samples[i:i + 10]))
+        assert source.push(payload)
+    assert source.poll() == samples[-SERVER_MAX_INPUT_SAMPLES:]
+
+def test_snapshot_round_trip(fonts):
+    session = Session(7, FakeWriter())
+    sm = session.state_manager
+    sm.spawn_ingredient()
+    sm.spawn_ingredient()
+    sm.last_feedback = "Perfect!"
+    session.step()
+    session.send_snapshot()
+    [(message_type, payload)] = messages(session.writer.data)
+    assert message_type == MSG_SNAPSHOT
+
+    snapshot = decode_snapshot(payload)
+    assert snapshot["step"] == 1
+    assert (snapshot["state"], snapshot["sanity"], snapshot["score"]) == (sm.state, sm.sanity, sm.score)
+    assert snapshot["flags"] & SNAP_INGREDIENTS and snapshot["flags"] & SNAP_TEXT
+    assert snapshot["ingredients"] == [(i.hitbox.x, i.hitbox.y, i.angle, i.alpha == 255) for i in sm.ingredients]
+    assert len(snapshot["ingredients"]) == 2
+    assert snapshot["text"] == "Perfect!"
+    assert "path" not in snapshot
+
+    # Unchanged sections aren't resent; a new nerve path is
+    sm.state = "TRAUMA"
+    sm.reset_trauma()
+    assert decode_snapshot(session.snapshot())["path"] == [(int(x), int(y)) for x, y in sm.nerve_path.points]
+    snapshot = decode_snapshot(session.snapshot())
+    assert not snapshot["flags"] & (SNAP_PATH | SNAP_TEXT)
+
+def test_malformed_input_drops_the_session(fonts, capsys):
+    async def run():
+        game_server = GameServer()
+        reader = asyncio.StreamReader()
+        writer = FakeWriter()
+        reader.feed_data(encode_input([((1, 2), True)]))
+        reader.feed_data(frame(MSG_INPUT, INPUT_COUNT.pack(3)))
+        handler = asyncio.ensure_future(game_server.handle_client(reader, writer))
+        await asyncio.wait_for(handler, 1) # Returns without waiting for EOF or raising
+        return game_server, writer
+
+    game_server, writer = asyncio.run(run())
+    assert game_server.sessions == {}
+    assert writer.closed
+    assert [message_type for message_type, _ in messages(writer.data)] == [MSG_WELCOME]
+    assert "malformed INPUT" in capsys.readouterr().out
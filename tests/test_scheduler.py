@@ -0,0 +1,69 @@
+"""
+Scheduler timers: due order, lazy cancellation, and the float search behind time_after().
+"""
+
+import math
+
+from scheduler import Scheduler, earliest, time_after, TIMER_SPAWN, TIMER_WARNING, TIMER_EXPIRE
+
+def test_timers_come_out_earliest_first():
+    scheduler = Scheduler()
+    for time in (30, 10, 20):
+        scheduler.schedule(time, TIMER_SPAWN, time)
+    assert [timer[3] for timer in scheduler.pop_due(25)] == [10, 20]
+    assert scheduler.next_time() == 30
+    assert [timer[3] for timer in scheduler.pop_due(30)] == [30]
+    assert scheduler.next_time() == math.inf
+
+def test_timers_due_together_keep_scheduling_order():
+    scheduler = Scheduler()
+    targets = ["first", "second", "third"]
+    scheduler.schedule(10, TIMER_EXPIRE, targets[0])
+    scheduler.schedule(10, TIMER_WARNING, targets[1])
+    scheduler.schedule(10, TIMER_EXPIRE, targets[2])
+    assert [timer[3] for timer in scheduler.pop_due(10)] == targets
+
+def test_cancelled_timers_are_dropped_lazily():
+    scheduler = Scheduler()
+    early = scheduler.schedule(10, TIMER_SPAWN)
+    late = scheduler.schedule(20, TIMER_EXPIRE, "late")
+    scheduler.cancel(early)
+    scheduler.cancel(None) # No timer pending: nothing to do
+    assert len(scheduler) == 2 # Still in the heap until it reaches the top
+    assert scheduler.next_time() == 20
+    assert len(scheduler) == 1
+    assert scheduler.pop_due(20) == [late]
+
+def test_pop_due_skips_cancelled_timers_and_reuses_its_list():
+    scheduler = Scheduler()
+    cancelled = scheduler.schedule(5, TIMER_SPAWN)
+    kept = scheduler.schedule(6, TIMER_SPAWN)
+    scheduler.cancel(cancelled)
+    due = scheduler.pop_due(10)
+    assert due == [kept]
+    assert scheduler.pop_due(10) is due
+    assert due == []
+
+def test_earliest_finds_the_first_float_where_the_condition_holds():
+    # Guesses are only ever a rounding error or two off, so the search walks a few floats
+    threshold = 0.1 + 0.2
+    condition = lambda t: t >= threshold
+    above = math.nextafter(math.nextafter(threshold, math.inf), math.inf)
+    for guess in (0.3, threshold, above):
+        assert earliest(condition, guess) == threshold
+    assert earliest(condition, math.inf) == math.inf
+
+def test_time_after_matches_the_polled_check():
+    # Simulated time is a running sum of float steps, as in StateManager.update()
+    step = 1000 / 60
+    start = 0.0
+    for _ in range(7):
+        start += step
+    delay = 2000
+    due = time_after(start, delay)
+    now = start
+    while not now - start > delay:
+        now += step
+    assert due <= now
+    assert now - step < due
+    assert due - start > delay
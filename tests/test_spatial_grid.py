@@ -0,0 +1,66 @@
+"""
+SpatialGrid.cells_on_segment: the grid traversal behind segment queries.
+"""
+
+from spatial_grid import SpatialGrid
+
+def cells(grid, start, end):
+    return [(index % grid.cols, index // grid.cols) for index in grid.cells_on_segment(start, end)]
+
+def sampled_cells(grid, start, end, samples=10000):
+    # Every cell a dense walk along the segment lands in, in order
+    out = []
+    for i in range(samples + 1):
+        t = i / samples
+        cell = grid.cell_coords(start[0] + (end[0] - start[0]) * t, start[1] + (end[1] - start[1]) * t)
+        if not out or out[-1] != cell:
+            out.append(cell)
+    return out
+
+def test_horizontal_segment():
+    grid = SpatialGrid((0, 0, 100, 100), 10)
+    assert cells(grid, (5, 5), (95, 5)) == [(x, 0) for x in range(10)]
+
+def test_vertical_segment_walks_from_its_start():
+    grid = SpatialGrid((0, 0, 100, 100), 10)
+    assert cells(grid, (55, 95), (55, 5)) == [(5, y) for y in range(9, -1, -1)]
+
+def test_segment_within_one_cell():
+    grid = SpatialGrid((0, 0, 100, 100), 10)
+    assert cells(grid, (42, 47), (48, 41)) == [(4, 4)]
+    assert cells(grid, (42, 47), (42, 47)) == [(4, 4)]
+
+def test_diagonal_segment():
+    grid = SpatialGrid((0, 0, 100, 100), 10)
+    start, end = (5, 5), (95, 25)
+    assert cells(grid, start, end) == [(0, 0), (1, 0), (2, 0), (2, 1), (3, 1), (4, 1),
+                                       (5, 1), (6, 1), (7, 1), (7, 2), (8, 2), (9, 2)]
+    assert cells(grid, start, end) == sampled_cells(grid, start, end)
+    assert cells(grid, end, start) == sampled_cells(grid, end, start)
+
+def test_diagonal_through_corners_includes_both_side_cells():
+    grid = SpatialGrid((0, 0, 100, 100), 10)
+    assert cells(grid, (5, 5), (35, 35)) == [(0, 0), (1, 0), (0, 1), (1, 1), (2, 1), (1, 2),
+                                             (2, 2), (3, 2), (2, 3), (3, 3)]
+
+def test_segment_starting_outside_the_grid():
+    grid = SpatialGrid((0, 0, 100, 100), 10)
+    assert cells(grid, (-50, 5), (25, 5)) == [(0, 0), (1, 0), (2, 0)]
+
+def test_segment_ending_outside_the_grid():
+    grid = SpatialGrid((0, 0, 100, 100), 10)
+    assert cells(grid, (95, 95), (150, 200)) == [(9, 9)]
+    assert cells(grid, (75, 15), (75, -40)) == [(7, 1), (7, 0)]
+
+def test_segment_crossing_the_grid_from_outside():
+    grid = SpatialGrid((0, 0, 100, 100), 10)
+    assert cells(grid, (-20, 50), (120, 50)) == [(x, 5) for x in range(10)]
+
+def test_segment_missing_the_grid():
+    grid = SpatialGrid((0, 0, 100, 100), 10)
+    assert cells(grid, (-50, -50), (-10, 200)) == []
+
+def test_offset_bounds():
+    grid = SpatialGrid((100, 50, 100, 100), 10)
+    assert cells(grid, (90, 55), (125, 55)) == [(0, 0), (1, 0), (2, 0)]
+    assert cells(grid, (195, 145), (195, 145)) == [(9, 9)]
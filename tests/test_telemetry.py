@@ -0,0 +1,72 @@
+"""
+Telemetry ring buffer and writer: events a full buffer behind are dropped and counted,
+and a session's file rotates once it grows past TELEMETRY_MAX_FILE_BYTES.
+"""
+
+import json
+
+import pytest
+
+import telemetry as telemetry_module
+from telemetry import Telemetry, EVENT_MISS, EVENT_SLICE
+
+@pytest.fixture(autouse=True)
+def manual_flush(monkeypatch):
+    # The writer thread only flushes when stopped, so the tests decide when batches are written
+    monkeypatch.setattr(telemetry_module, "TELEMETRY_FLUSH_INTERVAL", 3600)
+
+def read_files(log_dir):
+    files = sorted(log_dir.glob("telemetry-*.jsonl"), key=lambda path: (len(path.name), path.name))
+    return [[json.loads(line) for line in path.read_text().splitlines()] for path in files]
+
+def test_nothing_is_recorded_until_started(tmp_path):
+    telemetry = Telemetry(capacity=8)
+    telemetry.record(EVENT_MISS, 10.0, -15)
+    assert telemetry.count == 0
+    telemetry.stop() # Not started: nothing to stop
+    assert list(tmp_path.iterdir()) == []
+
+def test_events_a_full_buffer_behind_are_dropped_and_counted(tmp_path):
+    telemetry = Telemetry(capacity=8)
+    telemetry.start({"seed": 1}, log_dir=str(tmp_path))
+    for i in range(20):
+        telemetry.record(EVENT_MISS, i * 10.0, -i)
+    telemetry.stop()
+
+    [lines] = read_files(tmp_path)
+    assert lines[0]["event"] == "session" and lines[0]["seed"] == 1
+    events = lines[1:-1]
+    assert [event["t"] for event in events] == [i * 10 for i in range(12, 20)] # The newest capacity's worth
+    assert events[0] == {"event": "miss", "t": 120, "sanity_delta": -12}
+    assert lines[-1] == {"event": "session_end", "events": 20, "dropped": 12}
+
+def test_nothing_is_dropped_while_the_writer_keeps_up(tmp_path):
+    telemetry = Telemetry(capacity=8)
+    telemetry.start({"seed": 1}, log_dir=str(tmp_path))
+    for batch in range(5):
+        for i in range(6):
+            telemetry.record(EVENT_SLICE, batch * 100 + i, 0.25, 10, 0)
+        telemetry.flush()
+    telemetry.stop()
+
+    [lines] = read_files(tmp_path)
+    assert len(lines) == 1 + 30 + 1
+    assert lines[-1] == {"event": "session_end", "events": 30, "dropped": 0}
+
+def test_file_rotates_past_the_size_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(telemetry_module, "TELEMETRY_MAX_FILE_BYTES", 300)
+    telemetry = Telemetry(capacity=64)
+    telemetry.start({"seed": 3, "trainee": "t1"}, log_dir=str(tmp_path))
+    for batch in range(6):
+        for i in range(4):
+            telemetry.record(EVENT_MISS, batch * 100 + i, -1)
+        telemetry.flush()
+    telemetry.stop()
+
+    files = read_files(tmp_path)
+    assert len(files) > 1
+    for lines in files:
+        assert lines[0]["event"] == "session" and lines[0]["trainee"] == "t1" # Every file is self-describing
+    events = [line for lines in files for line in lines if line["event"] == "miss"]
+    assert [event["t"] for event in events] == [batch * 100 + i for batch in range(6) for i in range(4)]
+    assert files[-1][-1] == {"event": "session_end", "events": 24, "dropped": 0}
@@ -0,0 +1,39 @@
+"""
+Shared cache of rendered text surfaces, so repeated strings are rasterized only once.
+"""
+
+from collections import OrderedDict
+
+from settings import *
+
+class TextCache:
+    """
+    LRU cache of font.render() results keyed by (font, text, color, antialias).
+    Returned surfaces are shared between callers and must not be modified.
+    """
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False) # Evict least recently used
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+
+# Shared instance used by all text sprites
+text_cache = TextCache()